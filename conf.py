@@ -11,10 +11,8 @@ from __future__ import annotations
 import logging
 import os
 import platform
-import random
 from typing import Final
 
-random.SystemRandom().seed("no_AI_allowed")
 ROOT_LOGGER: Final = logging.getLogger("ROOT_LOGGER")
 BASEDIR = os.path.abspath(os.path.dirname(__file__))
 ENV_NAME = "venv"
@@ -24,10 +22,15 @@ VENV_PATH = os.path.join(BASEDIR, ENV_NAME,
                          )
 VENV_PYTHON = os.path.join("./", VENV_PATH,
                            "python")
-print(VENV_PYTHON, "----", os.path.join(BASEDIR, ENV_NAME))
-if not os.path.exists(os.path.join(BASEDIR, ENV_NAME)):
+
+
+def check_venv() -> bool:
+    """ Warn the user (scripts only : importing conf stays silent) when the virtual environment is missing """
+    if os.path.exists(os.path.join(BASEDIR, ENV_NAME)):
+        return True
     print("You MUST setup a virtual environment to use this project.\n"
           f">>> python -m venv {ENV_NAME}\n"
           f">>> activate\n"
           ">>> pip install -r requirements.txt"
           )
+    return False
@@ -6,9 +6,14 @@ IDE: PyCharm
 Creation-date: 26/10/22
 """
 
-# sub_modules MUST be in MRO order !!!
+# engine, players, client and storage layers are only imported when used (see models.lazy)
+from .lazy import lazy_exports
 
-from .games import CardGame, PresidentGame, Card, CheaterDetected
-from .interfaces import Interface
-from .players import Player, AI, Human
-from .utils import GameFinder, logger
+__all__ = ["CardGame", "PresidentGame", "Card", "CheaterDetected", "Interface", "Player", "AI", "Human",
+           "GameFinder", "logger"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "CardGame": ".games", "PresidentGame": ".games", "Card": ".games", "CheaterDetected": ".games",
+    "Interface": ".interfaces",
+    "Player": ".players", "AI": ".players", "Human": ".players",
+    "GameFinder": ".utils", "logger": ".utils",
+})
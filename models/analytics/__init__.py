@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+
+# numpy is only imported when analytics are used (see models.lazy)
+from models.lazy import lazy_exports
+
+__all__ = ["ResultsChunk", "ResultsAnalytics", "GRADES", "load_chunks", "analyze"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "ResultsChunk": ".columns", "GRADES": ".columns", "load_chunks": ".columns",
+    "ResultsAnalytics": ".aggregates", "analyze": ".aggregates",
+})
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : python -m models.analytics results.pga Saves/PresidentGame/*.ndjson mongo-export.json
+"""
+import argparse
+import json
+import time
+
+from .aggregates import analyze
+from .columns import CHUNK_SIZE
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m models.analytics",
+                                     description="Aggregate saved games' results")
+    parser.add_argument("sources", nargs="+", help="archives (.pga), journals (.ndjson) or MongoDB exports (.json)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="games in memory at once")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analytics = analyze(*args.sources, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"{analytics.games} games in {elapsed:.2f}s")
+    print(json.dumps(analytics.to_json(), indent=2))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Win rates, grades' transitions, rounds and revolutions over any number of saved games
+"""
+from __future__ import annotations
+
+from typing import Final, Iterable, Optional
+
+import numpy as np
+
+from .columns import CHUNK_SIZE, GRADES, ResultsChunk, load_chunks
+
+MAX_SEATS: Final = 20  # see GameRules.max_players
+
+
+class ResultsAnalytics:
+    """ Aggregates of games' results, updated a chunk at a time : memory does not grow with the games.
+    Seats are the players' indexes in the game.
+    Transitions follow each seat from a game to the next one of the same table (consecutive results).
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.rounds = 0
+        self.revolutions = 0
+        self.games_with_revolution = 0
+        self.best_card_finishes = 0
+        self.best_card_losses = 0
+        self.seat_games = np.zeros(MAX_SEATS, np.int64)
+        # seat_ranks[seat, rank - 1] : times this seat finished at this rank
+        self.seat_ranks = np.zeros((MAX_SEATS, MAX_SEATS), np.int64)
+        # transitions[grade, next grade] : grades earned by a seat in two consecutive games of a table
+        self.transitions = np.zeros((len(GRADES), len(GRADES)), np.int64)
+        self.__last: Optional[tuple[int, np.ndarray]] = None  # last game's table, and its grades by seat
+
+    def add(self, chunk: ResultsChunk) -> ResultsAnalytics:
+        """ account for a chunk of games, following the ones already added """
+        if not len(chunk):
+            return self
+        self.games += len(chunk)
+        self.rounds += int(chunk.rounds.sum())
+        revolutions = np.maximum(chunk.revolutions, 0)
+        self.revolutions += int(revolutions.sum())
+        self.games_with_revolution += int(np.count_nonzero(revolutions))
+
+        # seat s is taken in games of more than s players
+        games_by_size = np.bincount(chunk.players, minlength=MAX_SEATS + 1)
+        self.seat_games += games_by_size[::-1].cumsum()[::-1][1:MAX_SEATS + 1]
+        rows, ranks = np.nonzero(chunk.seats >= 0)
+        seats = chunk.seats[rows, ranks].astype(np.int64)
+        self.seat_ranks += np.bincount(seats * MAX_SEATS + ranks,
+                                       minlength=MAX_SEATS * MAX_SEATS).reshape(MAX_SEATS, MAX_SEATS)
+
+        # going out on the best card, as recorded when it happened ; losing for it (see finish_with_best_card_loose)
+        self.best_card_finishes += int(np.count_nonzero(chunk.best_card))
+        self.best_card_losses += int(np.count_nonzero(chunk.best_card & chunk.lost))
+
+        self.__add_transitions(chunk, rows, ranks, seats)
+        return self
+
+    def __add_transitions(self, chunk: ResultsChunk, rows: np.ndarray, ranks: np.ndarray,
+                          seats: np.ndarray) -> None:
+        by_seat = np.full((len(chunk), MAX_SEATS), -1, np.int64)
+        by_seat[rows, seats] = chunk.grades[rows, ranks]
+        tables = chunk.table
+        if self.__last is not None:  # the previous chunk's last game precedes this chunk's first
+            tables = np.concatenate(([self.__last[0]], tables))
+            by_seat = np.concatenate((self.__last[1][None], by_seat))
+        self.__last = int(tables[-1]), by_seat[-1].copy()
+        same_table = tables[1:] == tables[:-1]
+        before, after = by_seat[:-1][same_table], by_seat[1:][same_table]
+        graded = (before >= 0) & (after >= 0)
+        size = len(GRADES)
+        self.transitions += np.bincount(before[graded] * size + after[graded],
+                                        minlength=size * size).reshape(size, size)
+
+    @property
+    def seats(self) -> int:
+        """ seats taken at least once """
+        return int(np.count_nonzero(self.seat_games))
+
+    @property
+    def win_rates(self) -> list[float]:
+        """ for each seat, the rate of its games finished first """
+        seats = self.seats
+        return (self.seat_ranks[:seats, 0] / np.maximum(self.seat_games[:seats], 1)).tolist()
+
+    @property
+    def mean_rounds(self) -> float:
+        """ average rounds per game """
+        return self.rounds / self.games if self.games else 0.
+
+    @property
+    def revolution_rate(self) -> float:
+        """ rate of games with at least one revolution """
+        return self.games_with_revolution / self.games if self.games else 0.
+
+    @property
+    def transition_rates(self) -> list[list[float]]:
+        """ [grade][next grade] : probability of earning next grade in the next game of the table """
+        return (self.transitions / np.maximum(self.transitions.sum(axis=1, keepdims=True), 1)).tolist()
+
+    def to_json(self) -> dict:
+        seats = self.seats
+        return {
+            "games": self.games,
+            "mean_rounds": self.mean_rounds,
+            "revolutions": self.revolutions,
+            "games_with_revolution": self.games_with_revolution,
+            "revolution_rate": self.revolution_rate,
+            "best_card_finishes": self.best_card_finishes,
+            "best_card_losses": self.best_card_losses,
+            "win_rates": self.win_rates,
+            "seat_ranks": self.seat_ranks[:seats, :seats].tolist(),
+            "grades": list(GRADES),
+            "transitions": self.transitions.tolist(),
+            "transition_rates": self.transition_rates,
+        }
+
+    def __repr__(self):
+        return f"ResultsAnalytics({self.games} games)"
+
+
+def analyze(*sources: str | Iterable[dict], chunk_size: int = CHUNK_SIZE) -> ResultsAnalytics:
+    """ aggregate every source's results (see load_chunks), chunk_size games in memory at most """
+    analytics = ResultsAnalytics()
+    for chunk in load_chunks(*sources, chunk_size=chunk_size):
+        analytics.add(chunk)
+    return analytics
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Games' results as NumPy columns, read by chunks (journals, MongoDB exports, archives)
+"""
+from __future__ import annotations
+
+from itertools import islice
+from typing import Final, Generator, Iterable
+
+import numpy as np
+
+from models.games.card_games.card import CARDS
+from models.networking.archive import Archive
+from models.networking.db import Database
+from rules import PresidentRules
+
+CHUNK_SIZE: Final = 1 << 16  # games per chunk
+GRADES: Final = tuple(PresidentRules.RANKINGS)  # best first
+_GRADE: Final = {grade: code for code, grade in enumerate(GRADES)}
+_CARD: Final = {card.unicode_safe(): card.id for card in CARDS}
+# archives' records (see models.networking.archive), as NumPy sees them
+_GAME: Final = np.dtype([("lineup", "<u4"), ("winners", "u1"), ("rounds", "<u2"),
+                         ("revolutions", "u1"), ("piles", "<u2")])
+_WINNER: Final = np.dtype([("seat", "u1"), ("round", "<u2"), ("card", "u1"), ("grade", "u1"), ("flags", "u1")])
+_LOST, _BEST_CARD = (1 << Archive.FLAGS.index(flag) for flag in ("lost", "best_card"))
+assert _GAME.itemsize == Archive.GAME.size and _WINNER.itemsize == Archive.WINNER.size
+
+
+class ResultsChunk:
+    """ Results of consecutive games, as columns : one row per game (-1 : unknown / nothing there)
+    table        lineup's id : same game, same players on the same seats
+    players      players seated when the game started
+    rounds       rounds played
+    revolutions  revolutions (-1 : not saved)
+    ranked       players in the game's ladder
+    seats        [game, rank - 1] seat of the player who finished at rank (-1 : left the table)
+    last_cards   [game, rank - 1] last card they played (Card.id)
+    grades       [game, rank - 1] grade they earned (see GRADES)
+    lost         [game, rank - 1] they lost (ranked from the bottom, see Game.losers)
+    best_card    [game, rank - 1] they went out on the best card, as powers stood then
+    (results saved before these flags were recorded have none)
+    """
+
+    def __init__(self, nb_games: int, width: int):
+        self.table = np.zeros(nb_games, np.int64)
+        self.players = np.zeros(nb_games, np.int8)
+        self.rounds = np.zeros(nb_games, np.int32)
+        self.revolutions = np.full(nb_games, -1, np.int16)
+        self.ranked = np.zeros(nb_games, np.int8)
+        self.seats = np.full((nb_games, width), -1, np.int8)
+        self.last_cards = np.full((nb_games, width), -1, np.int8)
+        self.grades = np.full((nb_games, width), -1, np.int8)
+        self.lost = np.zeros((nb_games, width), bool)
+        self.best_card = np.zeros((nb_games, width), bool)
+
+    @classmethod
+    def from_results(cls, results: list[dict], tables: dict[tuple, int]) -> ResultsChunk:
+        """
+        :param results: games' results (see Game.save_results)
+        :param tables: lineup -> table's id, shared by the chunks of a same analysis
+        """
+        chunk = cls(len(results), max((len(result["winners"]) for result in results), default=0))
+        rows, ranks, seats, cards, grades, lost, best_card = [], [], [], [], [], [], []
+        for row, result in enumerate(results):
+            players = result["players"]
+            seat_of = {name: seat for seat, name in enumerate(players)}
+            chunk.table[row] = tables.setdefault((result["game"], tuple(players)), len(tables))
+            chunk.players[row] = len(players)
+            chunk.rounds[row] = result.get("rounds", 0)
+            chunk.revolutions[row] = result.get("revolutions", -1)
+            chunk.ranked[row] = len(result["winners"])
+            for rank, winner in enumerate(result["winners"]):
+                rows.append(row)
+                ranks.append(rank)
+                seats.append(seat_of.get(winner["player"], -1))
+                cards.append(_CARD.get(winner.get("last_play"), -1))
+                grades.append(_GRADE.get(winner.get("grade"), -1))
+                lost.append(winner.get("lost", False))
+                best_card.append(winner.get("best_card", False))
+        chunk.seats[rows, ranks] = seats
+        chunk.last_cards[rows, ranks] = cards
+        chunk.grades[rows, ranks] = grades
+        chunk.lost[rows, ranks] = lost
+        chunk.best_card[rows, ranks] = best_card
+        return chunk
+
+    @classmethod
+    def from_archive(cls, archive: Archive, start: int, stop: int,
+                     lineup_tables: np.ndarray, lineup_players: np.ndarray) -> ResultsChunk:
+        """ decode records start to stop - 1 all at once, straight from the archive's buffer
+        :param lineup_tables: archive's lineup -> table's id
+        :param lineup_players: archive's lineup -> players seated """
+        raw = np.frombuffer(archive.buffer, np.uint8)
+        offsets = np.frombuffer(archive.buffer, "<u8", stop - start,
+                                archive.index_offset + start * 8).astype(np.int64)
+        head = raw[offsets[:, None] + np.arange(_GAME.itemsize)].view(_GAME)[:, 0]
+        nb_winners = head["winners"].astype(np.int64)
+        width = int(nb_winners.max(initial=0))
+        # every record is read as if it had width winners : what is beyond the ladder is masked
+        positions = offsets[:, None] + _GAME.itemsize + np.arange(width * _WINNER.itemsize)
+        winners = raw[np.minimum(positions, raw.size - 1)].view(_WINNER)
+        del raw
+        ladder = np.arange(width) < nb_winners[:, None]
+
+        chunk = cls(stop - start, width)
+        chunk.table[:] = lineup_tables[head["lineup"]]
+        chunk.players[:] = lineup_players[head["lineup"]]
+        chunk.rounds[:] = np.where(head["rounds"] == Archive.NO_ROUNDS, 0, head["rounds"])
+        chunk.revolutions[:] = np.where(head["revolutions"] == Archive.NONE, -1, head["revolutions"])
+        chunk.ranked[:] = nb_winners
+        # seats after the players' are those who left the table
+        chunk.seats[:] = np.where(ladder & (winners["seat"] < chunk.players[:, None]), winners["seat"], -1)
+        chunk.last_cards[:] = np.where(ladder & (winners["card"] != Archive.NONE), winners["card"], -1)
+        grades = np.full(256, -1, np.int8)
+        grades[:len(archive.grades)] = [_GRADE.get(grade, -1) for grade in archive.grades]
+        chunk.grades[:] = np.where(ladder, grades[winners["grade"]], -1)
+        chunk.lost[:] = ladder & (winners["flags"] & _LOST > 0)
+        chunk.best_card[:] = ladder & (winners["flags"] & _BEST_CARD > 0)
+        return chunk
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def __repr__(self):
+        return f"ResultsChunk({len(self)} games)"
+
+
+def result_chunks(results: Iterable[dict], tables: dict[tuple, int],
+                  chunk_size: int = CHUNK_SIZE) -> Generator[ResultsChunk, None, None]:
+    """ columns of the given results (journal, MongoDB cursor, ...), chunk_size games at a time """
+    results = iter(results)
+    while batch := list(islice(results, chunk_size)):
+        yield ResultsChunk.from_results(batch, tables)
+
+
+def archive_chunks(archive: Archive, tables: dict[tuple, int],
+                   chunk_size: int = CHUNK_SIZE) -> Generator[ResultsChunk, None, None]:
+    """ columns of an archive's results, chunk_size games at a time (records are never decoded one by one) """
+    lineup_tables = np.array([tables.setdefault((game, tuple(players)), len(tables))
+                              for game, players, _ in archive.lineups], np.int64)
+    lineup_players = np.array([len(players) for _, players, _ in archive.lineups], np.int8)
+    for start in range(0, len(archive), chunk_size):
+        yield ResultsChunk.from_archive(archive, start, min(start + chunk_size, len(archive)),
+                                        lineup_tables, lineup_players)
+
+
+def load_chunks(*sources: str | Iterable[dict],
+                chunk_size: int = CHUNK_SIZE) -> Generator[ResultsChunk, None, None]:
+    """
+    Columns of every source's results, in order, chunk_size games at a time.
+    :param sources: archives (.pga), journals and MongoDB exports (see Database.load),
+                    or results themselves (a MongoDB cursor, for instance)
+    """
+    tables: dict[tuple, int] = {}
+    for source in sources:
+        if not isinstance(source, str):
+            yield from result_chunks(source, tables, chunk_size)
+        elif source.endswith(".pga"):
+            with Archive(source) as archive:
+                yield from archive_chunks(archive, tables, chunk_size)
+        else:
+            yield from result_chunks(Database.load(source), tables, chunk_size)
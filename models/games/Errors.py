@@ -35,3 +35,23 @@ class PlayerNotFound(BaseException):
         logger.setLevel(logging.CRITICAL)
         logger.critical("".join([CRITICAL, f"Player Not Found : {str(e)}", CRITICAL]))
         raise self
+
+
+class ReplayDiverged(BaseException):
+    """
+    Exception Raised if a replayed game asks for another decision than the recorded one
+    """
+
+    def __init__(self, e):
+        super().__init__(e)
+        logger = logging.getLogger(__name__)
+        logger.setLevel(logging.CRITICAL)
+        logger.critical("".join([CRITICAL, f"Replay Diverged : {str(e)}", CRITICAL]))
+        raise self
+
+
+class EndOfReplay(BaseException):
+    """
+    Raised when a replayed game needs a decision that has not been recorded (yet) :
+    the game is in the state it had when it waited for this decision
+    """
@@ -6,7 +6,12 @@ IDE: PyCharm
 Creation-date: 11/10/22
 """
 
-from .Errors import CheaterDetected, PlayerNotFound
-from .card_games import CardGame, PresidentGame, Card
-# sub_modules MUST be in MRO order !!!
-from .game_template import Game
+from models.lazy import lazy_exports
+
+__all__ = ["CheaterDetected", "PlayerNotFound", "ReplayDiverged", "EndOfReplay", "CardGame", "PresidentGame", "Card",
+           "Game"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "CheaterDetected": ".Errors", "PlayerNotFound": ".Errors", "ReplayDiverged": ".Errors", "EndOfReplay": ".Errors",
+    "CardGame": ".card_games", "PresidentGame": ".card_games", "Card": ".card_games",
+    "Game": ".game_template",
+})
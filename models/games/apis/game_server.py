@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import importlib
+import logging
+import os
+from typing import Callable, Final
+
+from flask import request, make_response, Response
+
+from models.games.game_template import Game
+from .server_template import Server
+
+GAME_CLASS: Final = "GAME_CLASS"  # environment variable : "package.module:Class" of the game create_app serves
+
+
+class GameServer(Server):
+    """ Flask Server wrapping a headless Game engine.
+    Every route given by game.routes() is served, and forwarded to the game's handler.
+
+    GameServer(PresidentGame()).run_server()
+    """
+
+    def __init__(self, game: Game, import_name: str = "Game_Server"):
+        self.game = game  # required before Server's init, which registers the routes
+        super().__init__(import_name)
+        self._logger = logging.getLogger(__class__.__name__)
+
+    @property
+    def status(self) -> int:
+        """ Server's status is the game's status (game sends messages differently when served) """
+        return self.game.status
+
+    @status.setter
+    def status(self, value: int) -> None:
+        self.game.status = value
+
+    def _init_server(self, name):
+        """ register every game's route """
+        super()._init_server(name)
+        for message, handler in self.game.routes().items():
+            self.add_url_rule(f"/{message.request['message']}/{message.REQUIRED}",
+                              endpoint=message.request['message'],
+                              view_func=self.__view(handler),
+                              methods=message.methods)
+
+    @staticmethod
+    def __view(handler: Callable[..., tuple]) -> Callable[[str], Response]:
+        """ translate a flask request to the game's handler, and its answer to a flask Response """
+
+        def view(player: str) -> Response:
+            return make_response(*handler(player, request.headers, request.data))
+
+        view.__name__ = handler.__name__
+        return view
+
+    def to_json(self):
+        """ Serializing Server's game for exchanges between Server and players"""
+        return self.game.to_json()
+
+
+def game_class_path(game_class: type[Game]) -> str:
+    """ the "package.module:Class" of a game class (see GAME_CLASS) """
+    return f"{game_class.__module__}:{game_class.__qualname__}"
+
+
+def create_app(game_class: Callable[..., Game] = None) -> GameServer:
+    """ WSGI application factory (waitress --call / gunicorn 'module:create_app()')
+    Serves the game class named by the GAME_CLASS environment variable, PresidentGame by default """
+    if game_class is None and os.environ.get(GAME_CLASS):
+        module, _, name = os.environ[GAME_CLASS].partition(":")
+        game_class = importlib.import_module(module)
+        for attribute in name.split("."):
+            game_class = getattr(game_class, attribute)
+    if game_class is None:
+        from models.games.card_games.variances import PresidentGame
+        game_class = PresidentGame
+    return GameServer(game_class())
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Spread tables over several processes (shards), behind one front router
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from multiprocessing import Process
+from typing import Callable, Final, Optional
+
+import requests
+from flask import request, make_response, Response
+from werkzeug.serving import make_server
+
+from models.games.game_template import Game
+from models.networking.responses import Message, RequiredName
+from .server_template import Server
+from .table_server import TableServer
+
+# headers that only make sense between two hops
+_HOP_HEADERS: Final = frozenset(("host", "content-length", "connection", "transfer-encoding",
+                                 "content-encoding", "keep-alive"))
+
+
+class TableRegistry:
+    """ Where each table lives : table_id -> shard address ("host:port").
+    Kept in memory, and saved to a json file on every change (the router can restart without losing tables). """
+
+    def __init__(self, path: str):
+        self.path: Final = path
+        self.__lock = threading.Lock()
+        self.__tables: dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as fp:
+                self.__tables = json.load(fp).get("tables", {})
+
+    def get(self, table_id: str) -> Optional[str]:
+        return self.__tables.get(table_id)
+
+    def place(self, table_id: str, shard: str) -> None:
+        with self.__lock:
+            self.__tables[table_id] = shard
+            self.__save()
+
+    def reserve(self, table_id: str, shards: list[str]) -> str:
+        """ place a new table on the shard hosting the fewest tables, at once : concurrent tables spread out """
+        with self.__lock:
+            load = self.load(shards)
+            shard = min(shards, key=load.__getitem__)
+            self.__tables[table_id] = shard
+            self.__save()
+            return shard
+
+    def remove(self, table_id: str) -> None:
+        with self.__lock:
+            if self.__tables.pop(table_id, None):
+                self.__save()
+
+    def load(self, shards: list[str]) -> dict[str, int]:
+        """ number of tables of each shard """
+        counts = dict.fromkeys(shards, 0)
+        for shard in list(self.__tables.values()):
+            if shard in counts:
+                counts[shard] += 1
+        return counts
+
+    def __save(self) -> None:
+        """ atomic : the file is either the previous registry or the new one """
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as fp:
+            json.dump({"tables": self.__tables}, fp)
+        os.replace(tmp, self.path)
+
+    def __len__(self) -> int:
+        return len(self.__tables)
+
+
+class ShardRouter(Server):
+    """ Front Server : forwards each table's requests to the process (shard) hosting it.
+
+    Shards are TableServers, each in its own process : a busy table (AI turns, ...)
+    only slows down the tables of its own shard, and capacity grows with cores.
+    New tables go to the shard hosting the fewest tables.
+    Routes are the TableServer's (lobby, open, close, /tables/<table_id>/<message>/<player>).
+    """
+
+    def __init__(self, shards: list[str], registry: TableRegistry, import_name: str = "Shard_Router"):
+        if not shards:
+            raise ValueError("A router requires at least one shard")
+        self.shards: Final = list(shards)
+        self.registry = registry
+        self.__session = requests.Session()  # keeps connections to the shards alive
+        super().__init__(import_name)
+        self._logger = logging.getLogger(__class__.__name__)
+
+    def _init_server(self, name):
+        super()._init_server(name)
+        self.add_url_rule("/tables", endpoint="lobby", view_func=self.__on_lobby, methods=("GET",))
+        self.add_url_rule("/tables", endpoint="open_table", view_func=self.__on_open, methods=("POST",))
+        self.add_url_rule("/tables/<table_id>", endpoint="close_table", view_func=self.__on_close,
+                          methods=("DELETE",))
+        self.add_url_rule(f"/tables/<table_id>/<message>/{RequiredName.REQUIRED}", endpoint="table",
+                          view_func=self.__on_table, methods=("GET", "POST"))
+
+    def __forward(self, shard: str, path: str, timeout: float = Message.TIMEOUT) -> Response:
+        """ send the current request to a shard, and its answer back """
+        headers = {key: value for key, value in request.headers.items() if key.lower() not in _HOP_HEADERS}
+        try:
+            answer = self.__session.request(request.method, f"{self._PROTOCOL}://{shard}{path}",
+                                            headers=headers, data=request.get_data(), timeout=timeout)
+        except requests.RequestException as err:
+            self._logger.error("Shard %s unreachable : %s", shard, err)
+            return make_response({"error": "Table unavailable"}, 503)
+        headers = [(key, value) for key, value in answer.headers.items() if key.lower() not in _HOP_HEADERS]
+        return make_response(answer.content, answer.status_code, headers)
+
+    def __on_lobby(self) -> Response:
+        tables = []
+        for shard in self.shards:
+            try:
+                tables.extend(self.__session.get(f"{self._PROTOCOL}://{shard}/tables", timeout=5).json()["tables"])
+            except (requests.RequestException, ValueError, KeyError) as err:
+                self._logger.error("Shard %s unreachable : %s", shard, err)
+        return make_response({"tables": tables}, 200)
+
+    def __on_open(self) -> Response:
+        try:
+            options = json.loads(request.get_data() or b'{}')
+        except ValueError:
+            return make_response({"error": "Table options must be json"}, 400)
+        if not isinstance(options, dict):
+            return make_response({"error": "Table options must be a json object"}, 400)
+        table_id = options["id"] = uuid.uuid4().hex[:12]  # unique over every shard
+        shard = self.registry.reserve(table_id, self.shards)  # before forwarding : others pick another shard
+        try:
+            answer = self.__session.post(f"{self._PROTOCOL}://{shard}/tables", json=options, timeout=10)
+        except requests.RequestException as err:
+            self.registry.remove(table_id)
+            self._logger.error("Shard %s unreachable : %s", shard, err)
+            return make_response({"error": "No shard available"}, 503)
+        if answer.status_code != 201:
+            self.registry.remove(table_id)
+        return make_response(answer.content, answer.status_code, {"Content-Type": "application/json"})
+
+    def __on_close(self, table_id: str) -> Response:
+        shard = self.registry.get(table_id)
+        if not shard:
+            return make_response("Nope", 404)
+        response = self.__forward(shard, f"/tables/{table_id}")
+        if response.status_code in (200, 404):
+            self.registry.remove(table_id)
+        return response
+
+    def __on_table(self, table_id: str, message: str, player: str) -> Response:
+        shard = self.registry.get(table_id)
+        if not shard:
+            return make_response("Table or route not found", 404)
+        # long polling updates may wait up to Update.POLL_TIMEOUT on the shard
+        return self.__forward(shard, f"/tables/{table_id}/{message}/{player}", Message.TIMEOUT + 5)
+
+    def to_json(self):
+        return {"name": self.name, "status": self.status, "shards": self.shards, "tables": len(self.registry)}
+
+
+def serve_shard(port: int, game_class: Callable[..., Game] = None, host: str = "127.0.0.1") -> None:
+    """ Worker process : a TableServer on the given port """
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = TableServer(game_class, import_name=f"Table_Shard_{port}")
+    server.status = server.SERVER_RUNNING
+    make_server(host, port, server, threaded=True).serve_forever()
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    """ a port nobody listens to (yet) """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def wait_shard(shard: str, timeout: float = 30.) -> bool:
+    """ wait until a shard answers its lobby """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://{shard}/tables", timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.1)
+    return False
+
+
+def start_shards(nb_shards: Optional[int] = None, game_class: Callable[..., Game] = None,
+                 host: str = "127.0.0.1", ports: Optional[list[int]] = None) -> tuple[list[str], list[Process]]:
+    """
+    Start worker processes, each hosting a TableServer
+    :param nb_shards: defaults to CPU count
+    :param ports: shards' ports (free ports by default)
+    :return: shards' addresses, and their processes (daemons)
+    """
+    nb_shards = nb_shards or os.cpu_count() or 1
+    ports = ports or [free_port(host) for _ in range(nb_shards)]
+    processes = [Process(target=serve_shard, args=(port, game_class, host), daemon=True,
+                         name=f"Table_Shard_{port}") for port in ports]
+    [process.start() for process in processes]
+    shards = [f"{host}:{port}" for port in ports]
+    for shard in shards:
+        if not wait_shard(shard):
+            [process.terminate() for process in processes]
+            raise ConnectionError(f"Shard {shard} did not start")
+    return shards, processes
+
+
+def create_router(nb_shards: Optional[int] = None, game_class: Callable[..., Game] = None,
+                  registry_path: str = "./tables.json") -> ShardRouter:
+    """ start the shards, and the router forwarding to them (router.run_server() to serve) """
+    shards, _ = start_shards(nb_shards, game_class)
+    if os.path.exists(registry_path):  # tables of a previous run died with their shards
+        os.remove(registry_path)
+    return ShardRouter(shards, TableRegistry(registry_path))
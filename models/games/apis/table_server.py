@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from itertools import count
+from typing import Callable, Final, Optional
+
+from flask import request, make_response, Response
+
+from models.games.game_template import Game
+from models.networking.responses import RequiredName
+from .server_template import Server
+
+
+class TableServer(Server):
+    """ One Flask Server hosting many tables (headless Game engines) behind a single port.
+
+    GET    /tables                              lobby : every table and its seats
+    POST   /tables                              open a table ({"nb_ai": 3, "id": optional}), answers its id
+    DELETE /tables/<table_id>                   close a table
+    *      /tables/<table_id>/<message>/<player>   any route of the table's game (see Game.routes)
+
+    Tables are plain objects in this process : opening one starts no process nor port,
+    and a game's thread only starts with the table's game (Start route).
+    The registry lives in memory : serve it from ONE process (threads are fine),
+    see models.games.apis.shards to spread tables over processes.
+
+    TableServer(PresidentGame).run_server()
+    """
+    MAX_TABLES: Final = 500
+
+    def __init__(self, game_class: Callable[..., Game] = None, import_name: str = "Table_Server",
+                 max_tables: int = MAX_TABLES):
+        if game_class is None:
+            from models.games.card_games.variances import PresidentGame
+            game_class = PresidentGame
+        self.game_class = game_class
+        self.max_tables = max_tables
+        self.tables: dict[str, Optional[Game]] = {}
+        self.__handlers: dict[str, dict[str, tuple[tuple, Callable[..., tuple]]]] = {}
+        self.__ids = count(1)
+        self.__lock = threading.Lock()
+        super().__init__(import_name)
+        self._logger = logging.getLogger(__class__.__name__)
+
+    # ############################ registry ############################
+
+    def open_table(self, table_id: Optional[str] = None, **options) -> str:
+        """
+        Create a new table, ready for players to connect
+        :param table_id: the table's id (generated if not given)
+        :param options: game_class' parameters (nb_ai, ...)
+        :return: the table's id
+        """
+        with self.__lock:
+            if len(self.tables) >= self.max_tables:
+                raise OverflowError("Too many tables")
+            if table_id in self.tables:
+                raise ValueError(f"Table {table_id} already exists")
+            table_id = table_id or str(next(self.__ids))
+            while table_id in self.tables:
+                table_id = str(next(self.__ids))
+            self.tables[table_id] = None  # reserved while the game is created (outside the lock)
+        try:
+            game = self.game_class(**options)
+        except Exception:
+            with self.__lock:
+                self.tables.pop(table_id)
+            raise
+        game.status = self.SERVER_RUNNING  # messages go to players, not stdout
+        handlers = {message.request['message']: (message.methods, handler)
+                    for message, handler in game.routes().items()}
+        with self.__lock:
+            self.__handlers[table_id] = handlers
+            self.tables[table_id] = game
+        self._logger.info("Table %s opened", table_id)
+        return table_id
+
+    def close_table(self, table_id: str) -> bool:
+        """ remove a table, its connected humans are disconnected (so its game stops waiting on them)
+        :return: True if the table existed """
+        with self.__lock:
+            game = self.tables.get(table_id)
+            if game is None:
+                return False
+            del self.tables[table_id]
+            self.__handlers.pop(table_id, None)
+        for player in [p for p in game.players if p.is_human]:
+            game.unregister(player)
+        game.close()
+        self._logger.info("Table %s closed", table_id)
+        return True
+
+    def get_table(self, table_id: str) -> Optional[Game]:
+        return self.tables.get(table_id)
+
+    def lobby(self) -> list[dict]:
+        """ tables' summaries, without serializing games """
+        return [{"id": table_id,
+                 "game": game.game_name,
+                 "players": [player.name for player in game.players],
+                 "max_players": game.game_rules.max_players,
+                 "running": game._run,
+                 } for table_id, game in list(self.tables.items()) if game is not None]
+
+    # ############################ routes ############################
+
+    def _init_server(self, name):
+        super()._init_server(name)
+        self.add_url_rule("/tables", endpoint="lobby", view_func=self.__on_lobby, methods=("GET",))
+        self.add_url_rule("/tables", endpoint="open_table", view_func=self.__on_open, methods=("POST",))
+        self.add_url_rule("/tables/<table_id>", endpoint="close_table", view_func=self.__on_close,
+                          methods=("DELETE",))
+        self.add_url_rule(f"/tables/<table_id>/<message>/{RequiredName.REQUIRED}", endpoint="table",
+                          view_func=self.__on_table, methods=("GET", "POST"))
+
+    def __on_lobby(self) -> Response:
+        return make_response({"tables": self.lobby()}, 200)
+
+    def __on_open(self) -> Response:
+        try:
+            options = json.loads(request.data or b'{}')
+            table_id = self.open_table(options.get("id") and str(options["id"]),
+                                       nb_ai=int(options.get("nb_ai", 3)))
+        except OverflowError:
+            return make_response({"error": "Too many tables"}, 503)
+        except (TypeError, ValueError) as err:
+            return make_response({"error": str(err)}, 400)
+        return make_response({"id": table_id}, 201)
+
+    def __on_close(self, table_id: str) -> Response:
+        return make_response("OK", 200) if self.close_table(table_id) else make_response("Nope", 404)
+
+    def __on_table(self, table_id: str, message: str, player: str) -> Response:
+        """ forward the request to the table's game """
+        methods, handler = self.__handlers.get(table_id, {}).get(message, ((), None))
+        if handler is None:
+            return make_response("Table or route not found", 404)
+        if request.method not in methods:
+            return make_response("Method not allowed", 405)
+        return make_response(*handler(player, request.headers, request.data))
+
+    def to_json(self):
+        """ Serializing Server's infos (lobby) """
+        return {"name": self.name, "status": self.status, "tables": self.lobby()}
+
+
+def create_app(game_class: Callable[..., Game] = None) -> TableServer:
+    """ WSGI application factory (waitress --call / gunicorn with ONE worker, many threads) """
+    return TableServer(game_class)
@@ -6,5 +6,10 @@ IDE: PyCharm
 Creation-date: 11/25/22
 """
 
-from .card_game import CardGame, Card, Deck
-from .variances import PresidentGame
+from models.lazy import lazy_exports
+
+__all__ = ["CardGame", "Card", "Deck", "PresidentGame"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "CardGame": ".card_game", "Card": ".card_game", "Deck": ".card_game",
+    "PresidentGame": ".variances",
+})
@@ -8,12 +8,43 @@ Creation-date: 01/10/22
 
 from __future__ import annotations
 
+from types import MappingProxyType
+from typing import Final
+
 from models.networking.plays import GamePlay
 from rules import CardGameRules
 
+# Precomputed lookup tables, so comparisons never scan CardGameRules.VALUES
+RANKS: Final = MappingProxyType({value: rank for rank, value in enumerate(CardGameRules.VALUES)})
+SUITS: Final = MappingProxyType({color: suit for suit, color in enumerate(CardGameRules.COLORS)})
+NUMBERS: Final = tuple(RANKS)  # card number of each rank
+NB_RANKS: Final = len(RANKS)
+NB_SUITS: Final = len(SUITS)
+
+
+def card_id(rank: int, suit: int) -> int:
+    """ Cards ids are rank-major : the 4 colors of a value are contiguous """
+    return rank * NB_SUITS + suit
+
+
+def _rank_of(other) -> int:
+    """ returns the rank of a Card or of a card number (str) """
+    if isinstance(other, Card):
+        return other.rank
+    try:
+        return RANKS[str(other)]
+    except KeyError:
+        raise ValueError(f"{other} is not in {CardGameRules.VALUES}") from None
+
 
 class Card(GamePlay):
-    """ CardGame's Play Type"""
+    """ CardGame's Play Type
+
+    Cards are immutable, and carry their precomputed rank and id.
+    The 52 cards of a standard game are pre-built once (see Card.from_id / CARDS),
+    Deck reuses those instead of instantiating new ones.
+    """
+    __slots__ = ("number", "color", "rank", "id")
 
     def __init__(self, *args, **kwargs):
         """
@@ -22,28 +53,49 @@ class Card(GamePlay):
         :param color: the color of the card
         """
         number, color = self.validate(*args, **kwargs)
-        self.number = number
-        self.color = color
+        rank = RANKS[number]
+        object.__setattr__(self, "number", number)
+        object.__setattr__(self, "color", color)
+        object.__setattr__(self, "rank", rank)
+        object.__setattr__(self, "id", card_id(rank, SUITS[color]))
 
     @staticmethod
     def validate(*args, **kwargs):
         """ validate if num and color are valid inputs """
         assert len(args) == 2 or len(kwargs) == 2
-        num, color = args or kwargs
-        if str(num) not in CardGameRules.VALUES:
+        num, color = args or (kwargs.get("number"), kwargs.get("color"))
+        if str(num) not in RANKS:
             raise ValueError(f"Card number is not in {CardGameRules.VALUES}")
-        if color not in CardGameRules.COLORS:
+        if color not in SUITS:
             raise ValueError(f"Card color must be in {CardGameRules.COLORS}")
-        return num, color
+        return str(num), color
+
+    @staticmethod
+    def from_id(_id: int) -> Card:
+        """ returns the pre-built card matching the given id """
+        return CARDS[_id]
+
+    @staticmethod
+    def get(number, color) -> Card:
+        """ returns the pre-built card matching the given number and color """
+        number, color = Card.validate(number, color)
+        return CARDS[card_id(RANKS[number], SUITS[color])]
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Cards are immutable")
+
+    def __delattr__(self, item):
+        raise AttributeError("Cards are immutable")
+
+    def __reduce__(self):
+        """ copies and pickles are the pre-built card (see Card.get) """
+        return Card.get, (self.number, self.color)
 
     def __eq__(self, other):
         """ test card's numbers equity (see __ne__ for value & color comparison) """
         if not other:
             raise ValueError("Cannot compare to Empty Element")
-        self_value = CardGameRules.VALUES.index(self.number)
-        other_value = CardGameRules.VALUES.index(other.number) if isinstance(other, Card) else \
-            CardGameRules.VALUES.index(other)
-        return self_value == other_value
+        return self.rank == _rank_of(other)
 
     def __ne__(self, other):
         """ Ensure cards have different number and color"""
@@ -51,53 +103,33 @@ class Card(GamePlay):
             raise ValueError("Cannot compare to Empty Element")
         if not isinstance(other, type(self)):
             raise ValueError("Cards.__ne__ requires Cards to compare")
-        self_color = list(CardGameRules.COLORS).index(self.color)
-        other_color = list(CardGameRules.COLORS).index(other.color)
-        return not self == other and not self_color == other_color
+        return self.rank != other.rank and self.id % NB_SUITS != other.id % NB_SUITS
+
+    __hash__ = None  # value equality with numbers (str) prevents a consistent hash
 
     def __gt__(self, other):
         """ Compare values of cards """
         if not other or not self:
             raise ValueError("Cannot compare to Empty Element")
-        self_i = CardGameRules.VALUES.index(self.number)
-        if isinstance(other, Card):
-            other_value = CardGameRules.VALUES.index(other.number)
-        else:
-            other_value = CardGameRules.VALUES.index(other)
-        return self_i > other_value
+        return self.rank > _rank_of(other)
 
     def __ge__(self, other):
         """ Compare values of cards """
         if not other or not self:
             raise ValueError("Cannot compare to Empty Element")
-        self_i = CardGameRules.VALUES.index(self.number)
-        if isinstance(other, Card):
-            other_i = CardGameRules.VALUES.index(other.number)
-        else:
-            other_i = CardGameRules.VALUES.index(other)
-        return self_i >= other_i
+        return self.rank >= _rank_of(other)
 
     def __lt__(self, other):
         """ Compare values of cards """
         if not other or not self:
             raise ValueError("Cannot compare to Empty Element")
-        self_i = CardGameRules.VALUES.index(self.number)
-        if isinstance(other, Card):
-            other_i = CardGameRules.VALUES.index(other.number)
-        else:
-            other_i = CardGameRules.VALUES.index(other)
-        return self_i < other_i
+        return self.rank < _rank_of(other)
 
     def __le__(self, other):
         """ Compare values of cards """
         if not other or not self:
             raise ValueError("Cannot compare to Empty Element")
-        self_i = CardGameRules.VALUES.index(self.number)
-        if isinstance(other, Card):
-            other_i = CardGameRules.VALUES.index(other.number)
-        else:
-            other_i = CardGameRules.VALUES.index(other)
-        return self_i <= other_i
+        return self.rank <= _rank_of(other)
 
     def unicode_safe(self):
         """ Whenever you require unicode safe strings, use this method """
@@ -121,3 +153,8 @@ class Card(GamePlay):
         for key, value in CardGameRules.COLORS.items():
             if value == unisafe_color:
                 return key
+
+
+# The flyweights : every card of a standard game, indexed by Card.id
+CARDS: Final = tuple(sorted((Card(value, color) for value in RANKS for color in SUITS),
+                            key=lambda card: card.id))
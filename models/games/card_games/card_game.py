@@ -5,20 +5,20 @@ Project: President-Game
 IDE: PyCharm
 Creation-date: 11/10/22
 """
+from __future__ import annotations
+
 import json
 import logging
-import random
 from abc import abstractmethod
-from typing import Final, Generator, Tuple, Union
-
-from flask import request, make_response
+from typing import Callable, Final, Generator, Optional, Tuple, Union
 
 from models.games.Errors import CheaterDetected, PlayerNotFound
 from models.networking.responses import Play, Give, Fold
 from models.players import Player, Human
 from rules import GameRules, CardGameRules
-from .card import Card
+from .card import Card, CARDS
 from .deck import Deck
+from .moves import can_cover, hand_key, legal_plays
 from ..game_template import Game
 
 
@@ -29,7 +29,8 @@ class CardGame(Game):
     game.start()
     """
 
-    def __init__(self, nb_players=0, nb_ai=3, *players_names, nb_games: int = 0, save=True):
+    def __init__(self, nb_players=0, nb_ai=3, *players_names, nb_games: int = 0, save=True,
+                 seed: Optional[int] = None):
         """
         Game Instance.
         :param nb_players: int
@@ -37,9 +38,10 @@ class CardGame(Game):
         :param players_names: "p1", "p2", ..., "p6" (humans only)
         :question nb_games: force game to only play the amount oof games specified
         :question save: whenever you would not like to save game results, set False
+        :question seed: seed of the table's randomness (reproducible games)
         """
         self.__logger: Final = logging.getLogger(__class__.__name__)
-        super().__init__(nb_players, nb_ai, *players_names, save=save)
+        super().__init__(nb_players, nb_ai, *players_names, save=save, seed=seed)
         self.game_rules = CardGameRules(nb_players) if not self.game_rules else self.game_rules
         if self.game_rules.min_players < nb_players + nb_ai > self.game_rules.max_players:
             raise ValueError("Invalid Total Number of Players to create PresidentGame.")
@@ -48,14 +50,15 @@ class CardGame(Game):
         self.players_limit = 12  # Arbitrary Value
         super().set_game_name(__class__.__name__)
         self.__best_card_played_last_round = False
-        self.__logger.debug(self._SUPER_PRIVATE)
         self.skip_inputs = nb_games if nb_games >= 1 else False
         self.next_player_index: int = 0
         self.plays: list[list[Card]]  # For AI training sets
+        self._best_card_finishers: set[str] = set()  # players who went out on the best card, this game
         self.__pile: list[Card] = []  # Cards on top of the pile
         self.deck = Deck(self.game_rules)
         self._skip_players = False  # Required for _next_player behavior
         self.required_cards = 0
+        self._on_players_changed()
 
     def _initialize_game(self):
         """ Reset most values to default, to be able to start a game
@@ -66,8 +69,9 @@ class CardGame(Game):
         super()._initialize_game()
         self._free_pile()
         self.plays = []
+        self._best_card_finishers = set()
         self.next_player_index = 0
-        self.deck.shuffle()
+        self.deck.shuffle(self.rng)
         self._turn = 0
         self._run = True
         for player in self.players:
@@ -83,6 +87,7 @@ class CardGame(Game):
         for i, card in enumerate(self.deck.cards):
             player_index = i % len(self.players)
             self.players[player_index].add_to_hand(card)  # 'Give' card to player
+            self._cards_moved(None, [card], self.players[player_index])
             # NEVER GIVE UP THE CARD FROM DECK, to ensure cards given by players are from this game
             self.__logger.debug("Gave %s to player %s", card.unicode_safe(), self.players[player_index])
 
@@ -95,17 +100,51 @@ class CardGame(Game):
         return self.game_rules.loser_can_play_his_hand and self._count_still_alive >= 1 \
             or self._count_still_alive > 1
 
+    # ############################ table counters ############################
+    # Kept up to date by players' status changes (see on_player_status),
+    # so that turns never walk the whole table to know who can still play.
+
+    def _on_players_changed(self) -> None:
+        """ Players joined / left : count everything again """
+        self.__seated = {id(player) for player in self.players}
+        self.__humans = sum(player.is_human for player in self.players)
+        self.__alive = sum(not player.won for player in self.players)
+        self.__played = sum(player.played for player in self.players)
+        self.__out = sum(player.folded or player.won for player in self.players)
+        self.__inactive = sum(player.folded or player.played or player.won for player in self.players)
+        super()._on_players_changed()
+
+    def on_player_status(self, player: Player, status: str, value: bool) -> None:
+        """ Update counters from a seated player's status change (status already applied) """
+        super().on_player_status(player, status, value)
+        if id(player) not in self.__seated:
+            return
+        delta = 1 if value else -1
+        if status == "_won":
+            self.__alive -= delta
+            if not player.folded:
+                self.__out += delta
+                if not player.played:
+                    self.__inactive += delta
+        elif status == "_folded" and not player.won:
+            self.__out += delta
+            if not player.played:
+                self.__inactive += delta
+        elif status == "_played_turn":
+            self.__played += delta
+            if not player.folded and not player.won:
+                self.__inactive += delta
+
     @property
     def _count_still_alive(self) -> int:
         """ returns a counter or players that hasn't won the game """
-        still_alive = [player.won for player in self.players].count(False)
-        self.__logger.debug("Active players : %s", still_alive)
-        return still_alive
+        self.__logger.debug("Active players : %s", self.__alive)
+        return self.__alive
 
     @property
     def _count_active_players(self) -> int:
         """ returns the number of players able to play during current round """
-        return self._active_players.count(True)
+        return len(self.players) - self.__inactive
 
     @property
     def _active_players(self) -> list[bool]:
@@ -130,21 +169,24 @@ class CardGame(Game):
     @property
     def everyone_folded(self):
         """ return true if everyone folded or won in game"""
-        return [p.folded or p.won for p in self.players].count(True) == len(self.players)
+        return self.__out == len(self.players)
 
     @property
     def _everyone_played(self):
         """ return true if everyone played in game"""
-        return [p.played for p in self.players].count(True) == len(self.players)
+        return self.__played == len(self.players)
 
     @property
     def count_humans(self):
         """ returns Humans count in game """
-        return [p.is_human for p in self.players].count(True)
+        return self.__humans
 
     def __get_next_player(self) -> Generator[Tuple[int, Player], None, None]:
-        for index, player in enumerate(
-                self.players[self.next_player_index:] + self.players[:self.next_player_index]):
+        """ yields (index, player) of active players, starting from next_player_index """
+        players = self.players
+        for offset in range(len(players)):
+            index = (self.next_player_index + offset) % len(players)
+            player = players[index]
             if player.is_active:
                 self._skip_players = False
                 yield index, player
@@ -172,13 +214,7 @@ class CardGame(Game):
         """
         :returns: True if Card is from Game
         """
-        valid = False
-        if isinstance(card, Card):
-            for test in self.deck.cards:
-                if test.same_as(card):
-                    valid = True
-                    break
-        return valid
+        return self.deck.owns(card)
 
     def _free_pile(self):
         """ Save current pile to memory, and reset it for next round """
@@ -187,6 +223,7 @@ class CardGame(Game):
             return
         self.plays.append(self.__pile)
         self.__pile = []
+        self._changed()
 
     def show_players(self):
         """ On the beginning of a game, and when every round starts,
@@ -207,13 +244,21 @@ class CardGame(Game):
         card = player.remove_from_hand(give)
         if isinstance(to, Player):
             to.add_to_hand(card)
+            self._cards_moved(player, [card], to)
         elif isinstance(to, CardGame):
             to.__add_to_pile(card)
+            self._cards_moved(player, [card], None)
         elif isinstance(to, list):
             to.append(card)
         else:
             self.__logger.critical(type(player), type(give), type(to))
             raise CheaterDetected(f"{player} failed to give {give} to {to}")
+        self._changed()
+
+    def _cards_moved(self, giver: Optional[Player], cards: list[Card], receiver: Optional[Player]) -> None:
+        """ tell every player cards moved (see Player.on_cards_moved) """
+        for player in self.players:
+            player.on_cards_moved(giver, cards, receiver)
 
     def _reset_players_status(self):
         """
@@ -259,15 +304,45 @@ class CardGame(Game):
             self.__queen_of_heart_starts()  # ONLY FIRST GAME If Rule is True, set _next_player
             super()._reset_winner()  # then reset winners for new game
 
-        while self._run:
-            self._run_loop()
-            for player in self.players:
-                if player.is_human:
-                    self._run = self._ask_yesno(player, "Another Game") if \
-                        not (override_test and self.skip_inputs) else None
-            if self._run:
-                self._initialize_game()
-                super()._reset_winner()  # then reset winners for new game
+        try:
+            while self._run:
+                self._run_loop()
+                self._run = self.__another_game(override_test)
+                if self._run:
+                    self._initialize_game()
+                    super()._reset_winner()  # then reset winners for new game
+        finally:
+            self.close()  # the last results reach the disk
+
+    def __another_game(self, override_test=False) -> bool:
+        """ Humans decide whether the table plays another game (recorded, see Game.record) """
+        replayed = self._replayed(None, "another_game")
+        if replayed is not None:
+            return replayed[0]
+        run = self._run
+        for player in self.players:
+            if player.is_human:
+                run = self._ask_yesno(player, "Another Game") if \
+                    not (override_test and self.skip_inputs) else None
+        self._record(None, "another_game", bool(run))
+        return run
+
+    def _human_cards(self, player: Player, kind: str, take: Callable[[], list[Card]]) -> list[Card]:
+        """
+        Cards a human took out of his hand (to play, give, ...) : asked with take(),
+        or, while replaying, taken from the recorded decision
+        :param kind: the decision's name in the record ("play", "give", ...)
+        """
+        replayed = self._replayed(player, kind)
+        if replayed is None:
+            cards = take() or []
+            self._record(player, kind, [card.id for card in cards], player.folded, player.is_action_required)
+            return cards
+        ids, folded, action_required = replayed
+        cards = [player.remove_from_hand(CARDS[card_id]) for card_id in ids]
+        folded and player.set_fold()
+        player.is_action_required = action_required
+        return cards
 
     def _run_loop(self) -> None:
         """
@@ -371,16 +446,17 @@ class CardGame(Game):
         while player.is_active:
             self._send_player(player, f"Last played card : (most recent on the right)\n{self.__pile}"
             if self.__pile else "You are the first to play.")
-            if self.status == self.OFFLINE or not player.is_human:
+            if not player.is_human:
                 cards = player.play(self.required_cards)
+            elif self.status == self.OFFLINE:
+                cards = self._human_cards(player, "play", lambda: player.play(self.required_cards))
             else:
-                cards = self._wait_player_action(player)
+                cards = self._human_cards(player, "play", lambda: self._wait_player_action(player))
                 player.plays = []  # Once synced with game, reset player's play
             if not self.required_cards:
                 # First-player -> his card count become required card for other to play.
                 self.required_cards = len(cards)
-            if not player.is_action_required or player.folded or \
-                    cards and len(cards) == self.required_cards and self.card_can_be_played(cards[0]):
+            if not player.is_action_required or player.folded or self.is_legal_play(cards):
                 player.set_played()
                 break  # Player played required_cards cards, and can play them
 
@@ -399,12 +475,36 @@ class CardGame(Game):
         self.send_all(f"{player} played {[_.unicode_safe() for _ in cards]}" if cards else f"{player} Folded.")
         return cards
 
+    @property
+    def reversed_power(self) -> bool:
+        """ True while weaker cards are the strongest (see PresidentGame's revolution) """
+        return False
+
+    @property
+    def _top_to_cover(self) -> int:
+        """ rank the next play has to cover : the pile's top card, -1 when any card can be played """
+        return self.__pile[-1].rank if self.__pile else -1
+
     def card_can_be_played(self, card):
         """
          A simple card game usually allows a player to play a card if the pile is empty,
          OR if card >= card_on_top_of_pile
         """
-        return not self.__pile or card >= self.__pile[-1]
+        return can_cover(card.rank, self._top_to_cover)
+
+    def legal_plays(self, hand, required: Optional[int] = None) -> tuple[tuple[int, int], ...]:
+        """
+        Every play the rules accept from this hand, right now (see moves.legal_plays)
+        :param hand: a player's hand
+        :param required: cards to play, defaults to the round's required cards
+        :return: (rank, number of cards) of each legal play, weakest rank first
+        """
+        return legal_plays(hand.key, self._top_to_cover, self.required_cards if required is None else required)
+
+    def is_legal_play(self, cards: list[Card]) -> bool:
+        """ cards are the required number of cards of a same rank, that can cover the pile """
+        return bool(cards) and (cards[0].rank, len(cards)) in legal_plays(
+            hand_key(cards), self._top_to_cover, self.required_cards)
 
     def __queen_of_heart_starts(self) -> int:
         """
@@ -421,15 +521,26 @@ class CardGame(Game):
                     self.send_all(f"{player} : got the Queen of Heart !")
                     self.next_player_index = i  # Set first player of 1st game to the one with queen of heart
                     return self.next_player_index
-        return random.randint(0, len(self.players) - 1)  # else, random player starts
+        return self.rng.randint(0, len(self.players) - 1)  # else, random player starts
+
+    def winners(self) -> list[dict]:
+        """ the ladder ; players who went out on the best card are flagged (see finish_with_best_card_loose) """
+        ladder = super().winners()
+        for winner in ladder:
+            if winner["player"] in self._best_card_finishers:
+                winner["best_card"] = True
+        return ladder
+
+    def _reset_winner(self):
+        super()._reset_winner()
+        self._best_card_finishers = set()
 
     def player_lost(self, player):
         """ If player has no cards in hand, and the rule is set to True,
         Game sets current player to losers
         :returns: True if player lost, False otherwise"""
         status = False
-        if self.game_rules.finish_with_best_card_loose and player.hand and \
-                not len(player.hand) and self.best_card_played:
+        if self.game_rules.finish_with_best_card_loose and not len(player.hand) and self.best_card_played:
             self.set_win(player, False)
             status = True
         return status
@@ -440,7 +551,10 @@ class CardGame(Game):
         answer = -1
         while answer == -1:
             if not self.skip_inputs:
-                _in = self._send_player(player, f"{question} ? (y/n)", input).lower()
+                _in = self._send_player(player, f"{question} ? (y/n)", input)
+                if _in is None and player not in self.players:  # left without answering
+                    return False
+                _in = (_in or "").lower()
                 answer = True if _in and _in[0] == 'y' \
                     else False if _in and _in[0] == 'n' \
                     else -1
@@ -463,10 +577,14 @@ class CardGame(Game):
 
         # Cards can be played, add them to pile
         [self.__add_to_pile(card) for card in cards]
+        self._cards_moved(player, cards, None)
         player.last_played = cards
         player.set_played(True)
 
-        return self.set_win(player)  # if player has no more cards, he wins (or lose depending on rules)
+        if not player.hand and self.best_card_played:  # the best card as powers stand now
+            self._best_card_finishers.add(player.name)
+        # if player has no more cards, he wins (or lose depending on rules)
+        return self.player_lost(player) or self.set_win(player)
 
     def __reset_fold_status(self) -> None:
         """ Reset players fold status for next round """
@@ -509,71 +627,81 @@ class CardGame(Game):
     def _check_card(self, card, num, color):
         return card.number == num and card.color == color
 
-    def _init_server(self, name):
-        super()._init_server(name)
-
-        @self.route(f"/{Play.request['message']}/{Play.REQUIRED}", methods=Play.methods)
-        def play(player):
-            """
-            implement Game logic for this method
-            :param player: player we received message from
-            :return:  200 | 401
-            """
-
-            player: Human = self.get_player(player)
-            assert player and player.is_human and player.is_action_required
-            assert player.token == request.headers.get('token')
-            plays = json.loads(request.data).get("request").get("plays")
-            self._logger.info(plays)
-            if not plays:
-                player.set_fold()
-            else:
-                for _play in plays:
-                    num, color = _play.split(',')
-                    color = Card.from_unicode(color)
-                    self.__logger.debug("player's hand %s" % player.hand)
-                    self._logger.debug("Searching %s / %s in player's hand" % (num, color))
-                    card_found = False
-                    for card in player.hand:
-                        if self._check_card(card, num, color):
-                            card_found = True
-                            self.player_give_to(player, card, player.plays)
-                            break
-                    if not card_found:
-                        self._logger.critical("Card not found in player's hand")
-
-            if player.folded or player.plays:
-                player.is_action_required = False  # Game's async-loops self-synchronise with this
-            return make_response('OK', 200)
-
-        @self.route(f"/{Fold.request['message']}/{Fold.REQUIRED}", methods=Fold.methods)
-        def fold(player):
-            """
-            implement Game logic for this method
-            :param player: player we received message from
-            :return:  200 | 401
-            """
-
-            player: Human = self.get_player(player)
-            assert player and player.is_human and player.is_action_required
-            assert player.token == request.headers.get('token')
-            plays = json.loads(request.data).get("request").get("plays")
-            if not plays:
-                player.set_fold()
-            if player.folded or player.plays:
-                player.is_action_required = False  # Game's async-loops self-synchronise with this
-            return make_response('OK', 200)
-
-        @self.route(f"/{Give.request['message']}/{Give.REQUIRED}", methods=Give.methods)
-        def give(player):
-            """
-            implement Game logic for this method
-            :param player: player we received message from
-            :return: what player gives
-            """
-            player: Human = self.get_player(player)
-            assert player and player.is_human and player.is_action_required
-            plays = request.data
-            player.plays = plays
+    def routes(self) -> dict:
+        """ A card game accepts players to play, fold and give cards """
+        routes = super().routes()
+        routes.update({
+            Play: self.on_play,
+            Fold: self.on_fold,
+            Give: self.on_give,
+        })
+        return routes
+
+    def __human_required(self, pname, headers) -> Human | None:
+        """ returns the human that is expected to act, if the request is legit """
+        player: Human = self.get_player(pname)
+        if not player or not player.is_human or not player.is_action_required \
+                or player.token != headers.get('token'):
+            return None
+        return player
+
+    def on_play(self, player: str, headers, data: bytes = None) -> tuple:
+        """
+        implement Game logic for this method
+        :param player: player we received message from
+        :return:  200 | 401
+        """
+        player: Human = self.__human_required(player, headers)
+        if not player:
+            return 'Not allowed', 401
+        plays = json.loads(data).get("request").get("plays")
+        self._logger.info(plays)
+        if not plays:
+            player.set_fold()
+        else:
+            for _play in plays:
+                num, color = _play.split(',')
+                color = Card.from_unicode(color)
+                self.__logger.debug("player's hand %s" % player.hand)
+                self._logger.debug("Searching %s / %s in player's hand" % (num, color))
+                card_found = False
+                for card in player.hand:
+                    if self._check_card(card, num, color):
+                        card_found = True
+                        self.player_give_to(player, card, player.plays)
+                        break
+                if not card_found:
+                    self._logger.critical("Card not found in player's hand")
+
+        if player.folded or player.plays:
+            player.is_action_required = False  # Game's async-loops self-synchronise with this
+        return 'OK', 200
+
+    def on_fold(self, player: str, headers, data: bytes = None) -> tuple:
+        """
+        implement Game logic for this method
+        :param player: player we received message from
+        :return:  200 | 401
+        """
+        player: Human = self.__human_required(player, headers)
+        if not player:
+            return 'Not allowed', 401
+        plays = json.loads(data).get("request").get("plays")
+        if not plays:
+            player.set_fold()
+        if player.folded or player.plays:
             player.is_action_required = False  # Game's async-loops self-synchronise with this
-            return plays
+        return 'OK', 200
+
+    def on_give(self, player: str, headers, data: bytes = None) -> tuple:
+        """
+        implement Game logic for this method
+        :param player: player we received message from
+        :return: what player gives
+        """
+        player: Human = self.get_player(player)
+        if not player or not player.is_human or not player.is_action_required:
+            return 'Not allowed', 401
+        player.plays = data
+        player.is_action_required = False  # Game's async-loops self-synchronise with this
+        return data, 200
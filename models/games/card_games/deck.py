@@ -12,7 +12,7 @@ import random
 from typing import Final
 
 from rules import CardGameRules
-from .card import Card
+from .card import Card, CARDS, RANKS, SUITS, card_id
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +20,9 @@ logger = logging.getLogger(__name__)
 class Deck:
     """ Class to hold Cards, according to rules """
     __NUMBER_OF_CARDS: Final = len(CardGameRules.VALUES) * len(CardGameRules.COLORS)
+    # Deck order of the pre-built cards (colors first, then values)
+    __ORDER: Final = tuple(CARDS[card_id(RANKS[value], SUITS[color])]
+                           for color in CardGameRules.COLORS for value in CardGameRules.VALUES)
 
     def __init__(self, rules: CardGameRules = None):
         """
@@ -28,12 +31,17 @@ class Deck:
         if not rules:
             raise ValueError("No rules given to Deck.")
         logger.info("Generating Deck of %s cards.", self.__NUMBER_OF_CARDS)
-        self.cards = [Card(value, color)
-                      for color in CardGameRules.COLORS for value in CardGameRules.VALUES]
+        self.cards = list(self.__ORDER)  # Cards are shared flyweights, only the order is ours
 
-    def shuffle(self) -> Deck:
-        """Not the most optimized shuffle"""
-        random.shuffle(self.cards)
+    @staticmethod
+    def owns(card) -> bool:
+        """ returns True if the card is one of the pre-built cards every Deck is made of """
+        return isinstance(card, Card) and CARDS[card.id] is card
+
+    def shuffle(self, rng: random.Random = random) -> Deck:
+        """Not the most optimized shuffle
+        :param rng: the table's random generator (see Game.rng), for reproducible games """
+        rng.shuffle(self.cards)
         return self
 
     def __str__(self):
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Every legal play of a hand, memoized on (hand's counts, pile's top, required cards, reversed power)
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Final, Iterable
+
+from .card import Card, NB_RANKS
+
+RANK_BITS: Final = 4  # cards of a same rank a hand key can count (up to 15)
+_RANK_MASK: Final = (1 << RANK_BITS) - 1
+LEGAL_PLAYS_CACHE: Final = 1 << 16  # memoized positions
+
+
+def hand_key(cards: Iterable[Card]) -> int:
+    """ compact summary of cards, all legality depends on : how many of each rank (RANK_BITS bits per rank) """
+    return sum(1 << card.rank * RANK_BITS for card in cards)
+
+
+def can_cover(rank: int, top: int, reverse: bool = False) -> bool:
+    """ a card of this rank can be played on top (-1 : empty pile) ; weaker cards win when reversed """
+    return top < 0 or (rank <= top if reverse else rank >= top)
+
+
+@lru_cache(maxsize=LEGAL_PLAYS_CACHE)
+def legal_plays(hand: int, top: int = -1, required: int = 0,
+                reverse: bool = False) -> tuple[tuple[int, int], ...]:
+    """
+    Every play the rules accept : required cards of a same rank, that can cover the pile's top
+    :param hand: hand_key of the player's cards
+    :param top: rank of the card on top of the pile, -1 if the pile is empty
+    :param required: cards to play, 0 if the player chooses (first to play)
+    :param reverse: weaker cards beat stronger ones (revolution)
+    :return: (rank, number of cards) of each legal play, weakest rank first
+    """
+    plays = []
+    for rank in range(NB_RANKS):
+        count = hand >> rank * RANK_BITS & _RANK_MASK
+        if not count or not can_cover(rank, top, reverse):
+            continue
+        if not required:
+            plays.extend((rank, n_cards) for n_cards in range(1, count + 1))
+        elif count >= required:
+            plays.append((rank, required))
+    return tuple(plays)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Exact endgames of PresidentGame, memoized in a transposition table
+"""
+from __future__ import annotations
+
+import random
+from collections import Counter
+from itertools import islice
+from math import factorial
+from typing import Final, Iterator
+
+from models.games.card_games.moves import RANK_BITS
+from .fast_president import FastPresident
+
+ENDGAME_CARDS: Final = 8  # AIs switch to the solver once players hold this many cards at most, altogether
+TABLE_SIZE: Final = 1 << 18  # positions the transposition table holds before it is emptied
+MAX_DEALS: Final = 24  # splits of the unknown cards solved at most ; more are sampled
+
+
+class EndgameSolver:
+    """
+    Solves FastPresident positions : every seat plays the action leading to its best place (max^n search),
+    knowing every hand. Positions are memoized on their canonical key (see key) : a position reached
+    through other plays, or by another table, is not solved twice.
+
+    Hidden hands are taken into account by expectation (see best_action) : every way the unknown cards
+    can be split between the other players is solved, weighted by its probability
+    (max_deals random deals, when there are more ways).
+    """
+
+    def __init__(self, table_size: int = TABLE_SIZE, max_deals: int = MAX_DEALS):
+        self.table: dict[tuple, tuple[int, ...]] = {}
+        self.table_size = table_size
+        self.max_deals = max_deals
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def key(state: FastPresident) -> tuple:
+        """ everything the rest of the game depends on : not the seats' past places, nor who folded once out
+        (seats out of the game hold no cards) """
+        return (tuple(state.hands), state.turn, state.top, state.required, state.owner if state.top >= 0 else -1,
+                state.passed & ~state.done, state.reverse, state.revolution, state.best_card_ends_round,
+                state.best_card_loses)
+
+    def solve(self, state: FastPresident) -> tuple[int, ...]:
+        """ places of the seats still playing, best first, when everyone plays his best """
+        if state.over:
+            return ()
+        key = self.key(state)
+        order = self.table.get(key)
+        if order is not None:
+            self.hits += 1
+            return order
+        self.misses += 1
+        seat, size = state.turn, state.sizes[state.turn]
+        order = ()
+        # plays emptying the hand first : once a play makes the seat first, there is nothing better
+        for action in sorted(state.actions(), key=lambda test: test[1] != size):
+            outcome = self.__outcome(state, action)
+            if not order or outcome.index(seat) < order.index(seat):
+                order = outcome
+                if not order.index(seat):
+                    break
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = order
+        return order
+
+    def __outcome(self, state: FastPresident, action: tuple[int, int]) -> tuple[int, ...]:
+        """ places of the seats still playing, after action """
+        seat = state.turn
+        child = state.copy()
+        child.apply(action)
+        if child.over:  # seat finished, and the last one standing with him
+            last = child.ladder[-1 - len(child.losers)]
+            return (last, seat) if seat in child.losers else (seat, last)
+        order = self.solve(child)
+        if not child.done >> seat & 1:
+            return order
+        return order + (seat,) if seat in child.losers else (seat,) + order
+
+    def best_action(self, state: FastPresident) -> tuple[int, int]:
+        """ the action of the seat to play that gives it the best expected place,
+        over every split of the cards it cannot see (see deals) """
+        actions = state.actions()
+        if len(actions) == 1:
+            return actions[0]
+        places = dict.fromkeys(actions, 0.)
+        deals = list(islice(self.deals(state), self.max_deals + 1))
+        if len(deals) > self.max_deals:  # sampled from the position : same position, same play
+            rng = random.Random(hash(self.key(state)))
+            deals = [(state.determinize(rng), 1) for _ in range(self.max_deals)]
+        for deal, weight in deals:
+            for action in actions:
+                places[action] += weight * self.__outcome(deal, action).index(state.turn)
+        return min(actions, key=places.__getitem__)
+
+    @staticmethod
+    def deals(state: FastPresident) -> Iterator[tuple[FastPresident, int]]:
+        """
+        every way to deal the observer's unknown cards to the other players still playing, as many as they hold
+        :return: (determinized state, number of card deals it stands for)
+        """
+        if not state.unknown:  # every hand is known (see FastPresident.deal)
+            yield state.copy(), 1
+            return
+        seats = [seat for seat, size in enumerate(state.sizes)
+                 if seat != state.observer and not state.done >> seat & 1]
+        ranks = sorted(Counter(state.unknown).items())
+
+        def split(index: int, room: list[int]) -> Iterator[tuple[list[int], int]]:
+            if index == len(ranks):
+                yield [0] * len(seats), 1
+                return
+            rank, count = ranks[index]
+            for shares in _shares(count, room):
+                for hands, weight in split(index + 1, [left - share for left, share in zip(room, shares)]):
+                    for position, share in enumerate(shares):
+                        hands[position] += share << rank * RANK_BITS
+                    yield hands, weight * _multinomial(count, shares)
+                    for position, share in enumerate(shares):
+                        hands[position] -= share << rank * RANK_BITS
+
+        for hands, weight in split(0, [state.sizes[seat] for seat in seats]):
+            deal = state.copy()
+            for seat, hand in zip(seats, hands):
+                deal.hands[seat] = hand
+            yield deal, weight
+
+    def clear(self) -> None:
+        self.table.clear()
+        self.hits = self.misses = 0
+
+
+def _shares(count: int, room: list[int]) -> Iterator[tuple[int, ...]]:
+    """ every way to split count cards between players, each taking at most his room """
+    if len(room) == 1:
+        if count <= room[0]:
+            yield count,
+        return
+    for share in range(min(count, room[0]) + 1):
+        for rest in _shares(count - share, room[1:]):
+            yield (share, *rest)
+
+
+def _multinomial(count: int, shares: tuple[int, ...]) -> int:
+    """ ways to give count distinct cards, shares[i] to the i-th player """
+    ways = factorial(count)
+    for share in shares:
+        ways //= factorial(share)
+    return ways
+
+
+SOLVER: Final = EndgameSolver()  # shared by the AIs : positions solved at a table serve the others
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : A fast model of PresidentGame's rounds, where hands are counts of cards per rank (AIs' searches)
+"""
+from __future__ import annotations
+
+import random
+from typing import Final, Optional
+
+from models.games.card_games.card import CARDS, NB_RANKS
+from models.games.card_games.moves import RANK_BITS, hand_key, legal_plays
+
+PASS: Final = (-1, 0)  # fold until the next round
+_RANK_MASK: Final = (1 << RANK_BITS) - 1
+
+
+class FastPresident:
+    """ PresidentGame reduced to what decides the ladder : how many cards of each rank players hold.
+
+    Rounds go as PresidentGame's : players play the required cards of a same rank, able to cover the pile,
+    or fold until the next round. A round ends when everyone folded since the last play
+    (or when the best card is played, if rules say so), and the last player to play starts the next one.
+    4 cards played at once reverse cards' power (revolution), if rules say so.
+    Players finishing with the best card lose, if rules say so : the first of them is last.
+
+    A state observed from a player's seat (see observe) does not know the others' hands :
+    determinize deals them the cards that are neither in the observer's hand nor played.
+    """
+    __slots__ = ("hands", "sizes", "turn", "top", "required", "owner", "reverse", "passed", "done", "alive",
+                 "ladder", "losers", "observer", "unknown", "revolution", "best_card_ends_round", "best_card_loses")
+
+    def __init__(self, hands: list[int], turn: int = 0, revolution: bool = True, best_card_ends_round: bool = True,
+                 best_card_loses: bool = False):
+        """
+        :param hands: each seat's hand, as moves.hand_key
+        :param turn: the seat starting the round
+        """
+        self.hands = list(hands)
+        self.sizes = [sum(hand >> rank * RANK_BITS & _RANK_MASK for rank in range(NB_RANKS)) for hand in hands]
+        self.turn = turn
+        self.top, self.required, self.owner, self.passed = -1, 0, -1, 0  # see __new_round
+        self.reverse = False
+        self.done = sum(1 << seat for seat, size in enumerate(self.sizes) if not size)  # seats out of the game
+        self.alive = len(hands) - bin(self.done).count("1")
+        self.ladder: list[int] = []  # seats, in the order they finished (everyone's place, once over)
+        self.losers: list[int] = []  # seats that finished with the best card
+        self.observer = turn
+        self.unknown: tuple[int, ...] = ()  # ranks of the cards the observer cannot see
+        self.revolution = revolution
+        self.best_card_ends_round = best_card_ends_round
+        self.best_card_loses = best_card_loses
+
+    @classmethod
+    def observe(cls, game, player) -> FastPresident:
+        """ the game, as the given player sees it on his turn
+        (cards exchanged at the start of the game are not remembered) """
+        players = game.players
+        pile = game.pile
+        rules = game.game_rules
+        state = cls([0] * len(players), players.index(player), rules.use_revolution,
+                    rules.playing_best_card_end_round, rules.finish_with_best_card_loose)
+        state.hands[state.turn] = player.hand.key
+        state.sizes = [len(test.hand) for test in players]
+        if pile:
+            state.top, state.required = pile[-1].rank, game.required_cards
+            state.owner = next((seat for seat, test in enumerate(players)
+                                if test.last_played and test.last_played[-1] is pile[-1]), -1)
+        state.reverse = game.reversed_power
+        state.passed = sum(1 << seat for seat, test in enumerate(players) if test.folded and not test.won)
+        state.done = sum(1 << seat for seat, test in enumerate(players) if test.won or not state.sizes[seat])
+        state.alive = len(players) - bin(state.done).count("1")
+        seen = {card.id for card in player.hand} | {card.id for pile_ in (*game.plays, pile) for card in pile_}
+        state.unknown = tuple(card.rank for card in CARDS if card.id not in seen)
+        return state
+
+    def copy(self) -> FastPresident:
+        state = FastPresident.__new__(FastPresident)  # attribute by attribute : searches copy states a lot
+        state.hands, state.sizes, state.turn, state.top = self.hands[:], self.sizes[:], self.turn, self.top
+        state.required, state.owner, state.reverse = self.required, self.owner, self.reverse
+        state.passed, state.done, state.alive = self.passed, self.done, self.alive
+        state.ladder, state.losers = self.ladder[:], self.losers[:]
+        state.observer, state.unknown, state.revolution = self.observer, self.unknown, self.revolution
+        state.best_card_ends_round, state.best_card_loses = self.best_card_ends_round, self.best_card_loses
+        return state
+
+    def determinize(self, rng: random.Random = random) -> FastPresident:
+        """ a copy where the cards the observer cannot see are dealt to the others, as many as they hold
+        (states where every hand is known, see deal, are only copied) """
+        state = self.copy()
+        if not self.unknown:
+            return state
+        pool = list(self.unknown)
+        rng.shuffle(pool)
+        for seat, size in enumerate(self.sizes):
+            if seat == self.observer or self.done >> seat & 1:
+                continue
+            dealt, pool = pool[:size], pool[size:]
+            state.hands[seat] = sum(1 << rank * RANK_BITS for rank in dealt)
+            state.sizes[seat] = len(dealt)
+        return state
+
+    @property
+    def best_rank(self) -> int:
+        return 0 if self.reverse else NB_RANKS - 1
+
+    @property
+    def over(self) -> bool:
+        return self.alive <= 1
+
+    def actions(self) -> list[tuple[int, int]]:
+        """ legal plays of the seat to play (rank, number of cards), weakest first ; PASS if the pile has cards """
+        plays = list(legal_plays(self.hands[self.turn], self.top, self.required, self.reverse))
+        if self.top >= 0 or not plays:
+            plays.append(PASS)
+        return plays
+
+    def default_action(self) -> tuple[int, int]:
+        """ the weakest legal play (a whole rank, if first to play), PASS if there are none """
+        plays = legal_plays(self.hands[self.turn], self.top, self.required, self.reverse)
+        if not plays:
+            return PASS
+        rank = plays[-1][0] if self.reverse else plays[0][0]
+        return (rank, self.hands[self.turn] >> rank * RANK_BITS & _RANK_MASK) if not self.required \
+            else (rank, self.required)
+
+    def apply(self, action: tuple[int, int]) -> None:
+        """ the seat to play plays action, then the next seat is to play """
+        seat = self.turn
+        if action == PASS:
+            self.passed |= 1 << seat
+        else:
+            rank, n_cards = action
+            self.hands[seat] -= n_cards << rank * RANK_BITS
+            self.sizes[seat] -= n_cards
+            self.top, self.required, self.owner = rank, n_cards, seat
+            lost = self.best_card_loses and rank == self.best_rank  # before a revolution, as PresidentGame does
+            if self.revolution and n_cards == 4:
+                self.reverse = not self.reverse
+            if not self.sizes[seat]:
+                self.__finish(seat, lost)
+                if self.over:
+                    return
+            if self.best_card_ends_round and rank == self.best_rank:
+                self.__new_round(seat)
+                return
+        self.__next()
+
+    def rollout(self, rng: random.Random = random, epsilon: float = .1) -> list[int]:
+        """ play until the end : default actions, random ones with epsilon probability
+        :return: the ladder """
+        while not self.over:
+            self.apply(rng.choice(self.actions()) if rng.random() < epsilon else self.default_action())
+        return self.ladder
+
+    def __finish(self, seat: int, lost: bool = False) -> None:
+        self.done |= 1 << seat
+        (self.losers if lost else self.ladder).append(seat)
+        self.alive -= 1
+        if self.alive == 1:  # the last one standing is last, before the losers
+            last = next(test for test in range(len(self.sizes)) if not self.done >> test & 1)
+            self.done |= 1 << last
+            self.ladder.append(last)
+            self.ladder.extend(reversed(self.losers))
+
+    def __next(self) -> None:
+        """ next seat able to play ; new round once back to the last player """
+        out = self.done | self.passed
+        seat = self.turn
+        for _ in range(len(self.sizes)):
+            seat = (seat + 1) % len(self.sizes)
+            if seat == self.owner:
+                break
+            if not out >> seat & 1:
+                self.turn = seat
+                return
+        self.__new_round(self.owner if self.owner >= 0 else self.turn)
+
+    def __new_round(self, start: int) -> None:
+        """ empty pile : start (or the next seat still in the game) plays first """
+        self.top, self.required, self.owner, self.passed = -1, 0, -1, 0
+        for offset in range(len(self.sizes)):
+            seat = (start + offset) % len(self.sizes)
+            if not self.done >> seat & 1:
+                self.turn = seat
+                return
+
+    def place(self, seat: int) -> Optional[int]:
+        """ seat's place in the ladder (0 : first), None while it has not finished """
+        return self.ladder.index(seat) if seat in self.ladder else None
+
+    @classmethod
+    def deal(cls, nb_players: int, rng: random.Random = random, **rules) -> FastPresident:
+        """ a new game : the 52 cards dealt as PresidentGame does, a random seat starts """
+        deck = list(CARDS)
+        rng.shuffle(deck)
+        return cls([hand_key(deck[seat::nb_players]) for seat in range(nb_players)],
+                   rng.randrange(nb_players), **rules)
+
+    def __repr__(self):
+        return f"FastPresident(turn={self.turn}, sizes={self.sizes}, top={self.top}x{self.required})"
@@ -6,7 +6,7 @@ IDE: PyCharm
 Creation-date: 11/19/22
 """
 import logging
-from typing import Final
+from typing import Final, Optional
 
 from models.games.card_games import Card, CardGame
 from rules import PresidentRules
@@ -16,10 +16,11 @@ from .president_rankings import PresidentRank
 class PresidentGame(CardGame):
     """ Variance of a Card Game """
 
-    def __init__(self, nb_players=0, nb_ai=3, *players_names, nb_games: int = 0, save=True):
+    def __init__(self, nb_players=0, nb_ai=3, *players_names, nb_games: int = 0, save=True,
+                 seed: Optional[int] = None):
         """ Instantiate a CardGame with President rules and functionalities """
         super(PresidentGame, self).__init__(nb_players, nb_ai, *players_names, nb_games=nb_games,
-                                            save=save)
+                                            save=save, seed=seed)
 
         self._logger.debug("instantiating PresidentGame")
         self.game_rules = PresidentRules(nb_players + nb_ai)  # Add variances rules to rules-sets
@@ -29,10 +30,12 @@ class PresidentGame(CardGame):
 
         super().set_game_name(__class__.__name__)  # Override CardGame assignation
         self._revolution = False  # on first game, always False
+        self.revolutions = 0  # revolutions that happened during current game
 
     def _initialize_game(self):
         """ PresidentGame's inits on top of CardGame's (reset most values, distribute) """
         super()._initialize_game()
+        self.revolutions = 0
         if self.game_rules.new_game_reset_revolution:
             self._revolution = False
         if self._winners:
@@ -75,7 +78,8 @@ class PresidentGame(CardGame):
             if player.rank.rank_name == "Troufion":
                 self.next_player_index = self._get_player_index(player)
         if adv > 0:  # Otherwise choose card to give
-            result = player.choose_cards_to_give()
+            result = self._human_cards(player, "give", player.choose_cards_to_give) if player.is_human \
+                else player.choose_cards_to_give()
             if result:
                 card = result[0]
                 player.add_to_hand(card)
@@ -86,6 +90,16 @@ class PresidentGame(CardGame):
         """ returns state of revolution in actual game """
         return self._revolution
 
+    @property
+    def reversed_power(self) -> bool:
+        """ during a revolution, weaker cards are the strongest """
+        return self._revolution
+
+    @property
+    def _top_to_cover(self) -> int:
+        """ during a revolution, any card can be played on the pile """
+        return -1 if self._revolution else super()._top_to_cover
+
     @property
     def skip_next_player_rule_apply(self):
         """
@@ -115,6 +129,7 @@ class PresidentGame(CardGame):
         if not self.game_rules.use_revolution:
             return
         self._revolution, self.game_rules.VALUES = not self._revolution, self.game_rules.VALUES[::-1]
+        self.revolutions += 1
 
         self.send_all("#" * 50)
         self.send_all(" ".join(["#" * 15, "!!! REVOLUTION !!!", "#" * 15]))
@@ -135,11 +150,6 @@ class PresidentGame(CardGame):
                     self.send_all(f"{player} has been assigned {rank}")
         return winners
 
-    def card_can_be_played(self, card):
-        """ Returns True if the card can be played according to pile and rules """
-        return len(self.pile) == 0 or card <= self.pile[-1] and self._revolution \
-            or super().card_can_be_played(card)  # resolve by importance
-
     def _do_play(self, index, player, cards) -> bool:
         """
         Handle PresidentGame variances in rules sets.
@@ -180,6 +190,12 @@ class PresidentGame(CardGame):
         """ colors doesn't matter in PresidentGame """
         return card.number == num
 
+    def _results(self, name) -> dict:
+        """ PresidentGame's results also count revolutions """
+        results = super()._results(name)
+        results.setdefault("revolutions", self.revolutions)
+        return results
+
     def to_json(self) -> dict:
         """ Serialize PresidentGame for communications"""
         su: dict = super().to_json()
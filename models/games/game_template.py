@@ -5,40 +5,58 @@ Project: President-Game
 IDE: PyCharm
 Creation-date: 11/10/22
 """
-import asyncio
 import json
 import logging
-import time
+import random
 from abc import abstractmethod, ABC
-from threading import Thread  # required for Background server task
-from typing import Any, Union, Optional
-
-from flask import request, make_response, Response
+from collections import deque
+from itertools import count
+from threading import Condition, Thread  # required for Background server task
+from typing import Any, Callable, Final, Mapping, Union, Optional
 
+from models.networking.communicant import Communicant
 from models.networking.db import Database
+from models.networking.delta import diff
 from models.networking.plays import GamePlay
 from models.networking.responses import Connect, Disconnect, Start, Update, Message, Question, GameUpdate
 from models.players import Player, Human, AI
 from models.utils import SerializableObject
 from rules import GameRules
-from .Errors import CheaterDetected
-from .apis.server_template import Server
+from .Errors import CheaterDetected, EndOfReplay, ReplayDiverged
 
 
-class Game(Server, SerializableObject, ABC):
+class Game(Communicant, SerializableObject, ABC):
     """ Base class of Games Hierarchy,
-     implements many functionalities for other games to run """
+     implements many functionalities for other games to run.
+     A Game is a headless engine : serving it over HTTP is done by wrapping it
+     in a models.games.apis.game_server.GameServer (see run_server) """
 
     @abstractmethod
-    def __init__(self, nb_players=0, nb_ai=3, *players_names, save=True):
-        super().__init__("Game_Server")  # test: init only when start server
+    def __init__(self, nb_players=0, nb_ai=3, *players_names, save=True, seed: Optional[int] = None):
+        """
+        :param seed: seed of the table's randomness (decks, first player, players' names),
+         the same seed, rules, seats and humans' decisions play the same games (see models.games.replay)
+        """
+        super().__init__("Game_Server")
+        self._logger = logging.getLogger(__class__.__name__)
+        self.status = self.OFFLINE
 
         self.game_name = None
         self.game_rules = GameRules(nb_players + nb_ai)
         self.__game_log = logging.getLogger(__class__.__name__)
+        self.seed: Final = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)  # every random draw of the table comes from here
+        self.actions: list[list] = []  # decisions taken during the table's life, in order (see _record)
+        self.__script: Optional[deque] = None  # decisions to take instead of asking (see replay_actions)
+        self.__origin: Optional[dict] = None  # rules and seats of the first game
+        self.__version = 0  # increases on every change players can see (see on_update)
+        self.__changed = Condition()
+        self.__infos: tuple[int, dict] = (-1, {})  # game_infos of a version
+        self.__sent: dict[str, tuple[int, dict, dict]] = {}  # last update sent to each player (see on_update)
         self.players: list[Player.__class__] = []
         self._winners: list[Player.__class__, int, GamePlay] = []
         self.losers: list[Player.__class__, int, GamePlay] = []
+        self._lost: set[int] = set()  # id of the players who lost this game, kept once merged to the ladder
         self.disconnected_players: list[Player] = []  # players logged out while game started
         self.spectators: list[Player] = []  # players that registered after game started
         self.plays: list[list] = []
@@ -52,6 +70,7 @@ class Game(Server, SerializableObject, ABC):
     @abstractmethod
     def _initialize_game(self):
         self.losers = []
+        self._lost = set()
         self.disconnected_players = []
         # as long as we can, add players for next game
         while self.spectators and len(self.players) < self.game_rules.max_players:
@@ -60,6 +79,8 @@ class Game(Server, SerializableObject, ABC):
         while len(self.players) > self.game_rules.max_players:
             for player in self.players[::-1]:
                 self.spectators.append(self.players.pop(self.players.index(player)))
+        self._on_players_changed()
+        self.__origin = self.__origin or self.__table()
         self.__game_log.info(' '.join(["#" * 15, "PREPARING NEW GAME", "#" * 15]))
         self._init_db()
 
@@ -77,21 +98,107 @@ class Game(Server, SerializableObject, ABC):
     def player_lost(self, player):
         """ Implement how to determine that a player lost from game's rules """
 
+    def _on_players_changed(self) -> None:
+        """ Called whenever players are added to / removed from the table """
+        self._changed()
+
+    def on_player_status(self, player: Player, status: str, value: bool) -> None:
+        """ Called by a player whenever one of his status
+         (_won, _folded, _played_turn, action_required) changes """
+        self._changed()
+
+    @property
+    def version(self) -> int:
+        """ Game's state version, increases every time the game changes in a way players can see """
+        return self.__version
+
+    def _changed(self) -> None:
+        """ Bump state version, waking up players waiting for an update """
+        with self.__changed:
+            self.__version += 1
+            self.__changed.notify_all()
+
+    def wait_change(self, version: int, timeout: float) -> int:
+        """
+        Block until game's state version differs from the given one
+        :param version: the last version the caller knows about
+        :param timeout: in seconds
+        :return: the current version (unchanged on timeout)
+        """
+        with self.__changed:
+            self.__changed.wait_for(lambda: self.__version != version, timeout)
+            return self.__version
+
+    # ############################ record / replay ############################
+    # A table is fully described by its seed, rules, seats and the decisions taken on it :
+    # humans' plays, and whether the table plays another game.
+
+    def _record(self, player: Optional[Player], kind: str, *values) -> None:
+        """ Keep a decision (json-able values), to be able to replay the table """
+        self.actions.append([player and player.name, kind, *values])
+
+    def _replayed(self, player: Optional[Player], kind: str) -> Optional[list]:
+        """
+        While replaying, the recorded values of the next decision (None when playing live)
+        :raise EndOfReplay: no more decisions recorded
+        :raise ReplayDiverged: the recorded decision is not this one
+        """
+        if self.__script is None:
+            return None
+        if not self.__script:
+            raise EndOfReplay(f"{kind} of {player}")
+        action = self.__script.popleft()
+        if action[:2] != [player and player.name, kind]:
+            raise ReplayDiverged(f"recorded {action[:2]}, {player} asked to {kind}")
+        self.actions.append(action)
+        return action[2:]
+
+    def replay_actions(self, actions: list[list]) -> None:
+        """ Take the given decisions (see actions) instead of asking players or rules """
+        self.__script = deque(actions)
+
+    @property
+    def replaying(self) -> bool:
+        """ True while recorded decisions are left to be taken """
+        return bool(self.__script)
+
+    def record(self) -> dict:
+        """ Everything required to play this table again (see models.games.replay) """
+        return {"game": self.game_name, "seed": self.seed, **(self.__origin or self.__table()),
+                "actions": self.actions}
+
+    def __table(self) -> dict:
+        """ current rules and seats (name, is_human) """
+        return {"rules": self.game_rules.to_json(),
+                "seats": [[player.name, player.is_human] for player in self.players]}
+
     def _init_db(self):
         """ Instantiate Database link """
-        if self.__save and not self.__db:
+        if self.__save and self.__db is None:
             self.__db = Database(self.game_name or __class__.__name__)
 
+    def close(self) -> None:
+        """ sync and close the results' journal, once the table is done (a new game opens another one) """
+        db, self.__db = self.__db, None
+        if db is not None:
+            db.close()
+
     def __register_players(self, number_of_players, number_of_ai, *players_names):
         """ Every game need to register players before they are able to play"""
         self._logger.info("registering base players")
+        # each seat has its own generator : names do not depend on the other seats being named or not
+        seats = count(len(players_names) if number_of_players else 0)
         if number_of_players:
             for name in players_names:  # Named players
                 self.register(Human(name=str(name)))
                 number_of_players -= 1
             if number_of_players > 0:  # Anonymous Players, random generation
-                [self.register(Human()) for _ in range(number_of_players)]
-        [self.register(AI()) for _ in range(number_of_ai)]  # AI Players
+                [self.register(Human(rng=self.__seat_rng(next(seats)))) for _ in range(number_of_players)]
+        [self.register(AI(rng=self.__seat_rng(next(seats)))) for _ in range(number_of_ai)]  # AI Players
+
+    def __seat_rng(self, seat: int) -> random.Random:
+        """ random generator of a seat, derived from the table's seed """
+        return random.Random(f"{self.seed}:{seat}")
 
     def __plays_to_unicode_safe(self):
         """ if there are uni unsafe strings,"""
@@ -107,18 +214,28 @@ class Game(Server, SerializableObject, ABC):
         """ set game's name to given one (use this method after you instantiated super()"""
         self.game_name = name  # Override name
 
-    def save_results(self, name) -> dict:
-        """ save game's results to db as a Document """
-        to_save = {
+    def _results(self, name) -> dict:
+        """ game's results as a Document (children may add their own fields) """
+        return {
             "game": name,
             "players": [player.name for player in self.players],
             "winners": self.winners(),
+            "rounds": self._turn,
             "plays": self.__plays_to_unicode_safe(),
         }
-        if not self.__db:
-            self.__game_log.info("Could not save. Game has been created with save = False")
+
+    def save_results(self, name) -> dict:
+        """ save game's results to db as a Document """
+        to_save = self._results(name)
+        db = self.__db  # the table may be closed meanwhile (see close)
+        if db is None:
+            if self.__save:
+                self.__game_log.warning("Could not save. The table has been closed")
+            else:
+                self.__game_log.info("Could not save. Game has been created with save = False")
             return to_save
-        self.__db.save(to_save)
+        db.save(to_save)
+        return to_save
 
     def register(self, player: Union[Human, AI, str], token: str = None) -> Player:
         """ Registers players for the game """
@@ -143,6 +260,7 @@ class Game(Server, SerializableObject, ABC):
         self._logger.debug("Reconnecting %s", player)
         player = self.disconnected_players.pop(self.disconnected_players.index(player))
         self.players.append(player)
+        self._on_players_changed()
         return player
 
     def join_game(self, player):
@@ -172,7 +290,9 @@ class Game(Server, SerializableObject, ABC):
             self.spectators.append(player) if player not in self.spectators else None
         else:
             self._logger.debug("Joining %s", player)
-            self.players.append(player) if player not in self.players else None
+            if player not in self.players:
+                self.players.append(player)
+                self._on_players_changed()
 
     def unregister(self, player: Player or str) -> None:
         """ Every game needs to register players before they are able to play"""
@@ -181,7 +301,9 @@ class Game(Server, SerializableObject, ABC):
         for i, p in enumerate(self.players):
             if p == player:
                 player = self.players.pop(i)
+                self._on_players_changed()
                 self.__game_log.info(f"{player} left the game...")
+                player.notify()  # the game might be waiting for this player
                 if self._run:  # save player ONLY if game is running.
                     self.disconnected_players.append(player)
                     self.__game_log.info("See you soon")
@@ -202,12 +324,16 @@ class Game(Server, SerializableObject, ABC):
                      "round": player_infos[1],
                      "last_play": player_infos[2]
                      } for i, player_infos in enumerate(self._winners)]
+        for player_infos, winner in zip(self._winners, rank_gen):
+            if id(player_infos[0]) in self._lost:
+                winner["lost"] = True
         return rank_gen
 
     def _reset_winner(self):
         """ reset winners and losers queue """
         self._winners = []
         self.losers = []
+        self._lost = set()
 
     def show_winners(self):
         """ send every player game's ladder """
@@ -250,98 +376,128 @@ class Game(Server, SerializableObject, ABC):
             last_played = None
         reason and self.__game_log.info("Reason : %s", reason)
         self.losers.append([player, self._turn, last_played and last_played.unicode_safe()])
+        self._lost.add(id(player))
         player.set_win()  # It just means that a player cannot play anymore for current game
 
     # ###################### SERVER IMPLEMENTATIONS TO GAME  #######################
+    # Handlers below are web-framework agnostic : they receive the player's name, the request
+    # headers and raw datas, and return make_response()-like tuples (body, status[, headers]).
+    # models.games.apis.game_server.GameServer maps them to routes (see routes()).
 
-    @abstractmethod
-    def _init_server(self, name):
-        """ Children must implement their own routes """
-        super()._init_server(name)
-
-        # ALL ROUTES LISTED BELOW ARE HUMANS INTENDED !!!! ONLY !!!!
-        @self.route(f"/{Connect.request['message']}/{Connect.REQUIRED}", methods=Connect.methods)
-        def register(player) -> Response:
-            """ route to register to a game server """
-            self.__game_log.debug("Registering %s", player)
-            if not self.get_player(player) or \
-                    (self.get_disconnected(player) and player.token == request.headers.get("token")):
-                # If previously disconnected, log back in
-                player: Human = self.register(player, request.headers.get("token"))
-                if player.is_human:
-                    player.set_game(self)
-                    return make_response('OK', 200, {'Connected': '"Registered to the game"', 'token': player.token})
-
-            return make_response('Nope', 401, {'ConnectError': '"Could not register to the game"'})
-
-        @self.route(f"/{Disconnect.request['message']}/{Disconnect.REQUIRED}", methods=Disconnect.methods)
-        def unregister(player: str) -> Response:
-            """ route to exit a game server """
-            player: Human = self.get_player(player) or self.get_spectator(player)
-            self.__game_log.debug("Disconnecting %s", player)
-            if player and player.is_human and request.headers["Content-Type"].find("json"):
-                self.__game_log.debug("Is human")
-                datas = json.loads(request.data)["headers"]
-                if player.token == datas.get("token"):
-                    self.__game_log.debug("Token OK")
-                    self.unregister(player)
-                    return make_response('OK', 200, {'Disconnected': '"Disconnected from game"'})
-                else:
-                    self.__game_log.debug("Token not OK")
-                    return make_response('Nope', 401, {'ConnectError': '"Could not Disconnect from game"'})
-            else:
-                self.__game_log.critical("%s Not human", player)
-            return make_response('Nope', 401, {'ConnectError': '"Could not Disconnect from game"'})
-
-        @self.route(f"/{Update.request['message']}/{Update.REQUIRED}", methods=Update.methods)
-        def update(player: str) -> Response:
-            """
-            Send back Game_Server status.
-            Also, if player is given, and player's token is valid, send back player's state
-            """
-            json_response: dict = {}
-            json_response.setdefault("game", self.game_infos)
-            status, player_json = self.get_player_infos(player, request.headers.get("token"))
-            json_response.setdefault("player", player_json)
-            self._logger.debug("Sending %d => %s", status, json_response)
-            return make_response(json_response, status)
-
-        @self.route(f"/{Start.request['message']}/{Start.REQUIRED}", methods=Start.methods)
-        async def start_from_player(player) -> Response:
-            """ route to register to a game server """
-            # assert request.headers["Content-Type"] == "application/json"
-            p: Human = self.get_player(player)
-            self._logger.debug("Starting game from %s", player)
-            assert hasattr(request.headers, "get")
-            self._logger.debug("token %s VS %s", request.headers.get("token"), p.token)
-            if not p or p.name != player or not p.is_human or p.token != request.headers.get("token"):
-                self._logger.warning("Player %s not allowed to start the game", player)
-                self._logger.debug("token %s VS %s", request.headers.get("token"), p.token)
-                return make_response("Not allowed", 403)
-            if not self._run:
-                self.status = self.GAME_RUNNING
-                self.__start_server_mode()  # True to override local_cli prompts
-                return make_response("SERVER_RUNNING", 200)
-            # Find a way for server or no server to play the same way
-            return make_response("Cannot start another game. Server busy.")
-
-        @self.route(f"/{GameUpdate.request['message']}/{GameUpdate.REQUIRED}", methods=GameUpdate.methods)
-        def update_game(player: str) -> Response:
-            """
-            Update and Send back Game_Server status. Game must not be running
-            Also, if player is given, and player's token is valid, send back player's state
-            """
-            if self.status == self.GAME_RUNNING:
-                status = 403
-            else:
-                status, player_json = self.get_player_infos(player, request.headers.get("token"))
-                if status == 200:
-                    _json = json.loads(request.data)
-                    # extract gameRules object from serialized json
-                    self._update_game_rules(_json.get('request', dict()).get('content', dict()))
-            return make_response("OK", status)
+    def routes(self) -> dict[type[Message], Callable[[str, Mapping, bytes], tuple]]:
+        """ Children must extend this mapping with their own routes.
+        ALL ROUTES LISTED BELOW ARE HUMANS INTENDED !!!! ONLY !!!! """
+        return {
+            Connect: self.on_connect,
+            Disconnect: self.on_disconnect,
+            Update: self.on_update,
+            Start: self.on_start,
+            GameUpdate: self.on_game_update,
+        }
 
-    ########################################################################
+    def on_connect(self, player: str, headers: Mapping, data: bytes = None) -> tuple:
+        """ route to register to a game server """
+        self.__game_log.debug("Registering %s", player)
+        disconnected = self.get_disconnected(player)
+        if not self.get_player(player) or (disconnected and disconnected.token == headers.get("token")):
+            # If previously disconnected, log back in
+            player: Human = self.register(player, headers.get("token"))
+            if player.is_human:
+                player.set_game(self)
+                return 'OK', 200, {'Connected': '"Registered to the game"', 'token': player.token}
+
+        return 'Nope', 401, {'ConnectError': '"Could not register to the game"'}
+
+    def on_disconnect(self, player: str, headers: Mapping, data: bytes = None) -> tuple:
+        """ route to exit a game server """
+        player: Human = self.get_player(player) or self.get_spectator(player)
+        self.__game_log.debug("Disconnecting %s", player)
+        if player and player.is_human and headers.get("Content-Type", "").find("json"):
+            self.__game_log.debug("Is human")
+            datas = json.loads(data)["headers"]
+            if player.token == datas.get("token"):
+                self.__game_log.debug("Token OK")
+                self.unregister(player)
+                self.__sent.pop(player.name, None)
+                return 'OK', 200, {'Disconnected': '"Disconnected from game"'}
+            self.__game_log.debug("Token not OK")
+        else:
+            self.__game_log.critical("%s Not human", player)
+        return 'Nope', 401, {'ConnectError': '"Could not Disconnect from game"'}
+
+    def on_update(self, player: str, headers: Mapping, data: bytes = None) -> tuple:
+        """
+        Send back Game_Server status.
+        Also, if player is given, and player's token is valid, send back player's state
+        If the request gives the last version it received, answers once the game changed
+         (long polling), or after Update.POLL_TIMEOUT
+        """
+        try:
+            known = int(headers.get("version"))
+        except (TypeError, ValueError):  # no version given, answer right away
+            known = None
+        if known is not None:
+            self.wait_change(known, Update.POLL_TIMEOUT)
+        version, game_json = self.version, self.game_infos
+        status, player_json = self.get_player_infos(player, headers.get("token"))
+        json_response: dict = {"version": version, "game": game_json, "player": player_json}
+        if status == 200:
+            json_response.update(self.__delta(player, known, version, game_json, player_json))
+        self._logger.debug("Sending %d => %s", status, json_response)
+        return json_response, status
+
+    def __delta(self, player: str, known: Optional[int], version: int, game_json: dict, player_json: dict) -> dict:
+        """
+        If the player received the state of the version he knows, only send what changed since then.
+        Otherwise (first update, missed responses, ...), the full state is sent.
+        Messages are events : always sent, never compared
+        """
+        player_json = dict(player_json)
+        messages = player_json.pop("messages", [])
+        last_version, last_game, last_player = self.__sent.get(player, (None, None, None))
+        self.__sent[player] = version, game_json, player_json
+        if known is None or known != last_version:
+            return {}
+        player_delta = diff(last_player, player_json)
+        player_delta["messages"] = messages
+        return {"delta": True, "game": diff(last_game, game_json), "player": player_delta}
+
+    def on_start(self, player: str, headers: Mapping, data: bytes = None) -> tuple:
+        """ route to start the game from a registered player """
+        p: Human = self.get_player(player)
+        self._logger.debug("Starting game from %s", player)
+        if not p or p.name != player or not p.is_human or p.token != headers.get("token"):
+            self._logger.warning("Player %s not allowed to start the game", player)
+            return "Not allowed", 403
+        if not self._run:
+            self.status = self.GAME_RUNNING
+            self.__start_server_mode()  # True to override local_cli prompts
+            return "SERVER_RUNNING", 200
+        # Find a way for server or no server to play the same way
+        return "Cannot start another game. Server busy.", 200
+
+    def on_game_update(self, player: str, headers: Mapping, data: bytes = None) -> tuple:
+        """
+        Update and Send back Game_Server status. Game must not be running
+        Also, if player is given, and player's token is valid, send back player's state
+        """
+        if self.status == self.GAME_RUNNING:
+            status = 403
+        else:
+            status, player_json = self.get_player_infos(player, headers.get("token"))
+            if status == 200:
+                _json = json.loads(data)
+                # extract gameRules object from serialized json
+                self._update_game_rules(_json.get('request', dict()).get('content', dict()))
+        return "OK", status
+
+    def run_server(self) -> None:
+        """ Serve this game over HTTP (the web framework is only loaded here) """
+        from .apis.game_server import GameServer
+        try:
+            GameServer(self).run_server()
+        finally:
+            self.close()
 
     def _send_player(self, player, msg, method=None):
         assert player and msg
@@ -354,25 +510,21 @@ class Game(Server, SerializableObject, ABC):
             return method and method(msg) or print(msg)
 
         if method is input:
-            self._handle_input_message(player, msg, method)
+            return self._handle_input_message(player, msg, method)
         elif method is None:
             player.messages.append(msg)
-        time.sleep(0.1)
-        asyncio.sleep(0.1)
+            self._changed()
 
     def _handle_input_message(self, player: Human, msg, method):
         req = Question().request
         req.setdefault("question", msg)
-        player.is_action_required = True
         player.messages.append(req)
-        answer = None
+        player.is_action_required = True
         self.__game_log.warning("%s(%s)", method, msg)
-        self._wait_player_action(player)
         self._logger.info("waiting for %s...\r", player)
-        while answer is None and player in self.players:
-            time.sleep(self.game_rules.tick_speed)
-            if self._last_message_received:
-                answer = self._last_message_received.get(player.plays)
+        answer = self._wait_player_action(player) or None  # routes store the answer in player.plays
+        while answer is None and player.is_action_required and player in self.players:  # still thinking
+            answer = self._wait_player_action(player) or None
         self.__game_log.warning("Done Waiting.")
         if player not in self.players:
             self.send_all(f"{player} Disconnected. Skipping turn.")
@@ -381,17 +533,38 @@ class Game(Server, SerializableObject, ABC):
     def _wait_player_action(self, player):
         """
         Waits for a player to take an action.
+        The player's routes notify the player, so the game resumes as soon as the action arrives
+        (or the player disconnects), within Message.TIMEOUT.
         :param player: the player to wait for
         :return: the player's plays
         """
         self.__game_log.info("awaiting %s to play", player)
-        timeout = Message.TIMEOUT  # in seconds
-        while player.is_action_required and timeout > 0 and player in self.players:
-            asyncio.sleep(self.game_rules.tick_speed)
-            time.sleep(self.game_rules.tick_speed)
-            timeout -= self.game_rules.tick_speed
+        player.wait_for(lambda: not player.is_action_required or player not in self.players,
+                        Message.TIMEOUT)
         return player.plays
 
+    def _send(self, player, msg):
+        """
+        Sends a message to a given player.
+        :param player: the player to send the message to
+        :param msg: the message to send
+        """
+        player.messages.append(msg)
+        self._changed()
+
+    def receive(self, msg: dict):
+        """
+        Receives a message and applies it to the game if valid.
+        :param msg: the message to receive
+        """
+        # log message depending on its type
+        if msg["message"] == "Info":
+            self._logger.info(msg["content"])
+        elif msg["message"] == "Error":
+            self._logger.error(msg["content"])
+        elif msg["message"] == "Warning":
+            self._logger.warning(msg["content"])
+
     def send_all(self, msg):
         """
         Sends a message to all human players.
@@ -426,13 +599,17 @@ class Game(Server, SerializableObject, ABC):
         }
 
     @property
-    def game_infos(self) -> (str, int, dict):
+    def game_infos(self) -> dict:
         """
         Collects information on the game.
-        :return: "MSG", status_code, game_as_json
+        Built once per state version, and shared by every player's update (do not modify)
+        :return: game_as_json
         """
-        self._logger.debug("requested game info %s", self.to_json())
-        return self.to_json()
+        version, infos = self.__infos
+        if version != self.version:
+            version, infos = self.__infos = self.version, self.to_json()
+            self._logger.debug("requested game info %s", infos)
+        return infos
 
     def get_player_infos(self, pname, token):
         """
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Rebuild a table's state by playing it again, from its record (see Game.record)
+"""
+from __future__ import annotations
+
+import logging
+from itertools import takewhile
+from typing import Callable, Optional
+
+from models.players import Human
+from .Errors import EndOfReplay, ReplayDiverged
+from .game_template import Game
+
+logger = logging.getLogger(__name__)
+
+
+def replay(record: dict, game_class: Optional[Callable[..., Game]] = None) -> Game:
+    """
+    Play a table again : same seed, rules and seats, decisions read from the record instead of asked.
+    The returned game is in the state it had when it took its last recorded decision
+    (waiting for the next one if the record stops during a game).
+    :param record: Game.record() of the table to replay
+    :param game_class: the recorded table's class (PresidentGame by default)
+    :raise ReplayDiverged: the record does not describe a game of this class
+    """
+    if game_class is None:
+        from .card_games import PresidentGame
+        game_class = PresidentGame
+    seats = record["seats"]
+    # humans are either named when the table is created (first seats), or join it afterwards (last seats)
+    first = [name for name, _ in takewhile(lambda seat: seat[1], seats)]
+    nb_ai = sum(not is_human for _, is_human in seats)
+    game = game_class(len(first), nb_ai, *first, save=False, seed=record["seed"])
+    for name, _ in seats[len(first) + nb_ai:]:
+        game.register(Human(name))
+    if [[player.name, player.is_human] for player in game.players] != seats:
+        raise ReplayDiverged(f"Could not seat {seats}")
+    game._update_game_rules(record["rules"])
+    game.status = game.GAME_RUNNING  # players' messages are kept, not printed
+    game.replay_actions(record["actions"])
+    try:
+        while game.replaying:
+            game.start(override_test=True)
+    except EndOfReplay as end:
+        logger.debug("Replay stopped before %s", end)
+    return game
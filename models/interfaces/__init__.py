@@ -6,5 +6,7 @@ IDE: PyCharm
 Creation-date: 11/10/22
 """
 
-# sub_modules MUST be in MRO order !!!
-from .interface_template import Interface
+from models.lazy import lazy_exports
+
+__all__ = ["Interface"]
+__getattr__, __dir__ = lazy_exports(__name__, {"Interface": ".interface_template"})
@@ -9,26 +9,33 @@ from __future__ import annotations
 
 import functools
 import io
+import json
 import logging
 import os
 import time
 from json import JSONDecodeError
+from concurrent.futures import Future, ThreadPoolExecutor
 from subprocess import Popen
-from typing import Any, List
+from typing import Any, Final, List, Optional
 
-import PIL.Image
 import colorama
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 
 from conf import BASEDIR, VENV_PYTHON
 from models import CardGame, utils
 from models.networking.communicant import Communicant
+from models.networking.delta import patch
 from models.networking.responses import *
 from models.players.player import Human
-from models.utils import GameFinder, SerializableClass
+from models.utils import GameFinder
 from rules import CardGameRules, PresidentRules
 
+BANNER_PATH: Final = os.path.join(os.path.dirname(__file__), "banner.txt")
+BANNER_URL: Final = "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTzA-OJMj_asPXQM-1TAlC3" \
+                    "_yn03sPkArzvMd5qglLom5-nzyOr09596kof0xauehvc31M&usqp=CAU"
+
 
 class Interface(Communicant):
     """
@@ -43,6 +50,16 @@ class Interface(Communicant):
         self.__token = None
         self.__msg_buffer = None
         self.__game_dict = {}
+        self.__version: Optional[int] = None  # last game version received
+        self.__player_dict = {}  # last player's state received
+        self.__long_poll = False
+        self.__templates: dict[type[Message], tuple[str, dict]] = {}  # method and body of each message type
+        self.__session = self.__new_session()  # keep-alive connections to the game
+        # pipelining : actions are sent by a worker, in order, while the interface keeps updating.
+        # Sessions are not thread-safe : the worker has its own
+        self.__pipeline = ThreadPoolExecutor(1, "Pipeline") if kwargs.get("pipelining") else None
+        self.__pipeline_session = self.__new_session() if self.__pipeline else None
+        self.__action: Optional[Future] = None  # last action sent by the worker
         self.__game_rules = None
         self.logger = logging.getLogger(__class__.__name__)
         self._game = None
@@ -51,6 +68,11 @@ class Interface(Communicant):
             self.__banner()
         self.__run = True
 
+    def __new_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount(f"{self._PROTOCOL}://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        return session
+
     @property
     def is_action_required(self):
         """ returns True if interface's user action is required """
@@ -73,6 +95,7 @@ class Interface(Communicant):
         if response and response.status_code == 200:
             self.__status = self.CONNECTED
             self._game = f"{uri}:{port}"  # If succeeded, we know the game exists
+            self.__version = None  # a new game : first update answers right away
             self.logger.debug(response.headers)
             if response.headers.get('token') != self.__token:
                 self.__update_token(response.headers.get('token'))
@@ -111,40 +134,88 @@ class Interface(Communicant):
         Send messages to game
         Everytime the game wants to _send a message, we have to retrieve those by
          updating
+        :param msg: the message's class, defaults to the message buffer
         """
         target = destination or self._game
         if not target:
             return self.not_found(target)
-        super()._send(target, self.__msg_buffer)
-        message = self.__msg_buffer()  # Instantiate before filling request
-        message_method, *_ = message.methods  # Gather only first element from tuple
-        message.headers = self._fill_headers(message)
-        message.request = self.__msg_buffer.request
-        self.logger.debug("{%s} // {%s} // : {%s}", message_method, message.headers, message.request)
-        self.logger.info("sending %s request to %s", message.__class__.__name__, target)
-        crypt = functools.partial(utils.xor if self.__token else str)
-        response = requests.request(
-            method=message_method,
-            url=f"{self._PROTOCOL}://{target}/{message.request['message']}/{self.__player.name}",
-            headers=message.headers,  # utils.xor(data, token)
+        prepared = self.__prepare(target, msg or self.__msg_buffer)
+        self.__msg_buffer = None
+        return self.__perform(target, *prepared)
+
+    def _send_pipelined(self, msg: type[Message]) -> Future | Response | None:
+        """
+        Send a message without waiting for the answer (when the interface pipelines requests).
+        Messages sent this way go out in order, on the interface's connections.
+        :return: the Future of the response (or the response itself when not pipelining)
+        """
+        if not self.__pipeline:
+            return self._send(msg=msg)
+        if not self._game:
+            return self.not_found(self._game)
+        self.__action = self.__pipeline.submit(self.__perform, self._game, *self.__prepare(self._game, msg),
+                                               session=self.__pipeline_session)
+        self.__action.add_done_callback(functools.partial(self.__on_action_sent, msg))
+        return self.__action
+
+    def __on_action_sent(self, msg: type[Message], action: Future) -> None:
+        """ nobody waits on pipelined actions : their failures are reported here """
+        error = action.exception()
+        if error is None:
+            return
+        self.__status = self.DISCONNECTED
+        self.logger.error("%s could not be sent to %s : %s", msg.__name__, self._game, error)
+
+    @property
+    def status(self) -> Optional[int]:
+        """ the interface's connection status (CONNECTED, DISCONNECTED, ...) """
+        return self.__status
+
+    @property
+    def action_in_flight(self) -> bool:
+        """ True while the last pipelined action has not been answered """
+        return self.__action is not None and not self.__action.done()
+
+    def __prepare(self, target: str, msg: type[Message]) -> tuple[str, str, dict, bytes]:
+        """ method, url, headers and body of a message, from the templates of its type """
+        super()._send(target, msg)
+        template = self.__templates.get(msg)
+        if template is None:  # first message of its type : scan its class once
+            template = self.__templates[msg] = (msg.methods[0], msg().to_json())
+        method, body = template
+        headers = self._fill_headers(msg)
+        body = dict(body, headers=headers, request=msg.request)
+        self.logger.debug("{%s} // {%s} // : {%s}", method, headers, msg.request)
+        self.logger.info("sending %s request to %s", msg.__name__, target)
+        headers["Content-Type"] = "application/json"
+        # serialized now : message classes' requests are shared, and modified by the next message
+        return method, f"{self._PROTOCOL}://{target}/{msg.request['message']}/{self.__player.name}", \
+            headers, json.dumps(body).encode('utf-8')
+
+    def __perform(self, target: str, method: str, url: str, headers: dict, data: bytes,
+                  session: Optional[requests.Session] = None) -> Response:
+        """ send a prepared request, on the interface's keep-alive connections (or the given session's) """
+        response = (session or self.__session).request(
+            method=method,
+            url=url,
+            headers=headers,  # utils.xor(data, token)
             cert=None,  # yet...
-            json=message.to_json(),  # utils.xor(data, token)
+            data=data,  # utils.xor(data, token)
         )
         self.logger.debug("Received %s, %s, %s", response.status_code, response.headers, response.content)
-        self.__msg_buffer = None
         return response if response.status_code != 500 else self.not_found(target)
 
-    def _fill_headers(self, msg: SerializableClass) -> dict:
+    def _fill_headers(self, msg: type[Message]) -> dict:
         """
-        Complete 'msg.request' with required information
+        Complete the message type's headers with required information
         :param msg: Any Message class
-        :return:
+        :return: the headers to send
         """
-        # instantiate message buffer to memory, so any modification is not in file
-        _j = msg.to_json()
-        _request = _j.get("headers")
+        _request = dict(msg.headers)  # copy, so the class's template is left untouched
         _request["player"] = self.__player.name
         _request["token"] = self.__token
+        if "version" in _request and self.__long_poll and self.__version is not None:
+            _request["version"] = str(self.__version)  # long polling and deltas (see Update)
         return _request
 
     def update(self):
@@ -164,10 +235,15 @@ class Interface(Communicant):
         try:
             # if response and response.headers["Content-Type"] == "application/json":
             _json = response.json()
-            self.__game_dict = _json['game']
+            self.__version = _json.get('version')
+            if _json.get('delta'):  # only what changed since our version
+                patch(self.__game_dict, _json['game'])
+                patch(self.__player_dict, _json['player'])
+            else:
+                self.__game_dict, self.__player_dict = _json['game'], _json['player']
             self.__serialize_game()
             if response.status_code == 200:
-                self.__serialize_player(_json=_json['player'])
+                self.__serialize_player(_json=self.__player_dict)
             self.logger.debug("do i have to play ? => %s ", self.__player.is_action_required)
 
         except JSONDecodeError as ex:
@@ -179,8 +255,11 @@ class Interface(Communicant):
     def __get_update(self):
         self.__msg_buffer = Update
         self.__msg_buffer.request.update({"content": self.__player.name})
-        res = self._send()
-        return res
+        self.__long_poll = True
+        try:
+            return self._send()
+        finally:
+            self.__long_poll = False
 
     def send_start_game_signal(self):
         """ send server a signal to run a game """
@@ -214,7 +293,9 @@ class Interface(Communicant):
             self._send()
 
     def request_player_action(self):
-        """ send player a play request """
+        """ send player a play request (not while the previous one is still on its way) """
+        if self.action_in_flight:
+            return
         plays = self.__player.play(required_cards=self.__game_dict.get("required_cards"))
         if plays:
             self.__msg_buffer = Play
@@ -223,7 +304,8 @@ class Interface(Communicant):
             self.__msg_buffer = Update
         if self.__player.folded:
             self.__msg_buffer = Fold
-        self._send()
+        msg, self.__msg_buffer = self.__msg_buffer, None
+        self._send_pipelined(msg)
 
     def __update_token(self, token):
         """ update player token to given one"""
@@ -308,41 +390,38 @@ class Interface(Communicant):
         self.__token = input("Token ?")
 
     def __banner(self):
-        ascii_map = ["@", "#", "$", "%", "?", "!", "*", "+", ":", ",", ".", ".", "."]
-        banner_width = 75
-        max_lines = 25
-
-        def pixel_to_ascii(img):
-            pixels = img.getdata()
-            ascii_str = ""
-            ascii_map.reverse()
-            for pixel in pixels:
-                ascii_str += ascii_map[(pixel // (255 // len(ascii_map))) % len(ascii_map)]
-            return ascii_str
-
+        """ print the ascii banner, pre-rendered to BANNER_PATH : no network, no image decoding """
         try:
-            self.logger.info("Preparing Interface ... ")
-            req = requests.get(
-                "https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcTzA-OJMj_asPXQM-1TAlC3"
-                "_yn03sPkArzvMd5qglLom5-nzyOr09596kof0xauehvc31M&usqp=CAU",
-                stream=True, timeout=5)
-            self.logger.info("self assigning : %d", req.status_code)
-            image_bytes = io.BytesIO(req.content)
-            self.logger.info("Transposing ...")
-            image = PIL.Image.open(image_bytes)
-            self.logger.info("Transforming ...")
-            image = image.convert(mode="L")  # GreyScales
-            self.logger.info("Resizing ...")
-            image = image.resize((banner_width, max_lines))
-            self.logger.info("Manipulating ...")
-            banner = pixel_to_ascii(image)
-            self.logger.debug("Printing ...")
-            prev = 0
-            for line in range(0, max_lines):
-                Interface.print(banner[prev:line * banner_width])
-                prev = line * banner_width
-        except Exception as ex:
-            self.logger.critical(ex)
+            with open(BANNER_PATH, 'r', encoding='utf-8') as fp:
+                Interface.print(fp.read())
+        except OSError as ex:
+            self.logger.warning("No banner : %s", ex)
+
+    @staticmethod
+    def render_banner(source: str = BANNER_URL, width: int = 75, lines: int = 25,
+                      path: str = BANNER_PATH) -> str:
+        """
+        Render an image as ascii art, and save it as the interface's banner.
+        Only used to change the banner : the image libraries are only loaded here.
+        :param source: the image's url or file path
+        :return: the banner rendered
+        """
+        import PIL.Image
+
+        if source.startswith(("http://", "https://")):
+            image_bytes = io.BytesIO(requests.get(source, timeout=5).content)
+        else:
+            image_bytes = open(source, 'rb')
+        with image_bytes:
+            image = PIL.Image.open(image_bytes).convert(mode="L").resize((width, lines))  # GreyScales
+        ascii_map = ".,:+*!?%$#@"  # from dark to bright pixels (terminals are dark)
+        # one character per grey level, so the whole image is translated at once
+        greys = bytes(ord(ascii_map[grey * len(ascii_map) // 256]) for grey in range(256))
+        pixels = image.tobytes().translate(greys).decode('ascii')
+        banner = "\n".join(pixels[line * width:(line + 1) * width] for line in range(lines))
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write(banner + "\n")
+        return banner
 
     def __exit__(self, _type, value, traceback):
         try:
@@ -365,6 +444,9 @@ class Interface(Communicant):
 
     def __del__(self):
         self.disconnect()
+        if self.__pipeline:
+            self.__pipeline.shutdown(wait=True)
+        self.__session.close()
 
     def find_game(self) -> int:
         """
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Lazy re-exports for packages (PEP 562)
+"""
+from __future__ import annotations
+
+import importlib
+from typing import Callable
+
+
+def lazy_exports(package: str, exports: dict[str, str]) -> tuple[Callable[[str], object], Callable[[], list]]:
+    """
+    Re-export names of sub-modules, imported on first access only.
+    Importing the engine (Card, PresidentGame, ...) does not load the web, client or storage layers.
+    :param package: the package's __name__
+    :param exports: exported name -> relative module holding it (".card_game", ...)
+    :return: the package's __getattr__ and __dir__
+
+    >>> __getattr__, __dir__ = lazy_exports(__name__, {"Card": ".card_game"})
+    """
+    namespace = importlib.import_module(package).__dict__
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        namespace[name] = value  # next access is a plain attribute
+        return value
+
+    def __dir__() -> list:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
@@ -1,5 +1,15 @@
-from .communicant import Communicant
-from .db import Database
-from .mongo_connector import MongoConnector
-from .plays import GamePlay
-from .responses import Connect, Disconnect, Give, Play, Fold, Update, Message, AnomalyDetected
+
+from models.lazy import lazy_exports
+
+__all__ = ["Communicant", "Database", "Archive", "ArchiveWriter", "diff", "patch", "MongoConnector", "GamePlay",
+           "Connect", "Disconnect", "Give", "Play", "Fold", "Update", "Message", "AnomalyDetected"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Communicant": ".communicant",
+    "Database": ".db",
+    "Archive": ".archive", "ArchiveWriter": ".archive",
+    "diff": ".delta", "patch": ".delta",
+    "MongoConnector": ".mongo_connector",  # pymongo
+    "GamePlay": ".plays",
+    **dict.fromkeys(("Connect", "Disconnect", "Give", "Play", "Fold", "Update", "Message", "AnomalyDetected"),
+                    ".responses"),
+})
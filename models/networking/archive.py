@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Compact binary archive of games' results, read through mmap
+
+python -m models.networking.archive archive.pga Saves/PresidentGame/*.ndjson
+"""
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import struct
+import sys
+from array import array
+from typing import Final, Generator, Iterable
+
+from models.games.card_games.card import CARDS
+
+# Layout (little-endian) :
+#   header      magic, number of games, dictionary's offset, index's offset
+#   games       one record per game, see _GAME / _WINNER
+#   dictionary  json : lineups (game's name, players' names, and ranked names that left the table)
+#               and grades, referenced by records
+#   index       offset of each game's record (u64), to seek to any game without reading the others
+_MAGIC: Final = b"PGA2"
+_HEADER: Final = struct.Struct("<4sIQQ")
+_GAME: Final = struct.Struct("<IBHBH")  # lineup, winners, rounds, revolutions, piles (then winners and piles)
+_WINNER: Final = struct.Struct("<BHBBB")  # seat, round, last card played, grade, flags (see _FLAGS)
+_OFFSET: Final = struct.Struct("<Q")
+_NONE: Final = 0xFF  # no card / grade / revolutions
+_NO_ROUNDS: Final = 0xFFFF  # rounds were not saved (results older than the rounds count)
+_FLAGS: Final = ("lost", "best_card")  # winners' flags, as bits of their flags' byte
+_CARD_BYTE: Final = {card.unicode_safe(): card.id for card in CARDS}  # one byte per card
+_CARD_NAME: Final = tuple(card.unicode_safe() for card in CARDS)
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveWriter:
+    """ Write games' results (see Game.save_results) to an archive, one at a time.
+    Only the dictionary and the index are kept in memory, written on close.
+
+    with ArchiveWriter("results.pga") as archive:
+        [archive.append(result) for result in Database.load(journal)]
+    """
+
+    def __init__(self, path: str):
+        self.path: Final = path
+        self.__fp = open(path, 'wb')
+        self.__fp.write(bytes(_HEADER.size))  # written on close, once everything is known
+        self.__lineups: dict[tuple[str, tuple, tuple], int] = {}
+        self.__grades: dict[str, int] = {}
+        self.__index = array('Q')
+
+    def append(self, result: dict) -> None:
+        """ archive a game's result """
+        players, winners, plays = result["players"], result["winners"], result["plays"]
+        gone = tuple(dict.fromkeys(winner["player"] for winner in winners if winner["player"] not in players))
+        seats = {name: seat for seat, name in enumerate((*players, *gone))}
+        lineup = self.__lineups.setdefault((result["game"], tuple(players), gone), len(self.__lineups))
+        rounds, revolutions = result.get("rounds"), result.get("revolutions")
+        record = bytearray(_GAME.pack(lineup, len(winners), _NO_ROUNDS if rounds is None else rounds,
+                                      _NONE if revolutions is None else revolutions, len(plays)))
+        for winner in winners:
+            grade, last_play = winner.get("grade"), winner.get("last_play")
+            if last_play is not None and last_play not in _CARD_BYTE:
+                logger.warning("%s's last play %r is not a card, archived as none", winner["player"], last_play)
+            record += _WINNER.pack(seats[winner["player"]], winner["round"],
+                                   _CARD_BYTE.get(last_play, _NONE),
+                                   _NONE if grade is None else self.__grades.setdefault(grade, len(self.__grades)),
+                                   sum(1 << bit for bit, flag in enumerate(_FLAGS) if winner.get(flag)))
+        for pile in plays:  # rounds are length-prefixed runs of cards
+            record.append(len(pile))
+            record += bytes(_CARD_BYTE[card] for card in pile)
+        self.__index.append(self.__fp.tell())
+        self.__fp.write(record)
+
+    def close(self) -> None:
+        """ write dictionary, index and header : the archive is readable from now on """
+        if self.__fp.closed:
+            return
+        dictionary_offset = self.__fp.tell()
+        self.__fp.write(json.dumps({"lineups": list(self.__lineups),
+                                    "grades": list(self.__grades)},
+                                   ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        index_offset = self.__fp.tell()
+        if sys.byteorder == "big":
+            self.__index.byteswap()
+        self.__index.tofile(self.__fp)
+        self.__fp.seek(0)
+        self.__fp.write(_HEADER.pack(_MAGIC, len(self.__index), dictionary_offset, index_offset))
+        self.__fp.close()
+
+    def __len__(self) -> int:
+        return len(self.__index)
+
+    def __enter__(self) -> ArchiveWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Archive:
+    """ Read-only, memory-mapped archive of games' results (see ArchiveWriter)
+    archive[k] only reads the k-th game's record, whatever the archive's size.
+    Vectorized readers (see models.analytics) decode records straight from buffer,
+    at the offsets listed by the index.
+    """
+    GAME: Final = _GAME
+    WINNER: Final = _WINNER
+    NONE: Final = _NONE
+    NO_ROUNDS: Final = _NO_ROUNDS
+    FLAGS: Final = _FLAGS
+
+    def __init__(self, path: str):
+        self.path: Final = path
+        with open(path, 'rb') as fp:
+            self.__map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.__length, dictionary_offset, self.__index = _HEADER.unpack_from(self.__map)
+        if magic != _MAGIC:
+            self.__map.close()
+            raise ValueError(f"{path} is not a games archive")
+        dictionary = json.loads(self.__map[dictionary_offset:self.__index])
+        self.__lineups: list[tuple[str, list[str], list[str]]] = [
+            (game, players, players + gone) for game, players, gone in dictionary["lineups"]]
+        self.__grades: list[str] = dictionary["grades"]
+        self.__end = dictionary_offset
+
+    @staticmethod
+    def write(path: str, results: Iterable[dict]) -> Archive:
+        """ archive every given result, and open the archive """
+        with ArchiveWriter(path) as writer:
+            for result in results:
+                writer.append(result)
+        return Archive(path)
+
+    @property
+    def buffer(self) -> mmap.mmap:
+        """ the archive's bytes """
+        return self.__map
+
+    @property
+    def index_offset(self) -> int:
+        """ where the index (one u64 record offset per game) starts in buffer """
+        return self.__index
+
+    @property
+    def lineups(self) -> list[tuple[str, list[str], list[str]]]:
+        """ game's name, players' names and seats' names (players, then those who left) of each lineup """
+        return self.__lineups
+
+    @property
+    def grades(self) -> list[str]:
+        return self.__grades
+
+    def offset(self, index: int) -> int:
+        """ where the index-th game's record starts """
+        if index < 0:
+            index += self.__length
+        if not 0 <= index < self.__length:
+            raise IndexError("archive index out of range")
+        return _OFFSET.unpack_from(self.__map, self.__index + index * _OFFSET.size)[0]
+
+    def __getitem__(self, index: int) -> dict:
+        """ the index-th game's result, as it was saved """
+        return self.__read(self.offset(index))[0]
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        """ every result, in order (records are contiguous : the index is not read) """
+        offset = _HEADER.size
+        while offset < self.__end:
+            result, offset = self.__read(offset)
+            yield result
+
+    def __read(self, offset: int) -> tuple[dict, int]:
+        """ decode the record at offset : (result, next record's offset) """
+        buffer = self.__map
+        lineup, nb_winners, rounds, revolutions, nb_piles = _GAME.unpack_from(buffer, offset)
+        offset += _GAME.size
+        game, players, names = self.__lineups[lineup]
+        winners = []
+        for rank in range(1, nb_winners + 1):
+            seat, round_, card, grade, flags = _WINNER.unpack_from(buffer, offset)
+            offset += _WINNER.size
+            winner = {"player": names[seat], "rank": rank, "round": round_,
+                      "last_play": None if card == _NONE else _CARD_NAME[card]}
+            if grade != _NONE:
+                winner["grade"] = self.__grades[grade]
+            winner.update((flag, True) for bit, flag in enumerate(_FLAGS) if flags >> bit & 1)
+            winners.append(winner)
+        plays = []
+        for _ in range(nb_piles):
+            size = buffer[offset]
+            plays.append([_CARD_NAME[card] for card in buffer[offset + 1:offset + 1 + size]])
+            offset += 1 + size
+        result = {"game": game, "players": list(players), "winners": winners, "rounds": rounds, "plays": plays}
+        if rounds == _NO_ROUNDS:
+            del result["rounds"]
+        if revolutions != _NONE:
+            result["revolutions"] = revolutions
+        return result, offset
+
+    def __len__(self) -> int:
+        return self.__length
+
+    def close(self) -> None:
+        self.__map.close()
+
+    def __enter__(self) -> Archive:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+if __name__ == '__main__':
+    from models.networking.db import Database
+
+    def _journals():
+        for journal in sys.argv[2:]:
+            yield from Database.load(journal)
+
+    with Archive.write(sys.argv[1], _journals()) as archive:
+        print(f"{len(archive)} games archived to {archive.path}")
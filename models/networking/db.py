@@ -6,71 +6,128 @@ IDE: PyCharm
 Creation-date: 11/02/22
 
 """
+from __future__ import annotations
 
 import json
 import logging
 import os.path
+from array import array
 from json import JSONDecodeError
-from typing import Final, IO
+from typing import Final, Generator, Optional
 
 
 class Database:
-    """ Emulate MongoDB as a simple json file
+    """ Emulate MongoDB as a simple journal file
     MongoDB requires at least Docker to run, a fully installed version, or a server.
-    To keep some simplicity in this program, it is going to be saved in memory, until game ends.
-    Then, will be print to a file, once the game is over (even after keyboard interrupts).
+    To keep some simplicity in this program, results are appended to a local journal :
+     ./Saves/<game_name>/results-N.ndjson, one json document per line.
+
+    Saving only appends a line, whatever the number of results already saved,
+    and nothing is kept in memory but each document's offset in the journal (random access).
+    Lines are flushed to the system on every save, and fsync'ed by batches (see sync_every).
     """
+    SYNC_EVERY: Final = 16  # saves between two fsync
 
-    def __init__(self, game_name: str, online: bool = False):
+    def __init__(self, game_name: str, online: bool = False, sync_every: int = SYNC_EVERY):
         self.__online = online
         if online:
             return
         self.__dir: Final = f"./Saves/{game_name}"
         self.__init_dirs()
-        self.__data = []
-        self.__fp = None
         self.__logger = logging.getLogger(__class__.__name__)
         self.__name: Final = "results"
-        self.__file = self.__new_save()
-        with open(self.__file, 'w') as fp:  # with handle errors on its own.
-            json.dump(self.__data, fp)
-        try:
-            self.__fp = self.__renew_fp()
-            self.__data = json.load(self.__fp)
-        except JSONDecodeError:
-            self.__data = []
+        self.__file: Final = self.__new_save()
+        self.__fp = open(self.__file, 'ab')
+        self.__offsets = array('Q')  # offset of each document in the journal
+        self.__sync_every = max(1, sync_every)
+        self.__unsynced = 0
+
+    @property
+    def path(self) -> Optional[str]:
+        """ the journal's path (None when online) """
+        return None if self.__online else self.__file
 
     def save(self, datas: dict):
         """
-        append datas to self then save to DB
+        append datas to the journal
         :param datas: datas to save
         :return: None
         """
         if self.__online:
             return
-        self.__data.append(datas)
-        self.__save()
-
-    def __save(self):
-        self.__logger.debug("saving %s", self.__data)  # data to set for print
-        self.__renew_fp()
+        self.__logger.debug("saving %s", datas)
+        line = json.dumps(datas, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
         try:
-            json.dump(self.__data, self.__fp)
-        except IOError:
+            offset = self.__fp.tell()
+            self.__fp.write(line)
+            self.__fp.flush()
+        except (IOError, ValueError):  # ValueError : journal closed
             self.__logger.critical("Could not save to DB")
-        finally:
-            self.__fp.close()
+            return
+        self.__offsets.append(offset)
+        self.__unsynced += 1
+        if self.__unsynced >= self.__sync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """ make sure every saved document reached the disk """
+        if self.__online or self.__fp.closed or not self.__unsynced:
+            return
+        self.__fp.flush()
+        os.fsync(self.__fp.fileno())
+        self.__unsynced = 0
 
-    def __renew_fp(self) -> IO:
-        if self.__fp:
-            self.__fp.close()
-        # keep fp alive, so it acts like a "Lock"
-        self.__fp = open(self.__file, 'w+', encoding='utf-8')
-        return self.__fp
+    def close(self) -> None:
+        """ sync then close the journal, further saves are lost """
+        if self.__online or self.__fp.closed:
+            return
+        self.sync()
+        self.__fp.close()
+
+    def __len__(self) -> int:
+        return 0 if self.__online else len(self.__offsets)
+
+    def __getitem__(self, index: int) -> dict:
+        """ read back the index-th document saved by this Database """
+        offset = self.__offsets[index]
+        with open(self.__file, 'rb') as fp:
+            fp.seek(offset)
+            return json.loads(fp.readline())
+
+    def __iter__(self) -> Generator[dict, None, None]:
+        return self.load(self.__file) if not self.__online else iter(())
+
+    @staticmethod
+    def load(path: str) -> Generator[dict, None, None]:
+        """
+        Lazily read the results saved in a journal, one document at a time.
+        Saves made before journals existed (a json list) are read as well,
+        and so are MongoDB exports (mongoexport : one document per line, or --jsonArray).
+        A truncated last line (crash while saving) is ignored.
+        """
+        if path.endswith(".json"):
+            with open(path, 'rb') as fp:
+                is_list = fp.read(64).lstrip().startswith(b'[')
+        if path.endswith(".json") and is_list:
+            with open(path, 'r', encoding='utf-8') as fp:
+                try:
+                    yield from json.load(fp)
+                except JSONDecodeError:
+                    logging.getLogger(__class__.__name__).warning("%s is not a valid save", path)
+            return
+        with open(path, 'rb') as fp:
+            for line in fp:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except JSONDecodeError:
+                    logging.getLogger(__class__.__name__).warning("%s : truncated document ignored", path)
+                    return
 
     def __new_save(self):
         save = None
-        for save in (f"./{self.__dir}/{self.__name}-{i}.json" for i in range(99999)):
+        for save in (f"./{self.__dir}/{self.__name}-{i}.ndjson" for i in range(99999)):
             if not os.path.exists(save):
                 break
         return save
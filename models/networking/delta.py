@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Encode a json state as the changes from a previous one, and apply those changes
+"""
+from __future__ import annotations
+
+from typing import Final
+
+APPEND: Final = "+"  # {field: items appended to the list}
+REMOVE: Final = "-"  # [fields removed]
+
+
+def diff(old: dict, new: dict) -> dict:
+    """
+    Top-level fields of new that differ from old.
+    Lists that only grew (plays, pile, winners, ...) are sent as their new items.
+    :return: a delta, that patch(old, delta) turns into new
+    """
+    delta = {}
+    for key, value in new.items():
+        if key not in old:
+            delta[key] = value
+            continue
+        before = old[key]
+        if before == value:
+            continue
+        if isinstance(value, list) and isinstance(before, list) \
+                and len(before) < len(value) and value[:len(before)] == before:
+            delta.setdefault(APPEND, {})[key] = value[len(before):]
+        else:
+            delta[key] = value
+    removed = [key for key in old if key not in new]
+    if removed:
+        delta[REMOVE] = removed
+    return delta
+
+
+def patch(state: dict, delta: dict) -> dict:
+    """ apply a delta (see diff) to state, in place
+    :return: state """
+    for key, value in delta.items():
+        if key == APPEND:
+            for field, items in value.items():
+                state.setdefault(field, []).extend(items)
+        elif key == REMOVE:
+            for field in value:
+                state.pop(field, None)
+        else:
+            state[key] = value
+    return state
@@ -1,51 +1,171 @@
+import atexit
 import logging
+import queue
+import threading
+import time
 from os import getenv
 from pprint import pprint
-from typing import Dict, List
+from typing import Dict, Final, List, Optional
 from urllib.parse import quote_plus
 
-import pymongo
 from coloredlogs.converter import html_encode
-from pymongo.errors import OperationFailure
+from pymongo.errors import OperationFailure, PyMongoError
 from pymongo.mongo_client import MongoClient
 
 from models.networking.db import Database
 
+_STOP, _FLUSH = object(), object()  # writer's control messages
+
 
 class MongoConnector(Database):
-    __client: MongoClient = None
+    """ Saves games' results to MongoDB, without making the game wait for the server.
 
-    def __init__(self, game_name: str, online: bool = True):
-        # encode the username and password to bytes and then URL-encode them
-        name = html_encode(getenv("DB_USER"))
-        password = html_encode(getenv("DB_PASS"))
-        db_name = getenv("DB_NAME")
-        db_port = int(getenv("DB_PORT", 27017))
+    Documents are queued, then written by a background thread with insert_many,
+    every batch_size documents or flush_interval seconds (whichever comes first).
+    When the queue is full, save waits up to put_timeout (backpressure), then saves locally.
+    Batches MongoDB could not take are spilled to the local journal (see Database),
+    and the server is left alone for RETRY_DELAY seconds.
+    Connectors to the same server share one (pooled, thread-safe) MongoClient.
+    """
+    BATCH_SIZE: Final = 64
+    FLUSH_INTERVAL: Final = 1.  # seconds
+    QUEUE_SIZE: Final = 1024
+    PUT_TIMEOUT: Final = 1.  # seconds
+    RETRY_DELAY: Final = 30.  # seconds
+    __clients: dict[tuple[str, int], MongoClient] = {}
+    __clients_lock = threading.Lock()
 
+    def __init__(self, game_name: str, client: Optional[MongoClient] = None,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 queue_size: int = QUEUE_SIZE, put_timeout: float = PUT_TIMEOUT):
+        """
+        Always online : to save locally only, use a Database
+        :param game_name: the collection results are saved to
+        :param client: MongoClient to use (or any stand-in), defaults to the shared client
+        """
+        super().__init__(game_name, online=True)  # the local journal is only opened when needed
         self.__logger = logging.getLogger(__class__.__name__)
+        self.__game_name = game_name
+        self.__client = client if client is not None else self.shared_client()
+        # use a database named "games", unless told otherwise
+        self.__db = self.__client.get_database(getenv("DB_NAME", "games"))
+        # use the defined collection in the database according to the game that started
+        self.__game_collection = self.__db[game_name]
+
+        self.__batch_size = max(1, batch_size)
+        self.__flush_interval = flush_interval
+        self.__put_timeout = put_timeout
+        self.__unreachable_until = 0.
+        self.__journal: Optional[Database] = None
+        self.__journal_lock = threading.Lock()
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__closed = False
+        self.__writer = threading.Thread(target=self.__run, name=f"MongoWriter-{game_name}", daemon=True)
+        self.__writer.start()
+        atexit.register(self.close)
 
+    @classmethod
+    def shared_client(cls) -> MongoClient:
+        """ The MongoClient of the server configured by the environment, created once per process """
+        # encode the username and password to bytes and then URL-encode them
+        name = html_encode(getenv("DB_USER", ""))
+        password = html_encode(getenv("DB_PASS", ""))
+        db_port = int(getenv("DB_PORT", 27017))
         # Create the connection string
-        uri = "mongodb://%s:%s@%s" % (
-            quote_plus(name), quote_plus(password), "localhost")
-        # Create a new client and connect to the server
-        with pymongo.timeout(3):
-            self.__client = MongoClient(uri, db_port)
+        uri = "mongodb://%s:%s@%s" % (quote_plus(name), quote_plus(password), "localhost")
+        with cls.__clients_lock:
+            if (uri, db_port) not in cls.__clients:
+                # connects lazily, in the background : nothing here waits for the server
+                cls.__clients[uri, db_port] = MongoClient(uri, db_port, serverSelectionTimeoutMS=3000)
+            return cls.__clients[uri, db_port]
 
-        # Send a ping to confirm a successful connection
-        try:
-            with pymongo.timeout(3):
-                self.__client.admin.command('ping')
-            print("Pinged your deployment. You successfully connected to MongoDB!")
-        except Exception as e:
-            super().__init__(game_name)
-            self.__logger.critical("Failed to connect to mongo")
+    @property
+    def journal(self) -> Optional[Database]:
+        """ the local journal holding what could not be saved to MongoDB (None if nothing was) """
+        return self.__journal
+
+    # ############################ background writer ############################
+
+    def save(self, datas: List | Dict):
+        """ queue result documents (a dict or a list of dicts), written to MongoDB in the background """
+        if type(datas) is dict:
+            datas = [datas]
+        elif type(datas) is not list:
+            raise TypeError("data must be a list or a dict")
+        for doc in datas:
+            try:
+                if self.__closed:
+                    raise queue.Full
+                self.__queue.put(doc, timeout=self.__put_timeout)
+            except queue.Full:
+                self.__logger.warning("MongoDB writer is late, saving locally")
+                self.__spill([doc])
+
+    def flush(self) -> None:
+        """ wait until every queued document has been written (to MongoDB or locally) """
+        if not self.__closed:
+            self.__queue.put(_FLUSH)
+            self.__queue.join()
+
+    def close(self) -> None:
+        """ write what is queued, then stop the writer """
+        if self.__closed:
             return
+        self.__closed = True
+        atexit.unregister(self.close)
+        self.__queue.put(_STOP)
+        self.__writer.join()
+        if self.__journal:
+            self.__journal.close()
 
-        # use a database named "games"
-        self.__db = self.__client.get_database(db_name)
+    def __run(self) -> None:
+        batch, taken, deadline = [], 0, 0.
+        while True:
+            try:
+                item = self.__queue.get(timeout=max(0., deadline - time.monotonic()) if batch else None)
+                taken += 1
+            except queue.Empty:
+                item = _FLUSH  # flush_interval elapsed
+            if item is not _FLUSH and item is not _STOP:
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.__flush_interval
+                if len(batch) < self.__batch_size:
+                    continue
+            try:
+                if batch:
+                    self.__write(batch)
+            except Exception as err:  # the writer outlives anything : flush and close wait for it
+                self.__logger.exception("Could not save %d documents (%s)", len(batch), err)
+            finally:
+                batch = []
+                for _ in range(taken):
+                    self.__queue.task_done()
+                taken = 0
+            if item is _STOP:
+                return
 
-        # use the defined collection in the database according to the game that started
-        self.__game_collection = self.__db[game_name]
+    def __write(self, batch: list[dict]) -> None:
+        if time.monotonic() >= self.__unreachable_until:
+            try:
+                # copies : insert_many adds an ObjectId to the documents, which json cannot spill
+                self.__game_collection.insert_many([dict(doc) for doc in batch], ordered=False)
+                self.__logger.debug("inserted %d documents", len(batch))
+                return
+            except PyMongoError as err:
+                self.__unreachable_until = time.monotonic() + self.RETRY_DELAY
+                self.__logger.error("Could not save to MongoDB (%s), saving locally", err)
+            except Exception as err:  # documents the server refuses (bson's InvalidDocument...)
+                self.__logger.error("MongoDB refused %d documents (%s), saving locally", len(batch), err)
+        self.__spill(batch)
+
+    def __spill(self, docs: list[dict]) -> None:
+        """ save documents to the local journal """
+        with self.__journal_lock:
+            if self.__journal is None:
+                self.__journal = Database(self.__game_name)
+            for doc in docs:
+                self.__journal.save(doc)
 
     # drop the collection in case it already exists
     def drop(self):
@@ -59,29 +179,6 @@ class MongoConnector(Database):
             raise Exception(
                 "An authentication error was received. Are your username and password correct in your connection string?")
 
-    # INSERT DOCUMENTS
-    #
-    # You can insert individual documents using collection.insert_one().
-    # In this example, we're going to create four documents and then
-    # insert them all with insert_many().
-    def save(self, datas: List | Dict):
-        try:
-            if type(datas) is list:
-                result = self.__game_collection.insert_many(datas)
-            elif type(datas) is dict:
-                result = self.__game_collection.insert_one(datas)
-            else:
-                raise TypeError("data must be a list or a dict")
-        # return a friendly error if the operation fails
-        except pymongo.errors.OperationFailure:
-            print(
-                "An authentication error was received. Are you sure your database user is authorized to perform write operations?")
-        else:
-            inserted_count = len(result.inserted_ids)
-            print("I inserted %x documents." % (inserted_count))
-
-            print("\n")
-
     # FIND DOCUMENTS
     #
     # Now that we have data in Atlas, we can read it. To retrieve all of
@@ -103,6 +200,11 @@ class MongoConnector(Database):
 
         print("\n")
 
+    def documents(self, query: Optional[dict] = None, batch_size: int = 1000):
+        """ lazily read the saved results (without MongoDB's ids), batch_size documents per request
+        see models.analytics.analyze(connector.documents()) """
+        return self.__game_collection.find(query or {}, {"_id": False}, batch_size=batch_size)
+
     # We can also find a single document. Let's find a document
     # that has the string "potato" in the ingredients list.
     def find_one(self, key, value):
@@ -237,6 +339,7 @@ if __name__ == '__main__':
                          ["4,Heart", "J,Clover", "J,Spade", "J,Square"], ["Q,Square", "Q,Spade", "Q,Heart"],
                          ["8,Spade", "8,Clover"], ["9,Spade", "9,Square"], ["10,Clover", "10,Square"], ["A,Spade"]]}]
              )
+    mng.flush()
     mng.find()
     mng.find_one("players", "AI - Nona Martinez")
     mng.update({"players": "AI - Nona Martinez"}, {"players": "AI - Nona Martinez"})
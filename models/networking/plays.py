@@ -10,6 +10,7 @@ from abc import ABC, abstractmethod
 
 class GamePlay(ABC):
     """ Base Play class for Games """
+    __slots__ = ()
 
     @abstractmethod
     def __init__(self, *args):
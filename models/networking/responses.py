@@ -87,8 +87,12 @@ class Start(POST, Restricted):
 
 
 class Update(GET, Restricted):
-    """ Defines Update Message as a class"""
+    """ Defines Update Message as a class
+    Sending the last game version received makes the server answer once the game changed (long polling)
+    """
     # auto-restricted for player update, not for Game
+    POLL_TIMEOUT: Final = 20  # seconds, must stay below Message.TIMEOUT
+    headers = {"token": None, "player": None, "version": None}
     request: dict = {'message': "Update", 'content': ''}
     # POSSIBLE_VALUES = ("Game", "Player")
 
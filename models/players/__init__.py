@@ -6,8 +6,9 @@ IDE: PyCharm
 Creation-date: 11/10/22
 """
 
-# sub_modules MUST be in MRO order !!!
+from models.lazy import lazy_exports
 
-from .ai import AI
-from .player import Human
-from .player_template import Player
+__all__ = ["AI", "Human", "Player", "SearchAI"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "AI": ".ai", "Human": ".player", "Player": ".player_template", "SearchAI": ".search_ai",
+})
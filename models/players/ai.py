@@ -5,35 +5,41 @@ Project: President-Game
 IDE: PyCharm
 Creation-date: 13/10/22
 """
-import logging
-from collections import Counter
+from __future__ import annotations
 
-import names
+import logging
+import random
+from typing import Optional
 
-from models.games.card_games.card import Card
+from models.games.card_games.card import NB_RANKS, NUMBERS, Card
+from models.players.hands import BitHand
 from models.players.player import Player
+from models.utils import random_full_name
 
 
 class AI(Player):
     """ AI Player """
+    _hand_type = BitHand  # AIs only hold cards from the game's deck
+    endgame_solver = True  # exact plays once few cards are left in PresidentGame (see endgame.ENDGAME_CARDS)
 
-    def __init__(self, name=None, game_pointer=None):
+    def __init__(self, name=None, game_pointer=None, rng: random.Random = random):
         """
         Instance of an AI player
         keep most of Player's logics to validate input and transaction mechanics
         :param game_pointer: CardGame (or child) Instance
         :param name: leave blank to generate random name
+        :param rng: random generator to pick the name
         """
         self.fold_counter = 0
         if not name:
-            name = "AI - " + names.get_full_name(gender="female")
+            name = "AI - " + random_full_name(gender="female", rng=rng)
         super().__init__(name)
         self.__logger = logging.getLogger(self.name)
         self._is_human = False
         self.__first = False
         self.game = game_pointer  # makes the AI aware of the game, as a player would be
-        self.counter = Counter()
         self.got_revolution_in_hand = False
+        self.tracker = None  # the cards of the game, as this AI saw them move (see reset)
 
     def set_rank(self, rank_pointer):
         """ Set player's rank to given rank_pointer (Generic, use with care)"""
@@ -48,17 +54,19 @@ class AI(Player):
         :return: Cards to play
         (they should always be valid, taking into considerations the game_pointer pile)
         """
-
-        self.counter = Counter([card.number for card in self.hand])  # actualize counter
+        endgame = action == 'play' and (self._endgame() or self.__run_out(n_cards_to_play))
+        if endgame:
+            return self._play_action(endgame, n_cards_to_play)
+        # decisions read the hand's statistics, kept up to date as cards come and go (see BitHand)
         if getattr(self.game.game_rules, "use_revolution", False):
-            self.got_revolution_in_hand = len(self.all_of_combo(4)) > 0
+            self.got_revolution_in_hand = self.hand.combos(4) > 0
         play = None
         if n_cards_to_play == 0:  # No previous player, choose n_cards
             self.__first = True
             self.__logger.info("I'm the first to play")
             n_cards_to_play = self.ask_n_cards_to_play()
         # must play and can play at least one 'combo' of n_cards_to_play
-        if action == "play" and len(self.all_of_combo(n_cards_to_play)):
+        if action == "play" and self.hand.combos(n_cards_to_play):
             self.__logger.debug("Estimating my hand : %s\tAgainst : %s", self.hand, self.game.pile)
             play = self.__calc_best_card(n_cards_to_play)
         elif action == "give":
@@ -68,32 +76,81 @@ class AI(Player):
             self.fold_counter += 1
         return super()._play_cli(n_cards_to_play, play or 'F')
 
+    def _endgame(self) -> Optional[tuple[int, int]]:
+        """ the endgame solver's play (rank, number of cards) or PASS, once players hold few cards ;
+        None when the solver does not apply """
+        # imported here : PresidentGame's package imports the players
+        from models.games.card_games.variances.president.endgame import ENDGAME_CARDS, SOLVER
+        from models.games.card_games.variances.president.fast_president import FastPresident, PASS
+        if not self.endgame_solver or self.game.game_name != "PresidentGame" or \
+                sum(len(player.hand) for player in self.game.players) > ENDGAME_CARDS:
+            return None
+        if self.game.check_if_played_last(self):
+            return PASS
+        state = FastPresident.observe(self.game, self)
+        return None if state.over else SOLVER.best_action(state)  # last one standing : nothing to decide
+
+    def __run_out(self, n_cards_to_play: int) -> Optional[tuple[int, int]]:
+        """ every group of cards in hand but one is out of the others' reach (see CardTracker.can_beat) :
+        play one of those, keep the lead, and the last group goes after ; None otherwise """
+        if self.tracker is None or self.game.check_if_played_last(self):
+            return None
+        reverse = self.game.reversed_power
+        groups = [(rank, count) for rank, count in enumerate(self.hand.counts) if count]
+        masters = [group for group in groups if not self.tracker.can_beat(*group, reverse=reverse)]
+        if len(groups) < 2 or len(groups) - len(masters) > 1:
+            return None
+        plays = self.game.legal_plays(self.hand, n_cards_to_play)
+        best = 0 if reverse else NB_RANKS - 1  # first : finishing with the best card may lose
+        return next((group for group in sorted(masters, key=lambda group: group[0] != best) if group in plays),
+                    None)
+
+    def on_cards_moved(self, giver, cards, receiver) -> None:
+        if self.tracker is not None:
+            self.tracker.moved(giver, cards, receiver)
+
+    def reset(self):
+        """ Reset most values for next game, and start tracking its cards """
+        super().reset()
+        from models.players.tracker import CardTracker  # numpy : only once AIs sit at a table
+        self.tracker = CardTracker(self.game.players, self) if self.game and self in self.game.players else None
+
+    def _play_action(self, action: tuple[int, int], n_cards_to_play=0) -> list[Card]:
+        """ play an action of the fast model (rank, number of cards), folding on PASS """
+        rank, n_cards = action
+        if not n_cards:
+            self.__logger.info("I'm folding")
+            self.fold_counter += 1
+            return super()._play_cli(n_cards_to_play or 1, 'F')
+        return super()._play_cli(n_cards, NUMBERS[rank])
+
     def play_tk(self, n_cards_to_play=0) -> list[Card]:
         """ Graphical or CLI does not matter for AI ... Only datas"""
         return self._play_cli(n_cards_to_play)
 
     def ask_n_cards_to_play(self) -> int:
         """ pick how many cards would be wisest to be played"""
-        n_cards_to_play = self.max_combo  # Default value
-        if self.max_combo == 4 and \
+        max_combo = n_cards_to_play = self.max_combo  # Default value
+        if max_combo == 4 and \
                 (self.calc_revolution_interest() <= 0.25 or
                  len(self.hand) <= 6 and self.calc_revolution_interest() < 0.75):
             n_cards_to_play = 4
-        elif self.max_combo < 4:
-            n_cards_to_play = self.calc_n_cards(self.max_combo, self.got_revolution_in_hand)
+        elif max_combo < 4:
+            n_cards_to_play = self.calc_n_cards(max_combo, self.got_revolution_in_hand)
         return n_cards_to_play
 
+    @property
+    def __values_reversed(self) -> bool:
+        """ game's values are read from the strongest (after a revolution) """
+        return self.game.game_rules.VALUES[0] != NUMBERS[0]
+
     def calc_revolution_interest(self) -> float:
         """ Closer To 0 means you got mainly low-power cards.
         Revolution might be considered, since values are reversed"""
         if not self.game.game_rules.use_revolution:
             return 0
         self.got_revolution_in_hand = True
-        counter = Counter([card.number for card in self.hand])
-        total = 0
-        for number, count in self.counter.items():
-            total += count / (self.game.game_rules.VALUES.index(number) + 1)
-        mean = total / len(counter)
+        mean = self.hand.weakness(self.__values_reversed) / (NB_RANKS - self.hand.combos(0) or 1)
         self.__logger.debug("interest over playing revolution : %f:.3f", mean)
         return mean
 
@@ -101,20 +158,19 @@ class AI(Player):
         """ Calculate the actual combo interest
          compared to median combo values  / actual_combo_pairs / total_cards
          """
-        total_power = 0
-        total_possible_cards = 0
-        total_combo_pairs = 0
-        for number, count in self.counter.items():
-            if count == combo or combo > 1 and (split and count == combo - 1):
-                total_power += self.game.game_rules.VALUES.index(number)
-                total_possible_cards += count
-                total_combo_pairs += 1
+        hand, reverse = self.hand, self.__values_reversed
+        sizes = (combo, combo - 1) if combo > 1 and split else (combo,)
+        total_power = total_possible_cards = total_combo_pairs = 0
+        for size in sizes:
+            total_power += hand.power(size, reverse)
+            total_possible_cards += size * hand.combos(size)
+            total_combo_pairs += hand.combos(size)
         if total_possible_cards:
             result = total_power / (self.game.revolution + 1) \
                 if self.game.name == "PresidentGame" else total_power
             result /= (total_combo_pairs + 1)
             result *= total_possible_cards
-            result /= len(self.counter)
+            result /= NB_RANKS - hand.combos(0)  # ranks held
         else:
             result = 0.042
 
@@ -128,29 +184,22 @@ class AI(Player):
         self.__logger.info("i'm going to play %d cards", combo)
         return combo or 1
 
-    def __calc_best_card(self, nb_cards, split=False, action='play', rec_level=1):
-        """ Estimate best card to be played """
+    def __calc_best_card(self, nb_cards, split=False):
+        """ Estimate best card to be played, among the game's legal plays :
+        the weakest (strongest if holding a revolution) that does not split a combo, if any """
         if self.game.check_if_played_last(self):
             self.__logger.info("played last, not raising myself")
             return 'F'
-        _local_counter = self.counter.items()
+        plays = self.game.legal_plays(self.hand, nb_cards)
         if self.got_revolution_in_hand:
-            _local_counter = reversed(_local_counter)
-        card = None
-        for card, qty in _local_counter:
-            # the card can be played no matter of the pile if first to play
-            # OR if value OK according to game_pointer's pile and rules
-            if self.game.card_can_be_played(card):
-                if qty == nb_cards:
-                    self.__logger.debug("my interest goes to %s no splits", card)
-                    break
-                # otherwise, play a card from a split combo.
-                if split or action == 'give' and {qty - 1, qty - 2} == nb_cards:
-                    self.__logger.debug("my interest goes to %s *** splits ***", card)
-                    break
-            card = None
-        if card:
-            self.__logger.info("Trying: %s", repr(card))
-        return card or \
-            rec_level and self.__calc_best_card(nb_cards, split=not split,
-                                                rec_level=rec_level - 1)
+            plays = plays[::-1]
+        if not plays:
+            return None
+        counts = self.hand.counts
+        rank = next((rank for rank, _ in plays if counts[rank] == nb_cards), None) if not split else None
+        if rank is None:
+            rank = plays[0][0]
+            self.__logger.debug("my interest goes to rank %d *** splits ***", rank)
+        card = NUMBERS[rank]
+        self.__logger.info("Trying: %s", repr(card))
+        return card
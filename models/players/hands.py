@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Players' hands backends, both behave like a sorted list of cards
+"""
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Final, Iterable, Optional
+
+from models.games.card_games.card import Card, NB_RANKS, NB_SUITS, RANKS
+from models.games.card_games.moves import RANK_BITS, hand_key
+
+_ALL_CARDS = NB_RANKS * NB_SUITS
+_LCM: Final = math.lcm(*range(1, NB_RANKS + 1))
+# (lcm / (rank + 1), lcm / (rank + 1 once power is reversed)) : weaknesses are kept as exact integers
+_WEIGHTS: Final = tuple((_LCM // (rank + 1), _LCM // (NB_RANKS - rank)) for rank in range(NB_RANKS))
+_bit_count = int.bit_count if hasattr(int, "bit_count") else lambda mask: bin(mask).count("1")  # python < 3.10
+
+
+def _rank_of(card: Card | str) -> int:
+    """ returns the rank of a Card or a card number """
+    return card.rank if isinstance(card, Card) else RANKS[str(card)]
+
+
+class ListHand(list):
+    """ Default hand : a list of cards, kept sorted by cards power.
+    Accepts the same card twice (tests and local games may build their own cards) """
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        super().__init__(sorted(cards))
+
+    def add(self, card: Card) -> None:
+        """ insert the card at its place (after cards of the same power) """
+        bisect.insort_right(self, card)
+
+    def discard(self, card: Card) -> Optional[Card]:
+        """ remove the given card (or a card of the same power) from hand
+        :return: the card actually removed, None if nothing matched """
+        for i, test in enumerate(self):
+            if test is card:
+                return self.pop(i)
+        for i, test in enumerate(self):
+            if test == card:
+                return self.pop(i)
+        return None
+
+    @property
+    def counts(self) -> list[int]:
+        """ number of cards in hand, for each rank """
+        counts = [0] * NB_RANKS
+        for card in self:
+            counts[card.rank] += 1
+        return counts
+
+    def count_of(self, card: Card | str) -> int:
+        """ number of cards in hand having the same power as the given card / number """
+        rank = _rank_of(card)
+        return sum(test.rank == rank for test in self)
+
+    @property
+    def key(self) -> int:
+        """ how many cards of each rank, packed (see moves.hand_key) """
+        return hand_key(self)
+
+    @property
+    def max_combo(self) -> int:
+        """ the maximum amount of cards of the same power """
+        return max(self.counts) if self else 0
+
+    def combos(self, size: int) -> int:
+        """ number of ranks held exactly size times """
+        return self.counts.count(size)
+
+    def power(self, size: int, reverse: bool = False) -> int:
+        """ sum of the ranks held exactly size times (counted from the strongest when reversed) """
+        return sum(NB_RANKS - 1 - rank if reverse else rank
+                   for rank, count in enumerate(self.counts) if count == size > 0)
+
+    def weakness(self, reverse: bool = False) -> float:
+        """ sum of count / (rank + 1) over ranks held (counted from the strongest when reversed) """
+        return sum(count * _WEIGHTS[rank][reverse] for rank, count in enumerate(self.counts)) / _LCM
+
+    def copy(self) -> ListHand:
+        return ListHand(self)
+
+
+class BitHand:
+    """ Hand as a 52 bits mask (one bit per Card.id) plus a count of cards per rank (also packed, see key).
+    Statistics AIs decide on (ranks held N times, their power, the hand's weakness) follow each card.
+    Adding, removing an exact card, counting and copying are O(1) (ranks are bounded to 13).
+    The sorted list of cards is built lazily, and cached until the hand changes.
+    A hand cannot hold the same card (id) twice. """
+    __slots__ = ("_mask", "_key", "_counts", "_combos", "_powers", "_weights", "_cards", "_view")
+
+    def __init__(self, cards: Iterable[Card] = ()):
+        self._mask = 0
+        self._key = 0
+        self._counts = [0] * NB_RANKS
+        self._combos = [NB_RANKS] + [0] * NB_SUITS  # [size] : ranks held exactly size times
+        self._powers = [sum(range(NB_RANKS))] + [0] * NB_SUITS  # [size] : sum of those ranks
+        self._weights = [0, 0]  # weakness * _LCM, as powers go and reversed
+        self._cards: list[Optional[Card]] = [None] * _ALL_CARDS  # keeps the actual objects given
+        self._view: Optional[list[Card]] = None
+        for card in cards:
+            self.add(card)
+
+    @property
+    def mask(self) -> int:
+        """ bit N is set if the card of id N is in hand """
+        return self._mask
+
+    @property
+    def counts(self) -> list[int]:
+        """ number of cards in hand, for each rank (copy) """
+        return self._counts[:]
+
+    @property
+    def key(self) -> int:
+        """ how many cards of each rank, packed (see moves.hand_key) """
+        return self._key
+
+    def count_of(self, card: Card | str) -> int:
+        """ number of cards in hand having the same power as the given card / number """
+        return self._counts[_rank_of(card)]
+
+    @property
+    def max_combo(self) -> int:
+        """ the maximum amount of cards of the same power """
+        return next((size for size in range(NB_SUITS, 0, -1) if self._combos[size]), 0)
+
+    def combos(self, size: int) -> int:
+        """ number of ranks held exactly size times """
+        return self._combos[size] if 0 <= size <= NB_SUITS else 0
+
+    def power(self, size: int, reverse: bool = False) -> int:
+        """ sum of the ranks held exactly size times (counted from the strongest when reversed) """
+        if not 0 < size <= NB_SUITS:
+            return 0
+        return (NB_RANKS - 1) * self._combos[size] - self._powers[size] if reverse else self._powers[size]
+
+    def weakness(self, reverse: bool = False) -> float:
+        """ sum of count / (rank + 1) over ranks held (counted from the strongest when reversed) """
+        return self._weights[reverse] / _LCM
+
+    def _count(self, rank: int, delta: int) -> None:
+        """ one card of this rank more (delta = 1) or less (delta = -1) : update statistics """
+        before = self._counts[rank]
+        self._counts[rank] = before + delta
+        self._combos[before] -= 1
+        self._combos[before + delta] += 1
+        self._powers[before] -= rank
+        self._powers[before + delta] += rank
+        self._weights[0] += delta * _WEIGHTS[rank][0]
+        self._weights[1] += delta * _WEIGHTS[rank][1]
+        self._key += delta << rank * RANK_BITS
+
+    def add(self, card: Card) -> None:
+        """ put the card in hand """
+        if not isinstance(card, Card):
+            raise ValueError("card must be an instance of Card.")
+        bit = 1 << card.id
+        if self._mask & bit:
+            raise ValueError(f"{card} is already in hand")
+        self._mask |= bit
+        self._count(card.rank, 1)
+        self._cards[card.id] = card
+        self._view = None
+
+    def discard(self, card: Card) -> Optional[Card]:
+        """ remove the given card (or a card of the same power) from hand
+        :return: the card actually removed, None if nothing matched """
+        _id = card.id if isinstance(card, Card) else None
+        if _id is None or not self._mask >> _id & 1:
+            rank = _rank_of(card)
+            if not self._counts[rank]:
+                return None
+            nibble = self._mask >> (rank * NB_SUITS) & ((1 << NB_SUITS) - 1)
+            _id = rank * NB_SUITS + (nibble & -nibble).bit_length() - 1  # lowest color held
+        removed = self._cards[_id]
+        self._mask &= ~(1 << _id)
+        self._count(removed.rank, -1)
+        self._cards[_id] = None
+        self._view = None
+        return removed
+
+    def copy(self) -> BitHand:
+        """ cheap copy (used by AIs to explore plays) """
+        hand = BitHand.__new__(BitHand)
+        hand._mask = self._mask
+        hand._key = self._key
+        hand._counts = self._counts[:]
+        hand._combos = self._combos[:]
+        hand._powers = self._powers[:]
+        hand._weights = self._weights[:]
+        hand._cards = self._cards[:]
+        hand._view = None  # built again on demand : each hand changes on its own
+        return hand
+
+    # ############################ list view ############################
+
+    def _as_list(self) -> list[Card]:
+        if self._view is None:
+            self._view = [card for card in self._cards if card is not None]
+        return self._view
+
+    def append(self, card: Card) -> None:
+        """ list compatibility """
+        self.add(card)
+
+    def remove(self, card: Card) -> None:
+        """ list compatibility """
+        if self.discard(card) is None:
+            raise ValueError(f"{card} not in hand")
+
+    def sort(self, *_, **__) -> None:
+        """ list compatibility : always sorted by cards power """
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def index(self, card) -> int:
+        return self._as_list().index(card)
+
+    def __contains__(self, card) -> bool:
+        return bool(self._counts[_rank_of(card)])
+
+    def __len__(self) -> int:
+        return _bit_count(self._mask)
+
+    def __bool__(self) -> bool:
+        return bool(self._mask)
+
+    def __iter__(self):
+        return iter(self._as_list())
+
+    def __reversed__(self):
+        return reversed(self._as_list())
+
+    def __getitem__(self, item):
+        return self._as_list()[item]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BitHand):
+            return self._as_list() == other._as_list()
+        return isinstance(other, list) and self._as_list() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self._as_list())
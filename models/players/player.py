@@ -8,6 +8,7 @@ Creation-date: 11/10/22
 from __future__ import annotations
 
 import logging
+import random
 import secrets
 
 from models.games.card_games.card import Card
@@ -18,9 +19,9 @@ from .player_template import Player
 class Human(Player):
     """ a Human player"""
 
-    def __init__(self, name=None, game=None):
+    def __init__(self, name=None, game=None, rng: random.Random = random):
         """ Instantiate a Human player """
-        super().__init__(name, game)
+        super().__init__(name, game, rng)
         self._is_human = True
         self.__logger = logging.getLogger(__class__.__name__)
         self.__token = None
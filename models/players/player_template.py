@@ -8,17 +8,18 @@ Creation-date: 11/10/22
 from __future__ import annotations
 
 import logging
-import time
+import random
+import threading
 from abc import abstractmethod, ABC
 from collections import Counter
-from typing import Final
-
-import names
+from typing import Callable, Final, Optional
 
 from models.games.card_games.card import Card
 from models.networking.plays import GamePlay
-from models.utils import SerializableObject
+from models.networking.responses import Message
+from models.utils import SerializableObject, random_first_name
 from rules import PresidentRules, CardGameRules, GameRules
+from .hands import ListHand, BitHand
 
 
 class Player(SerializableObject, ABC):
@@ -27,13 +28,15 @@ class Player(SerializableObject, ABC):
     # Any value you put below this line,  outside __init__
     # might be shared amongst different instances !!!
     _is_human: bool
+    _hand_type: type[ListHand | BitHand] = ListHand  # hand backend, see models.players.hands
 
     @abstractmethod
-    def __init__(self, name=None, game=None):
+    def __init__(self, name=None, game=None, rng: random.Random = random):
         """
         Instantiate a Player.
          Player has a name, a hand holding cards,
          can fold (stop playing for current round) receive a card or remove a card from his hand
+        :param rng: random generator to pick a name, if none given
         """
         super().__init__()
         self.game_rules = None
@@ -41,13 +44,15 @@ class Player(SerializableObject, ABC):
         self._logger: Final = logging.getLogger(__class__.__name__)
         self.game = game
         self.__buffer = []
-        self.name: Final = name or names.get_first_name()
+        self.name: Final = name or random_first_name(rng=rng)
         self._won = False
         self._played_turn = False
         self._folded = False
+        self.__signal = threading.Condition()  # wakes up whoever waits on this player
+        self.__action_required = False
         self.is_action_required = False  # Required for Interface -> Game actions to happen
         self.rank = None
-        self.hand = []
+        self.__hand = self._hand_type()
         self.last_played: list[GamePlay] = []
 
     def set_game_rules(self, rules: GameRules | CardGameRules | PresidentRules) -> None:
@@ -86,6 +91,45 @@ class Player(SerializableObject, ABC):
     def ask_n_cards_to_play(self) -> int:
         """ Implement logic to ask the number of cards to play to player"""
 
+    @property
+    def hand(self) -> ListHand | BitHand:
+        """ player's cards, sorted by power (behaves like a list) """
+        return self.__hand
+
+    @hand.setter
+    def hand(self, cards) -> None:
+        """ replace player's cards with the given ones """
+        self.__hand = self._hand_type(cards)
+
+    @property
+    def is_action_required(self) -> bool:
+        """ True while the game waits for this player to act """
+        return self.__action_required
+
+    @is_action_required.setter
+    def is_action_required(self, value: bool) -> None:
+        """ any change wakes up the threads waiting on this player """
+        changed = self.__action_required != value
+        self.__action_required = value
+        self.notify()
+        if changed and self.game is not None:
+            self.game.on_player_status(self, "action_required", value)
+
+    def notify(self) -> None:
+        """ wake up every thread waiting on this player (action received, disconnection, ...) """
+        with self.__signal:
+            self.__signal.notify_all()
+
+    def wait_for(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """
+        Block until predicate is True, re-evaluated each time this player is notified
+        :param predicate: the condition to wait for
+        :param timeout: in seconds, None to wait forever
+        :return: predicate's last result
+        """
+        with self.__signal:
+            return self.__signal.wait_for(predicate, timeout)
+
     @property
     def won(self) -> bool:
         """ returns True if player won """
@@ -93,23 +137,36 @@ class Player(SerializableObject, ABC):
 
     def reset(self):
         """ Reset most values for next game"""
-        self._won = False
-        self._played_turn = False
-        self._folded = False
+        self.__set_status("_won", False)
+        self.__set_status("_played_turn", False)
+        self.__set_status("_folded", False)
         self.is_action_required = False
         self.hand = []
         self.__buffer = []
         self.last_played = []
 
+    def on_cards_moved(self, giver: Optional[Player], cards: list[Card], receiver: Optional[Player]) -> None:
+        """ Called by the game whenever cards leave the deck (giver is None) or a hand,
+        for a hand or the pile (receiver is None) : every seated player is told """
+
     def set_game(self, game):
         """ Set player's internal game pointer (server side only)"""
         self.game = game
 
+    def __set_status(self, status: str, value) -> None:
+        """ set a status flag, and tell the game when it actually changed (keeps game's counters) """
+        value = bool(value)
+        if getattr(self, status) is value:
+            return
+        setattr(self, status, value)
+        if self.game is not None:
+            self.game.on_player_status(self, status, value)
+
     def set_win(self, value: bool = True) -> None:
         """ set _won to given value"""
         if value:
             self._logger.info("%s %s", self, 'have won' if not self.hand else 'have Lost')
-        self._won = value
+        self.__set_status("_won", value)
 
     def set_rank(self, rank_pointer) -> None:
         """ set ranks to given pointer"""
@@ -118,7 +175,7 @@ class Player(SerializableObject, ABC):
     def set_fold(self, value=True) -> None:
         """ set fold to given value (True by default)"""
         value and self._folded is False and self._logger.info("%s folds", self.name)
-        self._folded = value
+        self.__set_status("_folded", value)
 
     def set_played(self, value=True) -> None:
         """
@@ -127,7 +184,7 @@ class Player(SerializableObject, ABC):
         """
         if value:
             self._logger.info("%s played", self.name)
-        self._played_turn = value
+        self.__set_status("_played_turn", value)
         if self.played:
             self.is_action_required = False
 
@@ -135,24 +192,21 @@ class Player(SerializableObject, ABC):
         """ add the given Card to player's hand"""
         if not isinstance(card, Card):
             raise ValueError("card must be an instance of Card.")
-        self.hand.append(card)
+        self.__hand.add(card)  # Replicating real life's behaviour, hands are kept sorted
         self._logger.debug("%s received %s", self, card.unicode_safe())
-        self.sort_hand()  # Replicating real life's behaviour
 
     def remove_from_hand(self, card: Card) -> Card | None:
         """
         remove a specified card form player's hand
         :param card: the card to remove from player's hand
-        :return: the card removed from player's hand
+        :return: the card removed from player's hand (the exact card if held,
+         otherwise a card of the same power)
         """
         if not isinstance(card, Card):
             raise ValueError("card must be an instance of Card.")
-        if card in self.hand:
-            self.hand.remove(card)
+        card = self.__hand.discard(card)
+        if card:
             self._logger.debug("%s removed %s from hand", self, card.unicode_safe())
-        else:
-            card = None
-
         return card
 
     @property
@@ -163,7 +217,7 @@ class Player(SerializableObject, ABC):
         played his turn,
         won the game
         """
-        active = not self.folded and not self.played and not self.won and len(self.hand)
+        active = not self.folded and not self.played and not self.won and len(self.hand) > 0
         self._logger.debug("%s says i'm%s active", self, '' if active else ' not')
         if not active:
             reasons = f"Reasons: {'won.' if self._won else ''}" \
@@ -201,18 +255,14 @@ class Player(SerializableObject, ABC):
     @property
     def max_combo(self):
         """ return the maximum amount of cards a player can play at once """
-        if self.hand:
-            _, val = Counter(self.hand_as_numbers).most_common(1)[0]
-        else:
-            val = 0
-        return val
+        return self.__hand.max_combo
 
     def all_of_combo(self, combo) -> Counter:
         """
         :param combo: wanted N combo cards from hand
         :return: combos that match wanted count
         """
-        return Counter((card, count) for card, count in Counter(self.hand_as_numbers).items()
+        return Counter((CardGameRules.VALUES[rank], count) for rank, count in enumerate(self.__hand.counts)
                        if count == combo)
 
     def ask_yes_no(self, question: str, override: bool = False) -> bool:
@@ -228,23 +278,19 @@ class Player(SerializableObject, ABC):
     def _play_cards(self, n_cards_to_play: int, wanted_card: str) -> list[Card]:
         """
         Ensure there are enough of designated card in player's hand.
-        Remove 1 card at a time from hand and place it in result (temporary)
-        If a card is not found in player's hand, restore cards to player
+        Cards are only taken from hand once there are enough of them (nothing to give back)
         :param n_cards_to_play: number of cards
         :param wanted_card: card to play
         :return: [card, ...] if there is enough of designated card in hand
                  [] Otherwise
         """
         if self.is_active:
-            # Validate that player has n times this card in hand
-            for _ in range(n_cards_to_play):
-                card = self.validate_input(wanted_card)  # transforms wanted_card to Card
-                if card:
-                    self.__buffer.append(self.remove_from_hand(card))
-            if len(self.__buffer) != n_cards_to_play:  # Not enough of designated card in hand...
+            card = self.validate_input(wanted_card)  # transforms wanted_card to Card
+            # Validate that player has n times this card in hand, before taking any
+            if card and self.__hand.count_of(card) >= n_cards_to_play:
+                self.__buffer.extend(self.remove_from_hand(card) for _ in range(n_cards_to_play))
+            else:  # Not enough of designated card in hand...
                 self._logger.info("Not enough cards")
-                [self.add_to_hand(card) for card in self.__buffer]  # Give player his cards back
-                self.__buffer = []
 
         self.last_played = self.__buffer
         return self.__buffer
@@ -333,11 +379,7 @@ class Player(SerializableObject, ABC):
         return ret
 
     def wait_response(self):
-        """ Await timeout or player's action (asynchronously)"""
-        timeout_counter = 10
-        while self.plays is None:
-            time.sleep(0.3)
-            timeout_counter -= 1
-        if timeout_counter <= 0:
+        """ Await timeout or player's action (woken up as soon as the action arrives)"""
+        if not self.wait_for(lambda: not self.is_action_required, Message.TIMEOUT):
             return []
         return self.plays
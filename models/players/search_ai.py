@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : AI searching its plays : information-set Monte Carlo tree search, within a time budget
+"""
+from __future__ import annotations
+
+import atexit
+import math
+import random
+import time
+from multiprocessing import get_context
+from multiprocessing.pool import Pool
+from typing import Final, Optional
+
+from models.games.card_games.card import Card
+from models.games.card_games.variances.president.fast_president import FastPresident, PASS
+from models.players.ai import AI
+
+TIME_BUDGET: Final = .2  # seconds per move
+EXPLORATION: Final = .7  # UCB's exploration constant (rewards are in [0, 1])
+_pools: dict[int, Pool] = {}
+
+
+class _Node:
+    """ a play, after the plays of its ancestors ; rewards are those of the seat that played it """
+    __slots__ = ("seat", "visits", "reward", "available", "children")
+
+    def __init__(self, seat: int):
+        self.seat = seat
+        self.visits = 0
+        self.reward = 0.
+        self.available = 1  # iterations where this play was legal (hands differ between determinizations)
+        self.children: dict[tuple[int, int], _Node] = {}
+
+    def ucb(self, exploration: float) -> float:
+        return self.reward / self.visits + exploration * math.sqrt(math.log(self.available) / self.visits)
+
+
+def search(state: FastPresident, rng: random.Random, iterations: Optional[int] = None,
+           deadline: Optional[float] = None, exploration: float = EXPLORATION) -> dict[tuple, tuple[int, float]]:
+    """
+    Single-observer information-set MCTS : each iteration deals the unknown cards anew (see determinize),
+    goes down the tree with the plays legal in this deal, adds a play, and finishes the game by rollout.
+    Plays are rewarded with the place their seat finished at (1 : first, 0 : last).
+    :param state: the game, as observed by the seat to play
+    :param iterations: stop after this number of iterations
+    :param deadline: stop at this time.perf_counter()
+    :return: (visits, total reward) of each of the observer's plays
+    """
+    if iterations is None and deadline is None:
+        raise ValueError("search needs iterations, a deadline, or both")
+    root = _Node(state.turn)
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+        game, node, path = state.determinize(rng), root, []
+        while not game.over:
+            actions = game.actions()
+            untried = [action for action in actions if action not in node.children]
+            for action in actions:
+                if action in node.children:
+                    node.children[action].available += 1
+            if untried:
+                action = rng.choice(untried)
+                node.children[action] = child = _Node(game.turn)
+                game.apply(action)
+                path.append(child)
+                break
+            action = max(actions, key=lambda test: node.children[test].ucb(exploration))
+            node = node.children[action]
+            game.apply(action)
+            path.append(node)
+        ladder = game.rollout(rng)
+        last = max(1, len(ladder) - 1)
+        for node in path:
+            node.visits += 1
+            node.reward += 1 - ladder.index(node.seat) / last
+        done += 1
+    return {action: (child.visits, child.reward) for action, child in root.children.items()}
+
+
+def _search_worker(args: tuple) -> dict[tuple, tuple[int, float]]:
+    """ a process' share of a search (see SearchAI.processes) """
+    state, seed, iterations, budget, exploration = args
+    return search(state, random.Random(seed), iterations, _deadline(budget), exploration)
+
+
+def _deadline(budget: Optional[float]) -> Optional[float]:
+    return None if budget is None else time.perf_counter() + budget
+
+
+def _pool(processes: int) -> Pool:
+    """ search processes, started once (spawned : tables' threads are not forked) """
+    if processes not in _pools:
+        _pools[processes] = get_context("spawn").Pool(processes)
+        atexit.register(_pools[processes].terminate)
+    return _pools[processes]
+
+
+class SearchAI(AI):
+    """ AI choosing its plays by information-set Monte Carlo tree search (see search) on FastPresident :
+    the best expected place it finds within time_budget seconds per move.
+    With processes > 1, each process searches for time_budget (root parallelization) :
+    more processes play stronger in the same time.
+    Endgames are left to the solver (see AI.endgame_solver),
+    cards to give, and games other than PresidentGame, to AI's heuristics.
+    """
+
+    def __init__(self, name=None, game_pointer=None, rng: random.Random = random,
+                 time_budget: Optional[float] = TIME_BUDGET, iterations: Optional[int] = None, processes: int = 1,
+                 exploration: float = EXPLORATION, seed: Optional[int] = None):
+        """
+        :param time_budget: seconds to search, per move (None : iterations only)
+        :param iterations: stop each search after this number of iterations (reproducible plays, without budget)
+        :param processes: processes searching at once
+        :param seed: seed of the searches (random if None)
+        """
+        if time_budget is None and iterations is None:
+            raise ValueError("SearchAI needs a time_budget, iterations, or both")
+        super().__init__(name, game_pointer, rng)
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.processes = max(1, processes)
+        self.exploration = exploration
+        self.__rng = random.Random(seed)
+        self.searched = 0  # iterations run so far, to measure the search's speed
+
+    def _play_cli(self, n_cards_to_play=0, override=None, action='play') -> list[Card]:
+        """ play the search's best play (see choose), or the endgame solver's once few cards are left """
+        if action != 'play' or self.game.game_name != "PresidentGame":
+            return super()._play_cli(n_cards_to_play, override, action)
+        choice = self._endgame() or (PASS if self.game.check_if_played_last(self)
+                                     else self.choose(FastPresident.observe(self.game, self)))
+        return self._play_action(choice, n_cards_to_play)
+
+    def choose(self, state: FastPresident) -> tuple[int, int]:
+        """ the play (rank, number of cards) or PASS, most visited by the search """
+        actions = state.actions()
+        if len(actions) == 1:
+            return actions[0]
+        stats = self.__search(state)
+        self.searched += sum(visits for visits, _ in stats.values())
+        return max(actions, key=lambda action: stats.get(action, (0, 0.))[0])
+
+    def __search(self, state: FastPresident) -> dict[tuple, tuple[int, float]]:
+        if self.processes == 1:
+            return search(state, self.__rng, self.iterations, _deadline(self.time_budget), self.exploration)
+        iterations = self.iterations and -(-self.iterations // self.processes)
+        shares = _pool(self.processes).map(_search_worker, [
+            (state, self.__rng.getrandbits(64), iterations, self.time_budget, self.exploration)
+            for _ in range(self.processes)])
+        stats: dict[tuple, tuple[int, float]] = {}
+        for share in shares:
+            for action, (visits, reward) in share.items():
+                total = stats.get(action, (0, 0.))
+                stats[action] = (total[0] + visits, total[1] + reward)
+        return stats
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : What a player can tell of the others' hands, from the cards he saw moving
+"""
+from __future__ import annotations
+
+from math import comb
+from typing import Final, Optional
+
+import numpy as np
+
+from models.games.card_games.card import Card, NB_RANKS, NB_SUITS
+
+_CARDS: Final = NB_RANKS * NB_SUITS
+_COMB: Final = np.array([[comb(n, k) for k in range(_CARDS + 1)] for n in range(_CARDS + 1)], np.float64)
+_RANKS: Final = np.arange(NB_RANKS)
+_TAKEN: Final = np.arange(NB_SUITS + 1)  # cards of a rank a hand can hold
+
+
+class CardTracker:
+    """
+    Follows every card moving between the deck, the hands and the pile (see Player.on_cards_moved),
+    as one player sees them : his own cards, the cards he gives and gets, and the cards played.
+    Cards the others exchange between themselves are only counted.
+
+    Each hand is made of known cards (the ones this player gave, his own) and hidden ones,
+    drawn from the cards nobody saw yet (unseen) : probabilities follow, per seat and rank.
+    Every move updates the arrays in O(1) ; probabilities are computed on demand, once per move.
+    """
+
+    def __init__(self, players: list, me):
+        """
+        :param players: the table's players, in seats order
+        :param me: the player tracking the cards
+        """
+        self.rows = {id(player): row for row, player in enumerate(players)}
+        self.me = self.rows[id(me)]
+        self.unseen = np.full(NB_RANKS, NB_SUITS, np.int64)  # cards this player did not see yet, per rank
+        self.known = np.zeros((len(players), NB_RANKS), np.int64)  # cards known to be in each hand
+        self.sizes = np.zeros(len(players), np.int64)  # cards in each hand
+        self.played = np.zeros(NB_RANKS, np.int64)
+        self.__at_least: dict[int, np.ndarray] = {}
+
+    def moved(self, giver, cards: list[Card], receiver) -> None:
+        """
+        cards left giver's hand (the deck if None) for receiver's (the pile if None)
+        Players that are not seated (joined after the deal) are ignored.
+        """
+        give, take = self.rows.get(id(giver), -1), self.rows.get(id(receiver), -1)
+        if giver is not None and give < 0 or receiver is not None and take < 0:
+            return
+        seen = self.me in (give, take) or receiver is None
+        for card in cards:
+            rank = card.rank
+            if give >= 0:
+                self.sizes[give] -= 1
+                if seen:
+                    if self.known[give, rank]:
+                        self.known[give, rank] -= 1
+                    else:
+                        self.unseen[rank] -= 1
+            elif seen:  # dealt to this player
+                self.unseen[rank] -= 1
+            if take >= 0:
+                self.sizes[take] += 1
+                if seen:
+                    self.known[take, rank] += 1
+            else:
+                self.played[rank] += 1
+        self.__at_least.clear()
+
+    @property
+    def hidden(self) -> np.ndarray:
+        """ cards of each hand this player cannot tell """
+        return self.sizes - self.known.sum(axis=1)
+
+    @property
+    def opponents(self) -> np.ndarray:
+        """ rows of the players still holding cards, other than this one """
+        rows = np.flatnonzero(self.sizes > 0)
+        return rows[rows != self.me]
+
+    @property
+    def expected(self) -> np.ndarray:
+        """ (seat, rank) expected number of cards """
+        total = self.unseen.sum()
+        share = self.hidden / total if total else np.zeros(len(self.sizes))
+        return self.known + share[:, None] * self.unseen[None, :]
+
+    def at_least(self, n_cards: int) -> np.ndarray:
+        """ (seat, rank) probability that the seat holds n_cards of the rank, at least :
+        the known ones, plus hidden ones dealt from the unseen cards (hypergeometric) """
+        if n_cards not in self.__at_least:
+            total = int(self.unseen.sum())
+            unseen = self.unseen[None, :, None]
+            hidden = np.maximum(self.hidden, 0)[:, None, None]
+            rest = hidden - _TAKEN
+            pmf = _COMB[unseen, _TAKEN] * _COMB[total - unseen, np.maximum(rest, 0)] * (rest >= 0) \
+                / _COMB[total, np.minimum(hidden, total)]
+            needed = (n_cards - self.known)[:, :, None]
+            self.__at_least[n_cards] = (pmf * (_TAKEN >= needed)).sum(axis=2)
+        return self.__at_least[n_cards]
+
+    def can_beat(self, rank: int, n_cards: int, reverse: bool = False, rows: Optional[np.ndarray] = None) -> float:
+        """
+        probability that someone can cover n_cards of this rank (hands taken as independent)
+        e.g. can_beat(king, 2) : can anyone beat a pair of K ?
+        :param rows: players to consider (default : the opponents still holding cards)
+        """
+        rows = self.opponents if rows is None else rows
+        covering = _RANKS <= rank if reverse else _RANKS >= rank
+        return float(1 - np.prod(1 - self.at_least(n_cards)[np.ix_(rows, covering)]))
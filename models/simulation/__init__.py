@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+
+from .runner import SimulationStats, simulate, run_simulation
+# numpy is only imported when batches are played, or datasets generated (see models.lazy)
+from models.lazy import lazy_exports
+
+__all__ = ["SimulationStats", "simulate", "run_simulation",
+           "BatchTables", "Observations", "LinearPolicy", "RandomPolicy", "play_batch",
+           "generate_dataset", "load_shards"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "BatchTables": ".batch", "Observations": ".batch", "LinearPolicy": ".batch", "RandomPolicy": ".batch",
+    "play_batch": ".batch", "generate_dataset": ".dataset", "load_shards": ".dataset",
+})
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : python -m models.simulation --games 10000 --ai 4 --processes 8 --seed 42
+"""
+import argparse
+import json
+import time
+
+from .runner import simulate
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog="python -m models.simulation",
+                                     description="Play AI-only PresidentGames on every core")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--ai", type=int, default=3, help="players per game (3-6)")
+    parser.add_argument("--processes", type=int, default=None, help="defaults to CPU count")
+    parser.add_argument("--chunk-size", type=int, default=50, help="games per worker task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", type=int, default=0,
+                        help="tables played at once on the vectorized fast model (no exchanges), 0 : full games")
+    parser.add_argument("--dataset", default=None,
+                        help="directory to write self-play training shards to (see dataset), on the fast model")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.dataset:
+        from .dataset import BATCH_SIZE, generate_dataset  # numpy
+        samples = 0
+        for summary in generate_dataset(args.dataset, args.games, args.ai, args.processes, seed=args.seed,
+                                        batch_size=args.batch or BATCH_SIZE):
+            samples += summary["samples"]
+            print(f"\r{samples} samples", end="", flush=True)
+        elapsed = time.perf_counter() - start
+        print(f"\n{elapsed:.2f}s ({samples / elapsed * 3600 / 1e6:.1f} M samples/hour) in {args.dataset}")
+    else:
+        stats = None
+        if args.batch:
+            from .batch import play_batch  # numpy
+            stats = play_batch(args.games, args.ai, batch_size=args.batch, seed=args.seed)
+        else:
+            for stats in simulate(args.games, args.ai, args.processes, args.chunk_size, args.seed):
+                print(f"\r{stats.games}/{args.games} games", end="", flush=True)
+        elapsed = time.perf_counter() - start
+        print(f"\n{elapsed:.2f}s ({args.games / elapsed:.1f} games/s)")
+        print(json.dumps(stats.to_json(), indent=2))
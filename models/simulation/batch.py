@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Hundreds of FastPresident tables advanced at once, their decisions taken by vectorized policies
+"""
+from __future__ import annotations
+
+from typing import Final, Optional, Sequence
+
+import numpy as np
+
+from models.games.card_games.card import NB_RANKS, NB_SUITS
+from .runner import SimulationStats
+
+BATCH_SIZE: Final = 512  # tables advanced at once
+FEATURES: Final = ("power", "cards", "split", "finish", "best")  # features of a play, see LinearPolicy
+# the weakest play, by whole groups of cards ; finish when possible, keep the best card for later
+DEFAULT_WEIGHTS: Final = (-1., .01, -.5, 2., -.5)
+PASS_WEIGHT: Final = -3.  # below every play : pass only when nothing can be played
+_CARDS: Final = NB_RANKS * NB_SUITS
+_RANKS: Final = np.arange(NB_RANKS)
+_N_CARDS: Final = np.arange(1, NB_SUITS + 1)  # cards of a play, axis 2 of the legal plays
+
+
+class Observations:
+    """ What the players to play see, one row per table : their hand, the pile and the rules in effect """
+    __slots__ = ("hand", "top", "required", "reverse", "sizes", "legal", "can_pass")
+
+    def __init__(self, hand: np.ndarray, top: np.ndarray, required: np.ndarray, reverse: np.ndarray,
+                 sizes: np.ndarray):
+        """
+        :param hand: (tables, ranks) cards of each rank in hand
+        :param top: rank on top of the pile, -1 if empty
+        :param required: cards to play, 0 if the player chooses
+        :param reverse: weaker cards win (revolution)
+        :param sizes: (tables, seats) cards in every hand
+        """
+        self.hand, self.top, self.required, self.reverse, self.sizes = hand, top, required, reverse, sizes
+        cover = np.where(reverse[:, None], _RANKS <= top[:, None], _RANKS >= top[:, None]) | (top[:, None] < 0)
+        required_ok = (required[:, None] == 0) | (_N_CARDS == required[:, None])
+        # legal[table, rank, n - 1] : n cards of this rank can be played
+        self.legal = (hand[:, :, None] >= _N_CARDS) & cover[:, :, None] & required_ok[:, None, :]
+        self.can_pass = (top >= 0) | ~self.legal.any(axis=(1, 2))
+
+    def __len__(self):
+        return len(self.top)
+
+
+def _choose(scores: np.ndarray, pass_scores: np.ndarray, obs: Observations) -> tuple[np.ndarray, np.ndarray]:
+    """ the best scored legal play of each table, or pass (rank -1, 0 cards) when it scores better """
+    flat = np.where(obs.legal, scores, -np.inf).reshape(len(obs), -1)
+    best = flat.argmax(axis=1)
+    passing = obs.can_pass & (pass_scores > flat[np.arange(len(obs)), best])
+    rank, n_cards = best // NB_SUITS, best % NB_SUITS + 1
+    return np.where(passing, -1, rank), np.where(passing, 0, n_cards)
+
+
+class LinearPolicy:
+    """
+    Scores every legal play with a linear function of its features, and plays the best one :
+    power (0 : weakest card, 1 : best card, as powers stand), cards (n / 4), split (cards of the rank are
+    left in hand), finish (the hand is empty after it), best (the best card).
+    Passing scores pass_weight.
+    """
+
+    def __init__(self, weights: Sequence[float] = DEFAULT_WEIGHTS, pass_weight: float = PASS_WEIGHT):
+        self.weights = np.asarray(weights, np.float64)
+        if self.weights.shape != (len(FEATURES),):
+            raise ValueError(f"{len(FEATURES)} weights expected : {FEATURES}")
+        self.pass_weight = pass_weight
+        w_power, w_cards, _, _, w_best = self.weights
+        power = np.array([_RANKS, NB_RANKS - 1 - _RANKS]) / (NB_RANKS - 1)  # as powers stand, then reversed
+        # (reverse, rank, cards - 1) : the part of the scores that does not depend on the hand
+        self.__table = w_power * power[:, :, None] + w_cards * _N_CARDS / NB_SUITS + w_best * (power == 1)[:, :, None]
+
+    def scores(self, obs: Observations) -> np.ndarray:
+        """ (tables, ranks, cards - 1) score of every play, legal or not """
+        _, _, w_split, w_finish, _ = self.weights
+        size = obs.hand.sum(axis=1)
+        return (self.__table[obs.reverse.astype(np.int64)] + w_split * (obs.hand[:, :, None] > _N_CARDS)
+                + w_finish * (_N_CARDS == size[:, None, None]))
+
+    def __call__(self, obs: Observations) -> tuple[np.ndarray, np.ndarray]:
+        """ :return: (rank, number of cards) of each table's play, (-1, 0) to pass """
+        return _choose(self.scores(obs), np.full(len(obs), self.pass_weight), obs)
+
+
+class RandomPolicy:
+    """ Any legal action, passing included, with the same probability """
+
+    def __init__(self, rng: Optional[np.random.Generator] = None):
+        self.rng = rng or np.random.default_rng()
+
+    def __call__(self, obs: Observations) -> tuple[np.ndarray, np.ndarray]:
+        pass_scores = np.where(obs.can_pass, self.rng.random(len(obs)), -np.inf)
+        return _choose(self.rng.random(obs.legal.shape), pass_scores, obs)
+
+
+class BatchTables:
+    """
+    FastPresident's rules (see FastPresident), over many tables at once : every array has a row per table.
+    Places are 0 for the first ; players finishing with the best card lose (if rules say so),
+    the first of them last.
+    """
+
+    def __init__(self, nb_tables: int, nb_players: int, rng: Optional[np.random.Generator] = None,
+                 revolution: bool = True, best_card_ends_round: bool = True, best_card_loses: bool = False):
+        self.nb_players = nb_players
+        self.rng = rng or np.random.default_rng()
+        self.revolution, self.best_card_ends_round = revolution, best_card_ends_round
+        self.best_card_loses = best_card_loses
+        self.hands = np.zeros((nb_tables, nb_players, NB_RANKS), np.int8)
+        self.sizes = np.zeros((nb_tables, nb_players), np.int16)
+        self.turn = np.zeros(nb_tables, np.int64)
+        self.top = np.full(nb_tables, -1, np.int64)
+        self.required = np.zeros(nb_tables, np.int64)
+        self.owner = np.full(nb_tables, -1, np.int64)
+        self.reverse = np.zeros(nb_tables, bool)
+        self.passed = np.zeros((nb_tables, nb_players), bool)
+        self.done = np.ones((nb_tables, nb_players), bool)
+        self.places = np.full((nb_tables, nb_players), -1, np.int8)
+        self.first = np.zeros(nb_tables, np.int64)  # next winner's place
+        self.last = np.zeros(nb_tables, np.int64)  # next loser's place
+        self.alive = np.zeros(nb_tables, np.int64)
+        self.rounds = np.zeros(nb_tables, np.int64)
+        self.revolutions = np.zeros(nb_tables, np.int64)
+        self.over = np.ones(nb_tables, bool)
+
+    def deal(self, rows: np.ndarray) -> None:
+        """ new games on these tables : the 52 cards dealt one by one, a random seat starts """
+        nb_tables, players = len(rows), self.nb_players
+        ranks = self.rng.permuted(np.tile(np.arange(_CARDS), (nb_tables, 1)), axis=1) // NB_SUITS
+        seats = np.arange(_CARDS) % players
+        index = (np.arange(nb_tables)[:, None] * players + seats) * NB_RANKS + ranks
+        self.hands[rows] = np.bincount(index.ravel(), minlength=nb_tables * players * NB_RANKS) \
+            .reshape(nb_tables, players, NB_RANKS)
+        self.sizes[rows] = self.hands[rows].sum(axis=2)
+        self.reverse[rows] = False
+        self.done[rows] = self.sizes[rows] == 0
+        self.places[rows] = -1
+        self.first[rows], self.last[rows] = 0, players - 1
+        self.alive[rows] = players - self.done[rows].sum(axis=1)
+        self.rounds[rows], self.revolutions[rows] = 0, 0
+        self.over[rows] = False
+        self.__new_round(rows, self.rng.integers(players, size=nb_tables))
+
+    def observe(self, rows: np.ndarray) -> Observations:
+        return Observations(self.hands[rows, self.turn[rows]].astype(np.int64), self.top[rows], self.required[rows],
+                            self.reverse[rows], self.sizes[rows])
+
+    def step(self, policies) -> np.ndarray:
+        """
+        every table still playing plays its turn
+        :param policies: the policy of every seat, or one for all (see LinearPolicy)
+        :return: the tables whose game ended
+        """
+        rows = np.flatnonzero(~self.over)
+        seats = self.turn[rows]
+        rank, n_cards = np.empty(len(rows), np.int64), np.empty(len(rows), np.int64)
+        if not isinstance(policies, (list, tuple)):
+            policies = [policies] * self.nb_players
+        for policy in dict.fromkeys(policies):
+            mask = np.isin(seats, [seat for seat, test in enumerate(policies) if test is policy])
+            if mask.any():
+                rank[mask], n_cards[mask] = policy(self.observe(rows[mask]))
+        return self.apply(rows, rank, n_cards)
+
+    def apply(self, rows: np.ndarray, rank: np.ndarray, n_cards: np.ndarray) -> np.ndarray:
+        """ the players to play on these tables play n_cards of rank, or pass (0 cards)
+        :return: the tables whose game ended """
+        everyone, seats = rows, self.turn[rows]
+        play = n_cards > 0
+        self.passed[rows[~play], seats[~play]] = True
+        rows, seats, rank, n_cards = rows[play], seats[play], rank[play], n_cards[play]
+        self.hands[rows, seats, rank] -= n_cards.astype(np.int8)
+        self.sizes[rows, seats] -= n_cards.astype(np.int16)
+        self.top[rows], self.required[rows], self.owner[rows] = rank, n_cards, seats
+        # before a revolution, as PresidentGame does
+        lost = self.best_card_loses & (rank == np.where(self.reverse[rows], 0, NB_RANKS - 1))
+        flip = self.revolution & (n_cards == NB_SUITS)
+        self.reverse[rows] ^= flip
+        self.revolutions[rows] += flip
+
+        finished = self.sizes[rows, seats] == 0
+        ended = self.__finish(rows[finished], seats[finished], lost[finished])
+        best = self.best_card_ends_round & (rank == np.where(self.reverse[rows], 0, NB_RANKS - 1))
+        new_round = best & ~self.over[rows]
+        self.__new_round(rows[new_round], seats[new_round])
+        self.__next(everyone[~self.over[everyone] & ~np.isin(everyone, rows[new_round])])
+        return ended
+
+    def __finish(self, rows: np.ndarray, seats: np.ndarray, lost: np.ndarray) -> np.ndarray:
+        """ seats emptied their hands : they take the next place (the last free one if they lost) """
+        self.done[rows, seats] = True
+        self.alive[rows] -= 1
+        self.places[rows, seats] = np.where(lost, self.last[rows], self.first[rows])
+        self.first[rows] += ~lost
+        self.last[rows] -= lost
+        ended = rows[self.alive[rows] == 1]
+        last_standing = np.argmin(self.done[ended], axis=1)
+        self.places[ended, last_standing] = self.first[ended]
+        self.done[ended, last_standing] = True
+        self.over[ended] = True
+        return ended
+
+    def __next(self, rows: np.ndarray) -> None:
+        """ next seat able to play ; new round once back to the last player """
+        if not len(rows):
+            return
+        turn, owner, index = self.turn[rows], self.owner[rows], np.arange(len(rows))
+        seats = (turn[:, None] + np.arange(1, self.nb_players + 1)) % self.nb_players
+        is_owner = seats == owner[:, None]
+        stops = is_owner | ~(self.done[rows[:, None], seats] | self.passed[rows[:, None], seats])
+        first = stops.argmax(axis=1)
+        new_round = ~stops[index, first] | is_owner[index, first]
+        self.turn[rows[~new_round]] = seats[index, first][~new_round]
+        self.__new_round(rows[new_round], np.where(owner >= 0, owner, turn)[new_round])
+
+    def __new_round(self, rows: np.ndarray, start: np.ndarray) -> None:
+        """ empty pile : start (or the next seat still in the game) plays first """
+        self.top[rows], self.required[rows], self.owner[rows] = -1, 0, -1
+        self.passed[rows] = False
+        self.rounds[rows] += 1
+        seats = (start[:, None] + np.arange(self.nb_players)) % self.nb_players
+        self.turn[rows] = seats[np.arange(len(rows)), (~self.done[rows[:, None], seats]).argmax(axis=1)]
+
+
+def play_batch(nb_games: int, nb_players: int = 4, policies=None, batch_size: int = BATCH_SIZE,
+               seed: Optional[int] = 0, **rules) -> SimulationStats:
+    """
+    Play nb_games on the vectorized fast model, batch_size tables at once : a table starts a new game
+    as soon as its game ends. Grades and exchanges are not modeled.
+    :param policies: the policy of every seat, or one for all (default : LinearPolicy())
+    :param rules: see BatchTables
+    """
+    tables = BatchTables(min(batch_size, nb_games), nb_players, np.random.default_rng(seed), **rules)
+    policies = LinearPolicy() if policies is None else policies
+    stats = SimulationStats(nb_players)
+    seat_ranks = np.zeros((nb_players, nb_players), np.int64)
+    started = len(tables.over)
+    tables.deal(np.arange(started))
+    while stats.games < nb_games:
+        ended = tables.step(policies)
+        if not len(ended):
+            continue
+        np.add.at(seat_ranks, (np.tile(np.arange(nb_players), len(ended)), tables.places[ended].ravel()), 1)
+        stats.games += len(ended)
+        stats.rounds += int(tables.rounds[ended].sum())
+        stats.revolutions += int(tables.revolutions[ended].sum())
+        stats.games_with_revolution += int((tables.revolutions[ended] > 0).sum())
+        again = ended[:max(0, nb_games - started)]
+        started += len(again)
+        if len(again):
+            tables.deal(again)
+    stats.seat_ranks = seat_ranks.tolist()
+    return stats
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Self-play training sets : every decision of batched games, streamed to .npz shards
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+from multiprocessing import Pool
+from typing import Final, Generator, Iterator, Optional
+
+import numpy as np
+
+from models.games.card_games.card import NB_RANKS, NB_SUITS
+from rules import PresidentRules
+from .batch import BATCH_SIZE, DEFAULT_WEIGHTS, BatchTables, LinearPolicy, Observations, RandomPolicy
+from .runner import chunk_seed
+
+MAX_SEATS: Final = PresidentRules.max_players
+# hand (cards per rank), top of the pile (-1 : empty), required cards, revolution,
+# then the cards held by every seat in playing order, the player's own first (-1 : no seat)
+OBS_SIZE: Final = NB_RANKS + 3 + MAX_SEATS
+PASS_ACTION: Final = NB_RANKS * NB_SUITS  # actions : rank * 4 + cards - 1, then pass
+NB_ACTIONS: Final = PASS_ACTION + 1
+EPSILON: Final = .1  # decisions taken at random, for the sets to hold other plays than the policy's
+GAMES_PER_CHUNK: Final = 2000
+SHARD_SIZE: Final = 1 << 18  # records per shard
+MANIFEST: Final = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+def encode(obs: Observations, seats: np.ndarray) -> np.ndarray:
+    """ (decisions, OBS_SIZE) int8 observations, as the players to play (seats) see them """
+    nb_players = obs.sizes.shape[1]
+    encoded = np.full((len(obs), OBS_SIZE), -1, np.int8)
+    encoded[:, :NB_RANKS] = obs.hand
+    encoded[:, NB_RANKS] = obs.top
+    encoded[:, NB_RANKS + 1] = obs.required
+    encoded[:, NB_RANKS + 2] = obs.reverse
+    order = (seats[:, None] + np.arange(nb_players)) % nb_players
+    encoded[:, NB_RANKS + 3:NB_RANKS + 3 + nb_players] = obs.sizes[np.arange(len(obs))[:, None], order]
+    return encoded
+
+
+def legal_mask(obs: Observations) -> np.ndarray:
+    """ (decisions, NB_ACTIONS) actions the players to play can take """
+    return np.concatenate((obs.legal.reshape(len(obs), -1), obs.can_pass[:, None]), axis=1)
+
+
+def action_index(rank: np.ndarray, n_cards: np.ndarray) -> np.ndarray:
+    return np.where(n_cards > 0, rank * NB_SUITS + n_cards - 1, PASS_ACTION)
+
+
+class ShardWriter:
+    """
+    Buffers decisions until their games end (their final ranks are needed), then writes them by shard_size
+    to {directory}/{name}-{shard:04d}.npz : memory holds a shard, and the decisions of the games in progress.
+    """
+    FIELDS: Final = ("obs", "mask", "action", "seat", "game")
+
+    def __init__(self, directory: str, name: str, places: np.ndarray, shard_size: int = SHARD_SIZE,
+                 compress: bool = False, **meta):
+        """
+        :param places: (games, seats) final places of the games, -1 while in progress
+        :param meta: scalars saved in every shard (seed, ...)
+        """
+        self.directory, self.name, self.places = directory, name, places
+        self.shard_size, self.compress, self.meta = shard_size, compress, meta
+        self.buffers: dict[str, list[np.ndarray]] = {field: [] for field in self.FIELDS}
+        self.buffered = self.samples = 0
+        self.shards: list[str] = []
+
+    def add(self, **arrays: np.ndarray) -> None:
+        """ decisions of a step : one row of each field per decision """
+        for field in self.FIELDS:
+            self.buffers[field].append(arrays[field])
+        self.buffered += len(arrays["game"])
+        if self.buffered >= 2 * self.shard_size:  # the games of a shard are over, at least
+            self.flush()
+
+    def flush(self, final: bool = False) -> None:
+        """ write the decisions of the ended games, whole shards only unless final """
+        if not self.buffered:
+            return
+        records = {field: np.concatenate(arrays) for field, arrays in self.buffers.items()}
+        ended = self.places[records["game"], 0] >= 0
+        count = int(ended.sum()) if final else int(ended.sum()) // self.shard_size * self.shard_size
+        index = np.flatnonzero(ended)[:count]
+        for start in range(0, count, self.shard_size):
+            rows = index[start:start + self.shard_size]
+            self.__write({field: values[rows] for field, values in records.items()})
+        kept = np.ones(len(ended), bool)
+        kept[index] = False
+        self.buffers = {field: [values[kept]] for field, values in records.items()}
+        self.buffered = int(kept.sum())
+
+    def __write(self, records: dict[str, np.ndarray]) -> None:
+        records["rank"] = self.places[records["game"], records["seat"]]
+        path = os.path.join(self.directory, f"{self.name}-{len(self.shards):04d}.npz")
+        (np.savez_compressed if self.compress else np.savez)(path, **records, **self.meta)
+        self.shards.append(os.path.basename(path))
+        self.samples += len(records["game"])
+
+
+def play_chunk(directory: str, chunk: int, nb_games: int, nb_players: int, seed: int,
+               batch_size: int = BATCH_SIZE, epsilon: float = EPSILON, shard_size: int = SHARD_SIZE,
+               compress: bool = False, **rules) -> dict:
+    """
+    Worker : play nb_games, batch_size tables at once (see BatchTables), LinearPolicy deciding,
+    and write every decision : its observation, legal actions, action, seat, game and final rank
+    :return: the chunk's summary (see generate_dataset)
+    """
+    rng = np.random.default_rng(seed)
+    tables = BatchTables(min(batch_size, nb_games), nb_players, rng, **rules)
+    policy, explore = LinearPolicy(), RandomPolicy(rng)
+    places = np.full((nb_games, nb_players), -1, np.int8)
+    writer = ShardWriter(directory, f"chunk-{chunk:05d}", places, shard_size, compress,
+                         seed=np.uint64(seed), chunk=chunk, players=nb_players)
+    games = np.arange(len(tables.over))  # game played on each table
+    started, ended_games = len(games), 0
+    tables.deal(np.arange(len(games)))
+    while ended_games < nb_games:
+        rows = np.flatnonzero(~tables.over)
+        obs = tables.observe(rows)
+        seats = tables.turn[rows]
+        rank, n_cards = policy(obs)
+        randomly = rng.random(len(rows)) < epsilon
+        if randomly.any():
+            random_rank, random_n_cards = explore(obs)
+            rank, n_cards = np.where(randomly, random_rank, rank), np.where(randomly, random_n_cards, n_cards)
+        writer.add(obs=encode(obs, seats), mask=legal_mask(obs), action=action_index(rank, n_cards).astype(np.int8),
+                   seat=seats.astype(np.int8), game=games[rows].astype(np.int32))
+        ended = tables.apply(rows, rank, n_cards)
+        places[games[ended]] = tables.places[ended]
+        ended_games += len(ended)
+        again = ended[:max(0, nb_games - started)]
+        if len(again):
+            games[again] = np.arange(started, started + len(again))
+            started += len(again)
+            tables.deal(again)
+    writer.flush(final=True)
+    return {"chunk": chunk, "seed": seed, "games": nb_games, "samples": writer.samples, "shards": writer.shards}
+
+
+def _play_chunk(args: tuple) -> dict:
+    directory, chunk, nb_games, nb_players, seed, options = args
+    return play_chunk(directory, chunk, nb_games, nb_players, seed, **options)
+
+
+def generate_dataset(directory: str, nb_games: int, nb_players: int = 4, processes: Optional[int] = None,
+                     chunk_size: int = GAMES_PER_CHUNK, seed: int = 0, batch_size: int = BATCH_SIZE,
+                     epsilon: float = EPSILON, shard_size: int = SHARD_SIZE, compress: bool = False,
+                     **rules) -> Generator[dict, None, None]:
+    """
+    Self-play nb_games on the vectorized fast model over a pool of processes, and stream every decision
+    to directory's shards (see ShardWriter, load_shards). Chunks of games have their own seed, so shards
+    do not depend on the number of processes ; the manifest records them, with the settings.
+    :param processes: pool size (defaults to CPU count), 1 plays in the current process
+    :param epsilon: probability of a random decision, instead of the policy's
+    :param rules: see BatchTables
+    :return: yields every chunk's summary once its shards are written
+    """
+    os.makedirs(directory, exist_ok=True)
+    options = dict(batch_size=batch_size, epsilon=epsilon, shard_size=shard_size, compress=compress, **rules)
+    chunks = [(directory, i, min(chunk_size, nb_games - start), nb_players, chunk_seed(seed, i), options)
+              for i, start in enumerate(range(0, nb_games, chunk_size))]
+    summaries = []
+    if processes == 1:
+        for chunk in chunks:
+            summaries.append(_play_chunk(chunk))
+            yield summaries[-1]
+    else:
+        with Pool(processes=processes) as pool:
+            for summary in pool.imap_unordered(_play_chunk, chunks):
+                summaries.append(summary)
+                yield summary
+    summaries.sort(key=lambda summary: summary["chunk"])
+    manifest = {"games": nb_games, "players": nb_players, "seed": seed, "samples": sum(s["samples"] for s in summaries),
+                "obs_size": OBS_SIZE, "actions": NB_ACTIONS, "weights": list(DEFAULT_WEIGHTS), "options": options,
+                "chunks": summaries}
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2)
+    logger.info("%d samples of %d games written to %s", manifest["samples"], nb_games, directory)
+
+
+def load_shards(directory: str) -> Iterator[dict[str, np.ndarray]]:
+    """ the shards of a generated dataset, in chunks' order : obs, mask, action, seat, game, rank, seed... """
+    with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+    for summary in manifest["chunks"]:
+        for shard in summary["shards"]:
+            with np.load(os.path.join(directory, shard)) as data:
+                yield dict(data)
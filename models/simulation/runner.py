@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Run AI-only PresidentGames across a pool of processes, and aggregate their results
+"""
+from __future__ import annotations
+
+import logging
+import random
+from collections import Counter
+from multiprocessing import Pool
+from typing import Generator, Optional
+
+from models.games.card_games.variances import PresidentGame
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationStats:
+    """ Aggregated results of many games, small enough to be sent between processes.
+    Seats are the players' indexes in the game. """
+
+    def __init__(self, nb_players: int):
+        self.nb_players = nb_players
+        self.games = 0
+        self.rounds = 0
+        self.revolutions = 0
+        self.games_with_revolution = 0
+        # seat_ranks[seat][rank - 1] : times this seat finished at this rank
+        self.seat_ranks = [[0] * nb_players for _ in range(nb_players)]
+        self.seat_grades = [Counter() for _ in range(nb_players)]
+
+    def add_game(self, results: dict, seats: dict[str, int]) -> None:
+        """ account for a game's results (see Game.save_results)
+        :param seats: player's name -> seat """
+        self.games += 1
+        self.rounds += results.get("rounds", 0)
+        self.revolutions += results.get("revolutions", 0)
+        self.games_with_revolution += bool(results.get("revolutions"))
+        for winner in results["winners"]:
+            seat = seats[winner["player"]]
+            self.seat_ranks[seat][winner["rank"] - 1] += 1
+            if winner.get("grade"):
+                self.seat_grades[seat][winner["grade"]] += 1
+
+    def merge(self, other: SimulationStats) -> SimulationStats:
+        """ add other's results to self """
+        if other.nb_players != self.nb_players:
+            raise ValueError("Cannot merge simulations with different players count")
+        self.games += other.games
+        self.rounds += other.rounds
+        self.revolutions += other.revolutions
+        self.games_with_revolution += other.games_with_revolution
+        for seat in range(self.nb_players):
+            for rank in range(self.nb_players):
+                self.seat_ranks[seat][rank] += other.seat_ranks[seat][rank]
+            self.seat_grades[seat].update(other.seat_grades[seat])
+        return self
+
+    @property
+    def mean_rounds(self) -> float:
+        """ average rounds per game """
+        return self.rounds / self.games if self.games else 0.
+
+    @property
+    def win_rates(self) -> list[float]:
+        """ for each seat, the rate of games finished first """
+        return [ranks[0] / self.games if self.games else 0. for ranks in self.seat_ranks]
+
+    @property
+    def ladder(self) -> list[int]:
+        """ seats, sorted by their mean rank (best first) """
+        def mean_rank(seat):
+            return sum((rank + 1) * count for rank, count in enumerate(self.seat_ranks[seat])) \
+                / max(1, sum(self.seat_ranks[seat]))
+        return sorted(range(self.nb_players), key=mean_rank)
+
+    def to_json(self) -> dict:
+        return {
+            "games": self.games,
+            "players": self.nb_players,
+            "mean_rounds": self.mean_rounds,
+            "revolutions": self.revolutions,
+            "games_with_revolution": self.games_with_revolution,
+            "win_rates": self.win_rates,
+            "ladder": self.ladder,
+            "seat_ranks": self.seat_ranks,
+            "seat_grades": [dict(grades) for grades in self.seat_grades],
+        }
+
+    def __repr__(self):
+        return f"SimulationStats({self.games} games, {self.nb_players} players)"
+
+
+class _SimulatedGame(PresidentGame):
+    """ PresidentGame feeding its results to a SimulationStats, instead of players / DB """
+
+    def __init__(self, nb_ai: int, stats: SimulationStats, seed: int):
+        super().__init__(nb_players=0, nb_ai=nb_ai, save=False, seed=seed)
+        self.__stats = stats
+        self.__seats = {player.name: seat for seat, player in enumerate(self.players)}
+
+    def send_all(self, msg):
+        """ nobody is watching """
+
+    def save_results(self, name) -> dict:
+        results = super().save_results(name)
+        self.__stats.add_game(results, self.__seats)
+        return results
+
+
+def chunk_seed(seed: int, chunk: int) -> int:
+    """ Independent, reproducible seed of a chunk of games """
+    return random.Random(f"{seed}:{chunk}").getrandbits(64)
+
+
+def play_chunk(nb_games: int, nb_ai: int, seed: int) -> SimulationStats:
+    """ Worker : play nb_games successive games on one table (exchanges happen between games) """
+    rng = random.Random(seed)  # seeds of the table : decks, first players and AI names
+    stats = SimulationStats(nb_ai)
+    game = _SimulatedGame(nb_ai, stats, rng.getrandbits(64))
+    while len(game.players) != nb_ai:  # two AIs got the same name...
+        game = _SimulatedGame(nb_ai, stats, rng.getrandbits(64))
+    for _ in range(nb_games):
+        game.start(override_test=True)
+    return stats
+
+
+def _quiet_worker() -> None:
+    """ pool workers' initializer : games' logs would flood the console (workers only, the caller's are kept) """
+    logging.disable(logging.WARNING)
+
+
+def _play_chunk(args: tuple) -> SimulationStats:
+    return play_chunk(*args)
+
+
+def simulate(nb_games: int, nb_ai: int = 3, processes: Optional[int] = None,
+             chunk_size: int = 50, seed: int = 0) -> Generator[SimulationStats, None, None]:
+    """
+    Play nb_games AI-only PresidentGames over a pool of processes.
+    Games are played by chunks (one table per chunk), each chunk having its own seed,
+    so results do not depend on the number of processes.
+    :param nb_games: total number of games to play
+    :param nb_ai: players per game
+    :param processes: pool size (defaults to CPU count), 1 plays in the current process
+    :param chunk_size: games per chunk
+    :param seed: base seed of the simulation
+    :return: yields the aggregated results every time a chunk is done
+    """
+    chunks = [(min(chunk_size, nb_games - start), nb_ai, chunk_seed(seed, i))
+              for i, start in enumerate(range(0, nb_games, chunk_size))]
+    total = SimulationStats(nb_ai)
+    if processes == 1:
+        for chunk in chunks:
+            yield total.merge(_play_chunk(chunk))
+        return
+    with Pool(processes=processes, initializer=_quiet_worker) as pool:
+        for stats in pool.imap_unordered(_play_chunk, chunks):
+            yield total.merge(stats)
+
+
+def run_simulation(nb_games: int, nb_ai: int = 3, processes: Optional[int] = None,
+                   chunk_size: int = 50, seed: int = 0) -> SimulationStats:
+    """ Same as simulate, only returns the final results """
+    total = SimulationStats(nb_ai)
+    for total in simulate(nb_games, nb_ai, processes, chunk_size, seed):
+        logger.debug("%d/%d games done", total.games, nb_games)
+    return total
@@ -6,12 +6,12 @@ IDE: PyCharm
 Creation-date: 11/19/22
 Imported from : https://www.freecodecamp.org/news/python-decorators-explained-with-examples/
 """
-import asyncio
+import bisect
 import json
-import socket
+import random
 import tracemalloc
 from abc import ABC, abstractmethod
-from functools import wraps
+from functools import lru_cache, wraps
 from itertools import cycle
 from time import perf_counter
 
@@ -130,6 +130,7 @@ def measure_perf(func):
 
 
 async def async_range(min_, max_, iter_=1):
+    import asyncio  # only the port scans are asynchronous
     for i in range(min_, max_, iter_):
         yield i
         await asyncio.sleep(0.0)
@@ -154,6 +155,7 @@ class GameFinder:
             _range = range(_range[0] + 1, _range[1] + 1)
         elif isinstance(_range, int):
             _range = range(_range + 1, _range + 2)
+        import asyncio
         self.running = asyncio.run(scan_ports_availabilities(target, _range))
         logger.debug(self.running)
         self.availabilities = [(target, port) for port in _range if (target, port) not in self.running]
@@ -162,6 +164,8 @@ class GameFinder:
 
 async def scan_ports_availabilities(target="localhost", range=range(5002, 5012)) -> list:
     """ Scan ports availability on given target """
+    import asyncio
+    import socket
 
     async def scan_port(_port):
         """ Scan port availability on given target """
@@ -184,5 +188,38 @@ async def scan_ports_availabilities(target="localhost", range=range(5002, 5012))
     return [(target, task.result()) for task in done if task.result()]
 
 
+@lru_cache(maxsize=None)
+def _names_table(kind: str) -> tuple[list[float], list[str]]:
+    """ Load a names distribution file (see names.FILES) once : cumulative frequencies, names """
+    import names  # only the name files' paths are used
+
+    cumulated, found = [], []
+    with open(names.FILES[kind]) as name_file:
+        for line in name_file:
+            name, _, cumulative, _ = line.split()
+            cumulated.append(float(cumulative))
+            found.append(name.capitalize())
+    return cumulated, found
+
+
+def random_name(kind: str, rng: random.Random = random) -> str:
+    """ Same distribution as names.get_name, without re-reading the file on each call """
+    cumulated, found = _names_table(kind)
+    i = bisect.bisect_right(cumulated, rng.random() * 90)
+    return found[i] if i < len(found) else ""
+
+
+def random_first_name(gender: str = None, rng: random.Random = random) -> str:
+    """ names.get_first_name equivalent """
+    if gender not in ('male', 'female'):
+        gender = rng.choice(('male', 'female'))
+    return random_name(f"first:{gender}", rng)
+
+
+def random_full_name(gender: str = None, rng: random.Random = random) -> str:
+    """ names.get_full_name equivalent """
+    return f"{random_first_name(gender, rng)} {random_name('last', rng)}"
+
+
 def xor(data, key):
     return ''.join(chr(ord(c) ^ ord(k)) for c, k in zip(data, cycle(key)))
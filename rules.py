@@ -17,7 +17,7 @@ class GameRules:
     @abstractmethod
     def __init__(self, total_players: int):
         self.tick_speed = .759  # expressed in seconds.
-        # lower values means more loops runs in a second. (might be harmful)
+        # Games do not poll on ticks anymore : they wake up as soon as players act.
 
         self.max_players = 20
         self.min_players = 2
@@ -4,15 +4,37 @@ Created by: Mistayan
 Project: President-Game
 IDE: PyCharm
 Creation-date: 11/20/22
+
+run_interface.py                    play
+run_interface.py --startup-time     measure the time it takes to get an interface, then exit
+run_interface.py --render-banner [image url or path]   re-render the interface's banner
 """
+import time
+
+_START = time.perf_counter()  # before any import, for --startup-time
+
 import logging
+import sys
 
 import coloredlogs
 
+from conf import check_venv
 from models import Human
 from models import Interface
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.INFO)
-    with Interface(Human(input("Player Name ?"))) as interface:  # With, auto-disconnect on exit
-        interface.run_interface()
+    check_venv()
+    if "--startup-time" in sys.argv:
+        imported = time.perf_counter()
+        Interface(Human("Startup"))
+        ready = time.perf_counter()
+        print(f"imports : {(imported - _START) * 1000:.1f} ms\t"
+              f"interface : {(ready - imported) * 1000:.1f} ms\t"
+              f"total : {(ready - _START) * 1000:.1f} ms")
+    elif "--render-banner" in sys.argv:
+        source = sys.argv[sys.argv.index("--render-banner") + 1:]
+        print(Interface.render_banner(*source[:1]))
+    else:
+        with Interface(Human(input("Player Name ?"))) as interface:  # With, auto-disconnect on exit
+            interface.run_interface()
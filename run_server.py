@@ -6,15 +6,18 @@ IDE: PyCharm
 Creation-date: 11/20/22
 """
 import logging
+import os
 import platform
+import sys
 from multiprocessing import Pool
 from subprocess import Popen
 
 import coloredlogs
 
-from conf import VENV_PATH, ROOT_LOGGER
+from conf import VENV_PATH, ROOT_LOGGER, check_venv
 from models import GameFinder
 from models import PresidentGame
+from models.games.apis.game_server import GAME_CLASS, game_class_path
 
 
 def run_background(game):
@@ -23,9 +26,15 @@ def run_background(game):
         pool.apply_async(game().run_server())  # Game will find port to run on its own
 
 
+def _serving(game) -> dict:
+    """ environment of a WSGI server process serving game (see game_server.create_app) """
+    return dict(os.environ, **{GAME_CLASS: game_class_path(game)})
+
+
 def run_with_gunicorn(game, port):
     print("running with gunicorn")
-    app = Popen(f"{VENV_PATH} gunicorn --bind 0.0.0.0:{port} wsgi:{game}".split())
+    app = Popen(f"{VENV_PATH} gunicorn --bind 0.0.0.0:{port} models.games.apis.game_server:create_app()".split(),
+                env=_serving(game))
     app.communicate()
 
 
@@ -34,14 +43,21 @@ def run_with_waitress(game, port):
     print(VENV_PATH)
     try:
         app = Popen(f"{VENV_PATH} waitress-serve"
-                    f" --host 0.0.0.0 --port {port} --call models:{game}"
-                    "".split())
+                    f" --host 0.0.0.0 --port {port} --call models.games.apis.game_server:create_app"
+                    "".split(), env=_serving(game))
         app.communicate()
     except PermissionError:
         print("Requires admin rights...")
         raise
 
 
+def run_sharded(game, nb_shards=None):
+    """ many tables, spread over one process per core, behind a single port """
+    from models.games.apis.shards import create_router
+    ROOT_LOGGER.info("starting %s shards of %s tables", nb_shards or "cpu count", game.__qualname__)
+    create_router(nb_shards, game).run_server()
+
+
 def auto_run(game):
     system = platform.system()
     try:
@@ -62,4 +78,8 @@ def auto_run(game):
 
 if __name__ == '__main__':
     coloredlogs.install(level=logging.INFO)
-    auto_run(PresidentGame)
+    check_venv()
+    if "--shards" in sys.argv:
+        run_sharded(PresidentGame)
+    else:
+        auto_run(PresidentGame)
@@ -55,7 +55,8 @@ if __name__ == "__main__":
                       'models.games',
                       'models.games.apis', 'models.games.card_games',
                       'models.games.card_games.variances',
-                      'models.interfaces', 'models.players', ],
+                      'models.interfaces', 'models.players', 'models.simulation', 'models.analytics', ],
+            package_data={'models.interfaces': ['banner.txt']},
             requires=['Python (>=3.9)'],
             install_requires=[
                 "coloredlogs>=15",
@@ -67,6 +68,7 @@ if __name__ == "__main__":
                 "requests>=2.28",
                 "pillow>=10.0.0",
                 "pymongo>=4.5.0",
+                "numpy>=1.24",
             ],  # external packages as dependencies
             license="MIT",
             long_description="""
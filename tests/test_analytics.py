@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+import coloredlogs
+
+from models.analytics import GRADES, analyze, load_chunks
+from models.networking import Archive
+from tests.utils import play
+
+
+def result(players: list[str], ladder: list[tuple], rounds: int = 10, revolutions: int = 0) -> dict:
+    """ a game's result, ladder being (name, last card played, grade[, flags]) from first to last """
+    return {"game": "PresidentGame", "players": players, "rounds": rounds, "revolutions": revolutions,
+            "plays": [],
+            "winners": [{"player": name, "rank": rank, "round": rounds, "last_play": card, "grade": grade,
+                         **dict.fromkeys(flags, True)}
+                        for rank, (name, card, grade, *flags) in enumerate(ladder, 1)]}
+
+
+TABLE = ["Ana", "Bob", "Cid"]
+RESULTS = [
+    result(TABLE, [("Ana", "2,Heart", "President", "best_card"), ("Bob", "5,Spade", "Neutre"),
+                   ("Cid", "2,Clover", "Troufion", "best_card", "lost")]),
+    # Ana went out before the revolution : her 2 was the best card then
+    result(TABLE, [("Ana", "2,Heart", "President", "best_card"), ("Cid", "3,Spade", "Neutre"),
+                   ("Bob", "4,Clover", "Troufion")], rounds=20, revolutions=1),
+    result(TABLE, [("Bob", "9,Heart", "President"), ("Ana", "2,Spade", "Neutre", "best_card"),
+                   ("Cid", "7,Clover", "Troufion")], revolutions=2),
+    # another table : no transition between its first game and the previous table's last one
+    result(["Dan", "Eve", "Fay", "Gus"], [("Eve", "Q,Heart", "President"), ("Gone", "4,Spade", "Neutre"),
+                                          ("Dan", "2,Heart", "Neutre", "best_card"), ("Gus", "7,Spade", "Troufion")]),
+]
+
+
+class TestAnalytics(unittest.TestCase):
+    """ Aggregates over saved results, by chunks """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_aggregates(self):
+        analytics = analyze(RESULTS)
+        self.assertEqual(analytics.games, 4)
+        self.assertEqual(analytics.mean_rounds, 12.5)
+        self.assertEqual((analytics.revolutions, analytics.games_with_revolution), (3, 2))
+        self.assertEqual(analytics.revolution_rate, .5)
+        self.assertEqual(analytics.win_rates, [2 / 4, 2 / 4, 0., 0.])
+        # as recorded : Ana's 2 (three times), Cid's 2, Dan's 2 ; Cid lost for it
+        self.assertEqual((analytics.best_card_finishes, analytics.best_card_losses), (5, 1))
+        president, neutre, troufion = (GRADES.index(grade) for grade in ("President", "Neutre", "Troufion"))
+        self.assertEqual(analytics.transitions.sum(), 6)
+        self.assertEqual(analytics.transitions[president, president], 1)  # Ana stayed President once
+        self.assertEqual(analytics.transitions[president, neutre], 1)
+        self.assertEqual(analytics.transition_rates[president][president], .5)
+        self.assertEqual(analytics.transitions[troufion].tolist()[president], 1)  # Bob, from last to first
+        self.assertEqual(json.loads(json.dumps(analytics.to_json()))["games"], 4)
+
+    def test_chunks_do_not_change_results(self):
+        results = play(12, seed=5) + play(8, seed=6)
+        expected = analyze(results, chunk_size=len(results)).to_json()
+        for chunk_size in (1, 3, 7):
+            self.assertEqual(analyze(results, chunk_size=chunk_size).to_json(), expected)
+        self.assertTrue(all(len(chunk) <= 3 for chunk in load_chunks(results, chunk_size=3)))
+
+    def test_sources(self):
+        """ journals, MongoDB exports and archives give the same columns """
+        results = play(10, seed=9) + RESULTS
+        journal = os.path.join(self.tmp.name, "results.ndjson")
+        export = os.path.join(self.tmp.name, "export.json")  # mongoexport : a document per line, with its id
+        export_array = os.path.join(self.tmp.name, "export-array.json")  # mongoexport --jsonArray
+        with open(journal, 'w', encoding='utf-8') as fp:
+            fp.writelines(json.dumps(doc) + "\n" for doc in results)
+        with open(export, 'w', encoding='utf-8') as fp:
+            fp.writelines(json.dumps({"_id": {"$oid": f"{i:024x}"}, **doc}) + "\n" for i, doc in enumerate(results))
+        with open(export_array, 'w', encoding='utf-8') as fp:
+            json.dump(results, fp)
+        archive = os.path.join(self.tmp.name, "results.pga")
+        Archive.write(archive, results).close()
+
+        expected = analyze(results).to_json()
+        for source in (journal, export, export_array, archive):
+            self.assertEqual(analyze(source, chunk_size=4).to_json(), expected, source)
+        [from_json], [from_archive] = load_chunks(journal, chunk_size=100), load_chunks(archive, chunk_size=100)
+        for column in ("table", "players", "rounds", "revolutions", "ranked", "seats", "last_cards", "grades", "lost",
+                       "best_card"):
+            self.assertEqual(getattr(from_json, column).tolist(), getattr(from_archive, column).tolist(), column)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
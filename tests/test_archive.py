@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+import coloredlogs
+
+from models.networking import Archive, ArchiveWriter
+from tests.utils import play
+
+
+class TestArchive(unittest.TestCase):
+    """ Compact, memory-mapped results """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "results.pga")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        results = play(6, seed=1) + play(4, seed=2)
+        results[3]["winners"][0]["player"] = "Gone"  # left the table before the results were saved
+        with Archive.write(self.path, results) as archive:
+            self.assertEqual(len(archive), 10)
+            self.assertEqual(list(archive), results)
+            self.assertEqual(archive[3], results[3])
+            self.assertEqual(archive[-1], results[-1])
+            self.assertRaises(IndexError, archive.__getitem__, 10)
+
+    def test_archive_is_small(self):
+        results = play(30, seed=3)
+        with ArchiveWriter(self.path) as writer:
+            [writer.append(result) for result in results]
+        as_json = sum(len(json.dumps(result, separators=(',', ':'))) + 1 for result in results)
+        self.assertLess(os.path.getsize(self.path) * 10, as_json)
+
+    def test_legacy_results(self):
+        """ results saved before rounds and revolutions were counted are archived as they are """
+        legacy = [{key: value for key, value in result.items() if key not in ("rounds", "revolutions")}
+                  for result in play(3, seed=3)]
+        with Archive.write(self.path, legacy) as archive:
+            self.assertEqual(list(archive), legacy)
+        strange = json.loads(json.dumps(legacy[0]))
+        strange["winners"][0]["last_play"] = "Joker"
+        with self.assertLogs("models.networking.archive", logging.WARNING), \
+                Archive.write(self.path, [strange]) as archive:
+            self.assertIsNone(archive[0]["winners"][0]["last_play"])
+
+    def test_not_an_archive(self):
+        with open(self.path, 'wb') as fp:
+            fp.write(bytes(64))
+        self.assertRaises(ValueError, Archive, self.path)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
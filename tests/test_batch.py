@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import unittest
+
+import coloredlogs
+import numpy as np
+
+from models.games.card_games.moves import RANK_BITS, legal_plays
+from models.games.card_games.variances.president.fast_president import FastPresident
+from models.simulation.batch import BatchTables, LinearPolicy, RandomPolicy, play_batch
+
+WEAKEST = LinearPolicy((-1., .01, 0., 0., 0.), pass_weight=-10.)  # FastPresident.default_action
+
+
+def fast_states(tables: BatchTables, **rules) -> list[FastPresident]:
+    """ the tables' games, as FastPresident states """
+    return [FastPresident([sum(int(count) << rank * RANK_BITS for rank, count in enumerate(hand)) for hand in hands],
+                          int(turn), **rules)
+            for hands, turn in zip(tables.hands, tables.turn)]
+
+
+class TestBatch(unittest.TestCase):
+    """ FastPresident tables, advanced all at once """
+
+    def test_legal_plays(self):
+        rng = np.random.default_rng(1)
+        tables = BatchTables(200, 4, rng)
+        tables.deal(np.arange(200))
+        policy = RandomPolicy(rng)
+        for _ in range(30):
+            rows = np.flatnonzero(~tables.over)
+            obs = tables.observe(rows)
+            for row, legal, can_pass in zip(rows, obs.legal, obs.can_pass):
+                hand = sum(int(count) << rank * RANK_BITS
+                           for rank, count in enumerate(tables.hands[row, tables.turn[row]]))
+                expected = set(legal_plays(hand, int(tables.top[row]), int(tables.required[row]),
+                                           bool(tables.reverse[row])))
+                self.assertEqual({(int(rank), int(n) + 1) for rank, n in zip(*np.nonzero(legal))}, expected)
+                self.assertEqual(bool(can_pass), tables.top[row] >= 0 or not expected)
+            tables.apply(rows, *policy(obs))
+
+    def test_same_games_as_fast_president(self):
+        for rules in ({}, {"best_card_loses": True}, {"revolution": False, "best_card_ends_round": False}):
+            tables = BatchTables(300, 4, np.random.default_rng(2), **rules)
+            tables.deal(np.arange(300))
+            states = fast_states(tables, **rules)
+            while not tables.over.all():
+                tables.step(WEAKEST)
+            for state, places in zip(states, tables.places):
+                self.assertEqual(state.rollout(epsilon=0), np.argsort(places).tolist())
+
+    def test_batch_decisions(self):
+        tables = BatchTables(100, 5, np.random.default_rng(3))
+        tables.deal(np.arange(100))
+        policy = LinearPolicy()
+        for _ in range(20):
+            rows = np.flatnonzero(~tables.over)
+            ranks, n_cards = policy(tables.observe(rows))
+            for row, rank, n in zip(rows, ranks, n_cards):  # one table at a time : same decisions
+                self.assertEqual(tuple(int(test[0]) for test in policy(tables.observe(np.array([row])))),
+                                 (rank, n))
+            tables.apply(rows, ranks, n_cards)
+
+    def test_play_batch(self):
+        stats = play_batch(1000, 4, [LinearPolicy(), RandomPolicy(np.random.default_rng(4))] * 2, batch_size=256)
+        self.assertEqual(stats.games, 1000)
+        ranks = np.array(stats.seat_ranks)
+        self.assertEqual(ranks.sum(axis=0).tolist(), [1000] * 4)  # every place given once per game
+        self.assertEqual(ranks.sum(axis=1).tolist(), [1000] * 4)
+        self.assertLess(ranks[0] @ np.arange(4), ranks[1] @ np.arange(4))  # plays better than random
+        self.assertGreaterEqual(stats.rounds, 1000)
+        self.assertEqual(play_batch(50, 3, seed=5).to_json(), play_batch(50, 3, seed=5).to_json())
+
+    def test_one_decision_for_many_tables(self):
+        decided = []  # tables deciding at each policy's call
+
+        def policy(obs):
+            decided.append(len(obs))
+            return WEAKEST(obs)
+        self.assertEqual(play_batch(2000, 4, policy, batch_size=500, seed=6).games, 2000)
+        self.assertEqual(decided[0], 500)  # every table played its turn at once
+        self.assertGreater(sum(decided) / len(decided), 100)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -5,12 +5,17 @@ Project: President-Game
 IDE: PyCharm
 Creation-date: 11/10/22
 """
+import copy
 import logging
+import pickle
 import unittest
 
 import coloredlogs
 
 from models import Card
+from models.games.card_games.card import CARDS
+from models.games.card_games.deck import Deck
+from rules import PresidentRules
 
 
 class TestCards(unittest.TestCase):
@@ -54,6 +59,25 @@ class TestCards(unittest.TestCase):
         self.assertIsNot(ace_of_hearts, ace_of_hearts2)
         self.assertIsNot(ace_of_hearts, two_of_hearts)
 
+    def test_cards_are_immutable_flyweights(self):
+        """ pre-built cards are shared, and nobody can alter them """
+        ace_of_hearts = Card.get('A', '♥')
+        self.assertIs(ace_of_hearts, Card.get('A', '♥'))
+        self.assertIs(ace_of_hearts, Card.from_id(ace_of_hearts.id))
+        self.assertEqual(len(CARDS), 52)
+        self.assertEqual(len({card.id for card in CARDS}), 52)
+        self.assertEqual(Card('A', '♥').id, ace_of_hearts.id)
+        self.assertTrue(Card.get('2', '♠').rank > ace_of_hearts.rank > Card.get('3', '♣').rank)
+        self.assertRaises(AttributeError, setattr, ace_of_hearts, "number", "2")
+
+    def test_copies_are_the_flyweights(self):
+        """ copied or unpickled, a pre-built card stays the one every Deck owns """
+        card = CARDS[5]
+        self.assertIs(copy.copy(card), card)
+        self.assertIs(copy.deepcopy([card])[0], card)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+        self.assertTrue(Deck(PresidentRules(4)).owns(copy.copy(card)))
+
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.DEBUG)
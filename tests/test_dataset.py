@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+import coloredlogs
+import numpy as np
+
+from models.games.card_games.card import NB_RANKS
+from models.games.card_games.moves import RANK_BITS, legal_plays
+from models.simulation.dataset import MANIFEST, NB_ACTIONS, OBS_SIZE, PASS_ACTION, generate_dataset, load_shards
+
+
+def generate(directory: str, nb_games: int, **options) -> list[dict]:
+    list(generate_dataset(directory, nb_games, **options))
+    return list(load_shards(directory))
+
+
+class TestDataset(unittest.TestCase):
+    """ Self-play decisions, streamed to shards """
+
+    def test_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            shards = generate(directory, 60, nb_players=4, processes=1, chunk_size=25, batch_size=16,
+                              shard_size=500)
+            with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+                manifest = json.load(file)
+        self.assertEqual(len(manifest["chunks"]), 3)
+        self.assertEqual(sum(len(shard["game"]) for shard in shards), manifest["samples"])
+        self.assertTrue(all(len(shard["game"]) == 500 for shard in shards[:2]))  # whole shards, but the last ones
+        for shard in shards:
+            obs, mask, action = shard["obs"], shard["mask"], shard["action"]
+            self.assertEqual((obs.shape[1], mask.shape[1]), (OBS_SIZE, NB_ACTIONS))
+            self.assertTrue(mask[np.arange(len(action)), action].all())  # legal actions only
+            for row in range(0, len(obs), 7):
+                hand = sum(int(count) << rank * RANK_BITS for rank, count in enumerate(obs[row, :NB_RANKS]))
+                top, required, reverse = (int(value) for value in obs[row, NB_RANKS:NB_RANKS + 3])
+                plays = {rank * 4 + n_cards - 1 for rank, n_cards in legal_plays(hand, top, required, bool(reverse))}
+                self.assertEqual(set(np.flatnonzero(mask[row, :PASS_ACTION])), plays)
+                self.assertEqual(obs[row, NB_RANKS + 3], obs[row, :NB_RANKS].sum())  # own hand first
+            for game in np.unique(shard["game"]):  # one rank per seat, every rank once
+                ranks = dict(zip(shard["seat"][shard["game"] == game], shard["rank"][shard["game"] == game]))
+                self.assertEqual(len(ranks), len(set(ranks.values())))
+                self.assertTrue(all(0 <= rank < 4 for rank in ranks.values()))
+
+    def test_reproducible(self):
+        with tempfile.TemporaryDirectory() as first, tempfile.TemporaryDirectory() as second:
+            alone = generate(first, 40, processes=1, chunk_size=20, seed=3)
+            pooled = generate(second, 40, processes=2, chunk_size=20, seed=3)
+        self.assertEqual(len(alone), len(pooled))
+        for shard, other in zip(alone, pooled):
+            self.assertEqual(shard.keys(), other.keys())
+            for field in shard:
+                self.assertTrue(np.array_equal(shard[field], other[field]), field)
+
+    def test_manifest_counts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            samples = sum(len(shard["game"]) for shard in generate(directory, 100, processes=1))
+            with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+                manifest = json.load(file)
+        self.assertEqual(manifest["games"], 100)
+        self.assertEqual(manifest["samples"], samples)
+        self.assertGreaterEqual(samples, 100 * 13)  # every card of every game played, passes aside
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import os
+import tempfile
+import unittest
+
+import coloredlogs
+
+from models.networking import Database
+
+
+class TestDatabase(unittest.TestCase):
+    """ Local results journal """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_save_and_read_back(self):
+        """ documents are appended, and readable by index or lazily """
+        db = Database("TestGame", sync_every=2)
+        docs = [{"game": "TestGame", "rounds": i, "players": ["Jean", "Zoé"]} for i in range(5)]
+        for doc in docs:
+            db.save(doc)
+        self.assertEqual(len(db), 5)
+        self.assertEqual(db[3], docs[3])
+        self.assertEqual(db[-1], docs[-1])
+        self.assertEqual(list(db), docs)
+        db.close()
+        self.assertEqual(list(Database.load(db.path)), docs)
+
+    def test_new_journal_per_database(self):
+        """ a Database never appends to a previous session's journal """
+        first, second = Database("TestGame"), Database("TestGame")
+        self.assertNotEqual(first.path, second.path)
+        first.save({"rounds": 1})
+        self.assertEqual(len(second), 0)
+        self.assertEqual(list(second), [])
+
+    def test_truncated_journal(self):
+        """ a document partially written (crash) is ignored """
+        db = Database("TestGame")
+        db.save({"rounds": 1})
+        db.close()
+        with open(db.path, 'ab') as fp:
+            fp.write(b'{"rounds": ')
+        self.assertEqual(list(Database.load(db.path)), [{"rounds": 1}])
+
+    def test_online_saves_nothing(self):
+        db = Database("TestGame", online=True)
+        db.save({"rounds": 1})
+        self.assertEqual(len(db), 0)
+        self.assertFalse(os.path.exists("Saves"))
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
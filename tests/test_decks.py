@@ -32,6 +32,13 @@ class TestDeck(unittest.TestCase):
         self.assertNotEqual(deck_1.cards, deck_2.cards, 'Shuffling a deck randomizes the '
                                                         'cards order')
 
+    def test_decks_share_cards(self):
+        """ decks reuse the same 52 pre-built cards, only their order changes """
+        deck_1 = Deck(PresidentRules(3))
+        deck_2 = Deck(PresidentRules(3)).shuffle()
+        self.assertTrue(all(deck_1.owns(card) for card in deck_2.cards))
+        self.assertEqual({id(card) for card in deck_1.cards}, {id(card) for card in deck_2.cards})
+
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.DEBUG)
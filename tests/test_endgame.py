@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import random
+import unittest
+from math import factorial
+from unittest import mock
+
+import coloredlogs
+
+from models.games import PresidentGame
+from models.games.card_games.card import Card
+from models.games.card_games.moves import RANK_BITS, hand_key
+from models.games.card_games.variances.president.endgame import ENDGAME_CARDS, SOLVER, EndgameSolver
+from models.games.card_games.variances.president.fast_president import FastPresident
+
+
+def exhaustive(state: FastPresident) -> list[int]:
+    """ the final ladder, every seat playing its best place : every line, nothing memoized """
+    if state.over:
+        return state.ladder
+    best = None
+    for action in state.actions():
+        child = state.copy()
+        child.apply(action)
+        ladder = exhaustive(child)
+        if best is None or ladder.index(state.turn) < best.index(state.turn):
+            best = ladder
+    return best
+
+
+def endgames(nb_positions: int, nb_players: int, nb_cards: int, seed: int, **rules):
+    """ random positions of games played until nb_cards are left at most """
+    rng = random.Random(seed)
+    while nb_positions:
+        state = FastPresident.deal(nb_players, rng, **rules)
+        while not state.over and sum(state.sizes) > nb_cards:
+            state.apply(state.default_action() if rng.random() < .7 else rng.choice(state.actions()))
+        if not state.over:
+            nb_positions -= 1
+            yield state
+
+
+def observed(state: FastPresident) -> FastPresident:
+    """ state, as its seat to play sees it : the others' cards are unknown """
+    state = state.copy()
+    state.observer = state.turn
+    state.unknown = tuple(rank for seat, hand in enumerate(state.hands) if seat != state.turn
+                          for rank in range(13) for _ in range(hand >> rank * RANK_BITS & (1 << RANK_BITS) - 1))
+    return state
+
+
+class TestEndgame(unittest.TestCase):
+    """ Exact endgames, memoized in a transposition table """
+
+    def test_same_places_as_exhaustive_search(self):
+        for rules in ({}, {"best_card_loses": True}, {"revolution": False, "best_card_ends_round": False}):
+            solver = EndgameSolver()
+            for state in endgames(30, 3, 5, seed=1, **rules):
+                playing = [seat for seat in exhaustive(state) if not state.done >> seat & 1]
+                self.assertEqual(solver.solve(state).index(state.turn), playing.index(state.turn))
+
+    def test_best_card_loses(self):
+        two, five = Card("2", "♥"), Card("5", "♥")
+        hands = [hand_key([two, five]), hand_key([Card("K", "♥"), Card("K", "♠")])]
+        solver = EndgameSolver()
+        self.assertIn(solver.best_action(FastPresident(hands)), [(five.rank, 1), (two.rank, 1)])
+        # finishing with the 2 would lose : play it first, it ends the round, then finish with the 5
+        self.assertEqual(solver.best_action(FastPresident(hands, best_card_loses=True)), (two.rank, 1))
+        self.assertEqual(solver.solve(FastPresident(hands, best_card_loses=True)), (0, 1))
+
+    def test_deals(self):
+        state = observed(next(endgames(1, 4, 10, seed=2)))
+        unknown = len(state.unknown)
+        sizes = [size for seat, size in enumerate(state.sizes) if seat != state.observer]
+        total = 0
+        for deal, weight in EndgameSolver.deals(state):
+            self.assertEqual(deal.sizes, state.sizes)
+            self.assertEqual(deal.hands[state.observer], state.hands[state.observer])
+            self.assertEqual(sum(deal.hands) - deal.hands[state.observer],
+                             sum(1 << rank * RANK_BITS for rank in state.unknown))
+            total += weight
+        ways = factorial(unknown)
+        for size in sizes:
+            ways //= factorial(size)
+        self.assertEqual(total, ways)  # every deal of the cards, once
+
+    def test_transposition_table(self):
+        solver = EndgameSolver()
+        for state in endgames(50, 4, ENDGAME_CARDS, seed=3):
+            solver.best_action(observed(state))
+        self.assertGreater(solver.hits, 0)
+        solver.solve(state)
+        misses = solver.misses
+        solver.solve(state)
+        self.assertEqual(solver.misses, misses)  # solved once
+
+    def test_ais_play_endgames(self):
+        for seed in range(3):
+            game = PresidentGame(0, 4, seed=seed, save=False)
+            solved = SOLVER.hits + SOLVER.misses
+            with mock.patch("builtins.print"):
+                game._initialize_game()
+                game._play_game()
+                result = game.save_results(game.game_name)
+            self.assertEqual(len(result["winners"]), 4)
+            self.assertGreater(SOLVER.hits + SOLVER.misses, solved)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
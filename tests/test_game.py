@@ -5,16 +5,28 @@ IDE: PyCharm
 Creation-date: 11/17/22
 """
 import logging
+import os
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 import coloredlogs
 
 from models import utils
 from models.games import PresidentGame
+from models.games.apis.game_server import GAME_CLASS, GameServer, create_app, game_class_path
+from models.networking import Database, diff, patch
+from models.networking.responses import Message
 from models.players.player import Player
 from models.utils import measure_perf
 
 
+class OtherGame(PresidentGame):
+    """ any game but the default one """
+
+
 class TestGame(unittest.TestCase):
     """ Test many aspect of President game
      to ensure CardGame + President Game works as expected """
@@ -30,6 +42,25 @@ class TestGame(unittest.TestCase):
         self.assertEqual(original, re_altered)
 
 
+    def test_results_reach_the_disk(self):
+        """ once the table is done, its journal is synced and closed """
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(tmp.name)  # journals are saved under ./Saves
+        game = PresidentGame(nb_games=2, save=True, seed=4)
+        with mock.patch.object(Database, "close", autospec=True, side_effect=Database.close) as close, \
+                mock.patch("builtins.print"):
+            game.start(override_test=True)
+            game.close()  # already closed : nothing to do
+        close.assert_called_once()
+        journal = close.call_args.args[0]
+        self.assertGreater(len(journal), 0)
+        self.assertEqual(len(list(Database.load(journal.path))), len(journal))
+        with self.assertLogs("Game", logging.WARNING) as logs:
+            game.save_results(game.game_name)
+        self.assertIn("closed", logs.output[0])
+
     def test_default_game_has_three_players(self):
         """ test that given no arguments, game start with 3 AIS"""
         game = PresidentGame(nb_games=True, save=False)
@@ -82,6 +113,114 @@ class TestGame(unittest.TestCase):
         self.assertNotEqual(player_2.hand, p2_copy)
         self.assertTrue(card in player_2.hand)  # __eq__
 
+    def test_game_server_wraps_headless_game(self):
+        """ Game engines are not web applications, a GameServer serves them """
+        game = PresidentGame(nb_games=True, save=False)
+        self.assertFalse(hasattr(game, "route"))
+        client = GameServer(game).test_client()
+        response = client.post("/Connect/Mistayan")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(game.get_player("Mistayan").token, response.headers.get("token"))
+        response = client.get("/Update/Mistayan", headers={"token": response.headers.get("token")})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["game"]["players"][-1][0], "Mistayan")
+        self.assertEqual(client.get("/Update/Mistayan", headers={"token": "nope"}).status_code, 403)
+
+    def test_wsgi_factory_serves_the_given_game(self):
+        """ WSGI servers are processes of their own : the game class goes through their environment """
+        with mock.patch.dict(os.environ, {GAME_CLASS: game_class_path(OtherGame)}):
+            self.assertIsInstance(create_app().game, OtherGame)
+        with mock.patch.dict(os.environ, {GAME_CLASS: ""}):
+            self.assertIs(type(create_app().game), PresidentGame)
+
+    def test_game_wakes_up_on_player_action(self):
+        """ the game resumes as soon as the player's action is received, no polling """
+        game = PresidentGame(nb_players=1, nb_ai=2, nb_games=True, save=False)
+        human = game.players[0]
+        human.is_action_required = True
+        waited = []
+        waiter = threading.Thread(target=lambda: waited.append(game._wait_player_action(human)))
+        with mock.patch("time.sleep") as sleep, mock.patch.object(human, "wait_for", wraps=human.wait_for) as wait:
+            waiter.start()
+            game.on_fold(human.name, {"token": human.token}, b'{"request": {"plays": []}}')
+            waiter.join(timeout=5)  # well below Message.TIMEOUT : the fold woke the game up
+        self.assertFalse(waiter.is_alive())
+        self.assertTrue(human.folded)
+        sleep.assert_not_called()
+        wait.assert_called_once()
+
+    def test_human_thinking_longer_than_timeout(self):
+        """ a seated human is asked until answering, a human leaving answers no """
+        for leaves in False, True:
+            game = PresidentGame(nb_players=1, nb_ai=2, nb_games=True, save=False)
+            game.status, game.skip_inputs = game.SERVER_RUNNING, False
+            human = game.players[0]
+            timed_out = threading.Event()
+
+            def wait_for(predicate, timeout=None, _wait_for=human.wait_for):
+                if not _wait_for(predicate, timeout):
+                    timed_out.set()
+                    return False
+                return True
+            answers = []
+            with mock.patch.object(Message, "TIMEOUT", .05), mock.patch.object(human, "wait_for", wait_for):
+                asking = threading.Thread(target=lambda: answers.append(game._ask_yesno(human, "Another Game")))
+                asking.start()
+                self.assertTrue(timed_out.wait(5))
+                if leaves:
+                    game.unregister(human)
+                else:
+                    game.on_give(human.name, {"token": human.token}, "yes")
+                asking.join(timeout=5)
+            self.assertFalse(asking.is_alive())
+            self.assertEqual(answers, [not leaves])
+
+    def test_update_long_polling(self):
+        """ an Update giving the current version waits for the next change """
+        game = PresidentGame(nb_games=True, save=False)
+        client = GameServer(game).test_client()
+        token = client.post("/Connect/Mistayan").headers.get("token")
+        version = client.get("/Update/Mistayan", headers={"token": token}).json["version"]
+        self.assertEqual(version, game.version)
+        hello = {'message': "Info", 'content': "Hello"}
+        threading.Timer(0.1, game._send, args=(game.get_player("Mistayan"), hello)).start()
+        start = time.perf_counter()
+        response = client.get("/Update/Mistayan", headers={"token": token, "version": str(version)})
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertGreater(response.json["version"], version)
+        self.assertEqual(response.json["player"]["messages"][-1]["content"], "Hello")
+
+    def test_update_deltas(self):
+        """ a client acknowledging the last version gets only changes, which rebuild the full state """
+        game = PresidentGame(nb_games=True, save=False)
+        client = GameServer(game).test_client()
+        token = client.post("/Connect/Mistayan").headers.get("token")
+        full = client.get("/Update/Mistayan", headers={"token": token}).json
+        self.assertNotIn("delta", full)
+        game_state, player_state = full["game"], full["player"]
+        game._initialize_game()
+        game.send_all("Hello")
+        headers = {"token": token, "version": str(full["version"])}
+        response = client.get("/Update/Mistayan", headers=headers).json
+        self.assertTrue(response["delta"])
+        self.assertNotIn("game", response["game"])  # name did not change
+        patch(game_state, response["game"])
+        patch(player_state, response["player"])
+        expected = client.get("/Update/Mistayan", headers={"token": token}).json
+        self.assertEqual(game_state, expected["game"])
+        self.assertEqual(player_state["hand_n"], expected["player"]["hand_n"])
+        # an unknown version gets the full state
+        headers["version"] = "-1"
+        self.assertNotIn("delta", client.get("/Update/Mistayan", headers=headers).json)
+
+    def test_delta_appends(self):
+        """ lists that grew are sent as their new items """
+        old = {"plays": [["3"], ["4", "4"]], "turn": 2, "rules": {}}
+        new = {"plays": [["3"], ["4", "4"], ["K"]], "turn": 3}
+        delta = diff(old, new)
+        self.assertEqual(delta, {"+": {"plays": [["K"]]}, "turn": 3, "-": ["rules"]})
+        self.assertEqual(patch(old, delta), new)
+
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.DEBUG)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import os
+import subprocess
+import sys
+import unittest
+
+import coloredlogs
+
+BASEDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE = ("models.games.card_games.variances", "models.players.ai", "models.players.search_ai", "models.simulation")
+HEAVY = ("flask", "werkzeug", "requests", "pymongo", "PIL", "coloredlogs", "asyncio", "numpy")
+ENGINE_IMPORT_BUDGET = 1.  # seconds : ~0.07 here, ~0.4 when the web and DB layers leak in
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    """ a fresh interpreter, where nothing is imported yet """
+    return subprocess.run([sys.executable, *options, "-c", code], cwd=BASEDIR, capture_output=True, text=True,
+                          check=True, env={**os.environ, "PYTHONPATH": BASEDIR})
+
+
+def import_time(module: str) -> float:
+    """ cumulated time (seconds) to import a module and its dependencies (python -X importtime) """
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    for line in reversed(stderr.splitlines()):
+        _, cumulated, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulated) / 1e6
+    raise ValueError(f"{module} not imported")
+
+
+class TestImports(unittest.TestCase):
+    """ Engine users (simulations, tests, AIs) do not pay for the web, client and storage layers """
+
+    def test_engine_is_lightweight(self):
+        loaded = run_python(f"import sys, {', '.join(ENGINE)}\n"
+                            f"print(' '.join(m for m in {HEAVY} if m in sys.modules))").stdout.split()
+        self.assertEqual(loaded, [])
+
+    def test_import_time(self):
+        for module in ENGINE:
+            elapsed = import_time(module)
+            logging.info("import %s : %.1f ms", module, elapsed * 1000)
+            self.assertLess(elapsed, ENGINE_IMPORT_BUDGET, module)
+
+    def test_lazy_exports(self):
+        """ re-exported names are still reachable from the packages """
+        out = run_python("import sys, models\n"
+                         "print('requests' in sys.modules, 'Interface' in dir(models))\n"
+                         "from models import PresidentGame, Interface, CheaterDetected\n"
+                         "from models.networking import MongoConnector, Update\n"
+                         "print('requests' in sys.modules, 'pymongo' in sys.modules)").stdout.split()
+        self.assertEqual(out, ["False", "True", "True", "True"])
+        with self.assertRaises(subprocess.CalledProcessError):
+            run_python("from models import Nope")
+
+    def test_conf_is_silent(self):
+        self.assertEqual(run_python("import conf").stdout, "")
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import coloredlogs
+from pymongo.errors import ServerSelectionTimeoutError
+
+from models.networking import Database, MongoConnector
+
+
+class FakeCollection:
+    """ In-process stand-in for a pymongo Collection """
+
+    def __init__(self):
+        self.docs = []
+        self.batches = []
+        self.down = False
+        self.error = None  # raised by inserts, if set
+        self.gate = threading.Event()  # cleared : inserts wait (slow server)
+        self.gate.set()
+
+    def insert_many(self, docs, ordered=True):
+        self.gate.wait()
+        if self.down:
+            raise ServerSelectionTimeoutError("fake server is down")
+        if self.error:
+            raise self.error
+        self.batches.append(len(docs))
+        self.docs.extend(docs)
+
+
+class FakeClient:
+    """ In-process stand-in for a MongoClient """
+
+    def __init__(self):
+        self.collections = {}
+
+    def get_database(self, name):
+        return self
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+
+class TestMongoConnector(unittest.TestCase):
+    """ Background, batched writes to MongoDB """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.client = FakeClient()
+        self.collection = self.client["TestGame"]
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_batched_inserts(self):
+        """ documents are written by batches, and flush waits for them """
+        mongo = MongoConnector("TestGame", client=self.client, batch_size=4, flush_interval=60)
+        mongo.save([{"rounds": i} for i in range(10)])
+        mongo.flush()
+        self.assertEqual(self.collection.docs, [{"rounds": i} for i in range(10)])
+        self.assertEqual(self.collection.batches, [4, 4, 2])
+        self.assertIsNone(mongo.journal)
+        mongo.close()
+
+    def test_flush_interval(self):
+        """ an incomplete batch is written once flush_interval elapsed """
+        mongo = MongoConnector("TestGame", client=self.client, batch_size=100, flush_interval=0.01)
+        mongo.save({"rounds": 1})
+        deadline = time.monotonic() + 10
+        while not self.collection.docs and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.collection.docs, [{"rounds": 1}])  # written before close flushes
+        mongo.close()
+
+    def test_spill_when_unreachable(self):
+        """ what MongoDB cannot take goes to the local journal """
+        self.collection.down = True
+        mongo = MongoConnector("TestGame", client=self.client, batch_size=2)
+        mongo.save([{"rounds": i} for i in range(3)])
+        mongo.close()
+        self.assertEqual(self.collection.docs, [])
+        self.assertEqual(list(Database.load(mongo.journal.path)), [{"rounds": i} for i in range(3)])
+
+    def test_refused_documents(self):
+        """ errors other than MongoDB's spill locally, and do not stop the writer """
+        self.collection.error = TypeError("not a document")
+        mongo = MongoConnector("TestGame", client=self.client, batch_size=2)
+        mongo.save([{"rounds": i} for i in range(2)])
+        mongo.flush()
+        self.assertEqual(list(Database.load(mongo.journal.path)), [{"rounds": 0}, {"rounds": 1}])
+        with mock.patch.object(Database, "save", side_effect=OSError("disk full")):
+            mongo.save([{"rounds": 2}])
+            mongo.flush()  # lost, but the writer lives on
+        self.collection.error = None
+        mongo.save([{"rounds": 3}])
+        mongo.flush()
+        self.assertEqual(self.collection.docs, [{"rounds": 3}])
+        mongo.close()
+
+    def test_backpressure(self):
+        """ a full queue slows saves down, then spills instead of growing """
+        self.collection.gate.clear()
+        mongo = MongoConnector("TestGame", client=self.client, batch_size=1, queue_size=2, put_timeout=0.01)
+        mongo.save([{"rounds": i} for i in range(6)])
+        self.assertIsNotNone(mongo.journal)
+        self.collection.gate.set()
+        mongo.close()
+        saved = self.collection.docs + list(Database.load(mongo.journal.path))
+        self.assertEqual(sorted(doc["rounds"] for doc in saved), list(range(6)))
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import random
+import time
+import unittest
+
+import coloredlogs
+
+from models.games import PresidentGame
+from models.games.card_games.card import Card, CARDS
+from models.games.card_games.moves import hand_key, legal_plays
+
+
+def trial_and_restore(game: PresidentGame, player) -> set:
+    """ legal plays, found the way they used to be : take the cards from hand, test them, give them back """
+    plays = set()
+    for number in dict.fromkeys(card.number for card in player.hand):
+        for n_cards in [game.required_cards] if game.required_cards else range(1, 5):
+            taken = []
+            for _ in range(n_cards):
+                card = player.validate_input(number)
+                if card:
+                    taken.append(player.remove_from_hand(card))
+            if len(taken) == n_cards and all(game.card_can_be_played(card) for card in taken):
+                plays.add((taken[0].rank, n_cards))
+            [player.add_to_hand(card) for card in taken]
+    return plays
+
+
+def positions(nb_positions: int, seed: int):
+    """ random (game, player) positions : pile's top, required cards and revolution """
+    rng = random.Random(seed)
+    game = PresidentGame(0, 4, seed=seed, save=False)
+    game._initialize_game()
+    for _ in range(nb_positions):
+        game.pile.clear()
+        if rng.random() < .8:
+            game.pile.append(rng.choice(CARDS))
+        game.required_cards = rng.randint(0, 4)
+        game._revolution = rng.random() < .3
+        yield game, rng.choice(game.players)
+
+
+class TestMoves(unittest.TestCase):
+    """ One memoized generator of legal plays, for the server and the AIs """
+
+    def test_legal_plays(self):
+        three, queen = Card("3", "♥"), Card("Q", "♥")
+        hand = hand_key([three, Card("3", "♠"), queen, Card("2", "♣")])
+        self.assertEqual(legal_plays(hand), ((0, 1), (0, 2), (9, 1), (12, 1)))  # first to play : any combo
+        self.assertEqual(legal_plays(hand, queen.rank, 1), ((9, 1), (12, 1)))
+        self.assertEqual(legal_plays(hand, queen.rank, 2), ())
+        self.assertEqual(legal_plays(hand, queen.rank, 1, reverse=True), ((0, 1), (9, 1)))  # revolution
+        self.assertEqual(legal_plays(hand, -1, 2), ((0, 2),))
+
+    def test_same_plays_as_trial_and_restore(self):
+        for game, player in positions(300, seed=1):
+            hand = list(player.hand)
+            self.assertEqual(set(game.legal_plays(player.hand)), trial_and_restore(game, player))
+            self.assertEqual(list(player.hand), hand)
+            for rank, n_cards in game.legal_plays(player.hand, game.required_cards or 1):
+                self.assertTrue(game.is_legal_play([card for card in hand if card.rank == rank][:n_cards]))
+
+    def test_positions_are_memoized(self):
+        legal_plays.cache_clear()
+        trials = generated = 0.
+        games = list(positions(500, seed=2))
+        for game, player in games:
+            start = time.perf_counter()
+            trial_and_restore(game, player)
+            trials += time.perf_counter() - start
+            start = time.perf_counter()
+            game.legal_plays(player.hand)
+            generated += time.perf_counter() - start
+        logging.info("trial and restore : %.1f ms, generator : %.1f ms", trials * 1000, generated * 1000)
+        misses = legal_plays.cache_info().misses
+        plays = [game.legal_plays(player.hand) for game, player in games]  # same positions : nothing generated
+        self.assertEqual(legal_plays.cache_info().misses, misses)
+        self.assertEqual(plays, [game.legal_plays(player.hand) for game, player in games])
+
+    def test_not_enough_cards_are_not_taken(self):
+        game = PresidentGame(0, 3, seed=5, save=False)
+        game._initialize_game()
+        player = game.players[0]
+        hand = list(player.hand)
+        number = next(card.number for card in hand if player.hand.count_of(card) < 4)
+        self.assertEqual(player._play_cards(4, number), [])
+        self.assertEqual(list(player.hand), hand)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import json
+import logging
+import threading
+import unittest
+from unittest import mock
+
+import coloredlogs
+import requests
+
+from models import Card
+from models.interfaces import Interface
+from models.networking.responses import Fold, Play, Update
+from models.players.player import Human
+
+
+class TestPipelining(unittest.TestCase):
+    """ Interface's requests, against mocked sessions (no server needed) """
+
+    def setUp(self):
+        self.sessions = []
+
+        def new_session():
+            session = mock.MagicMock(name=f"session {len(self.sessions)}")
+            session.request.return_value.status_code = 200
+            self.sessions.append(session)
+            return session
+        patcher = mock.patch("models.interfaces.interface_template.requests.Session", side_effect=new_session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.player = Human(name="Mistayan")
+        self.interface = Interface(self.player, nobanner=True, pipelining=True)
+        self.interface._game = "127.0.0.1:5001"
+        self.addCleanup(setattr, self.interface, "_game", None)  # nothing to disconnect from
+        self.main, self.worker = self.sessions
+
+    @staticmethod
+    def sent(session) -> list[dict]:
+        """ bodies sent through session, in order """
+        return [json.loads(call.kwargs["data"]) for call in session.request.call_args_list]
+
+    def test_templates_do_not_leak(self):
+        """ a message's body is its own, whatever the next messages of its type change """
+        Play.request["plays"] = ["5♥"]
+        first = self.interface._send(msg=Play)
+        Play.request["plays"] = ["7♠"]
+        self.interface._send(msg=Play)
+        Play.request["plays"] = []
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual([body["request"]["plays"] for body in self.sent(self.main)], [["5♥"], ["7♠"]])
+        self.assertEqual(Play.headers, {"token": None, "player": None})
+
+    def test_fill_headers_copies(self):
+        headers = self.interface._fill_headers(Update)
+        self.assertEqual(headers["player"], "Mistayan")
+        self.assertIsNot(headers, Update.headers)
+        self.assertEqual(Update.headers, {"token": None, "player": None, "version": None})
+
+    def test_actions_in_order_on_worker_session(self):
+        release = threading.Event()
+        self.worker.request.side_effect = lambda **_: release.wait(5) and mock.DEFAULT
+        Play.request["plays"] = ["5♥"]
+        self.interface._send_pipelined(Play)
+        Play.request["plays"] = []
+        last = self.interface._send_pipelined(Fold)
+        self.assertTrue(self.interface.action_in_flight)
+        release.set()
+        last.result(timeout=5)
+        self.assertFalse(self.interface.action_in_flight)
+        self.assertEqual([body["request"]["message"] for body in self.sent(self.worker)], ["Play", "Fold"])
+        self.assertEqual(self.sent(self.worker)[0]["request"]["plays"], ["5♥"])
+        self.main.request.assert_not_called()
+
+    def test_one_action_in_flight(self):
+        release = threading.Event()
+        self.worker.request.side_effect = lambda **_: release.wait(5) and mock.DEFAULT
+        actions = []
+        send_pipelined = self.interface._send_pipelined
+        with mock.patch.object(self.player, "play", return_value=[Card.get('5', '♥')]) as play, \
+                mock.patch.object(self.interface, "_send_pipelined",
+                                  side_effect=lambda msg: actions.append(send_pipelined(msg)) or actions[-1]):
+            self.interface.request_player_action()
+            self.interface.request_player_action()  # the first one is not answered yet
+            play.assert_called_once()
+            release.set()
+            actions[-1].result(timeout=5)
+            self.interface.request_player_action()
+            actions[-1].result(timeout=5)
+        Play.request["plays"] = []
+        self.assertEqual(play.call_count, 2)
+        self.assertEqual(self.worker.request.call_count, 2)
+
+    def test_failed_action_disconnects(self):
+        """ nobody waits on pipelined actions : a failure is logged, and the interface disconnected """
+        self.worker.request.side_effect = requests.ConnectionError("refused")
+        logged = threading.Event()
+        with mock.patch.object(self.interface.logger, "error", side_effect=lambda *_: logged.set()) as error:
+            action = self.interface._send_pipelined(Fold)
+            self.assertRaises(requests.ConnectionError, action.result, 5)
+            self.assertTrue(logged.wait(5))  # callbacks run once the action is done
+        self.assertIn("Fold", error.call_args.args)
+        self.assertEqual(self.interface.status, Interface.DISCONNECTED)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
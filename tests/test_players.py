@@ -10,7 +10,8 @@ import unittest
 
 import coloredlogs
 
-from models import Human, Card
+from models import Human, AI, Card
+from models.players.hands import BitHand, ListHand
 from models.utils import measure_perf
 
 
@@ -67,6 +68,53 @@ class TestPlayers(unittest.TestCase):
         player.add_to_hand(card)  # Nothing tells us that we cannot have the same card twice
         self.assertEqual(player.hand, [card, card])
 
+    def test_bit_hand(self):
+        """ Ensure the bitboard hand behaves like the list one """
+        hand = BitHand([Card.get('2', '♥'), Card.get('5', '♠'), Card.get('5', '♥')])
+        self.assertEqual(len(hand), 3)
+        self.assertEqual(hand.max_combo, 2)
+        self.assertEqual(hand[-1], '2', "hand is sorted by cards power")
+        self.assertTrue('5' in hand)
+        copy = hand.copy()
+        self.assertEqual(list(copy), list(hand))
+        self.assertIsNot(copy._as_list(), hand._as_list(), "copies do not share their list view")
+        self.assertIs(hand.discard(Card.get('5', '♠')), Card.get('5', '♠'), "exact card is removed")
+        self.assertEqual(hand.count_of('5'), 1)
+        self.assertEqual(len(copy), 3, "copies are independent")
+        self.assertRaises(ValueError, hand.add, Card.get('2', '♥'))
+
+    def test_hand_statistics(self):
+        """ AIs' statistics follow the cards dealt, exchanged and played """
+        cards = [Card.get('3', '♥'), Card.get('3', '♠'), Card.get('5', '♥'), Card.get('5', '♠'),
+                 Card.get('K', '♥'), Card.get('K', '♠'), Card.get('K', '♣')]
+        hand, reference = BitHand(cards), ListHand(cards)
+        hand.discard(Card.get('5', '♥'))
+        reference.discard(Card.get('5', '♥'))
+        hand.add(Card.get('2', '♦'))
+        reference.add(Card.get('2', '♦'))
+        copy = hand.copy()
+        hand.discard(Card.get('2', '♦'))
+        self.assertEqual([hand.combos(size) for size in range(5)], [10, 1, 1, 1, 0])
+        self.assertEqual(hand.max_combo, 3)
+        self.assertEqual(hand.power(2), 0)  # the 3s
+        self.assertEqual(hand.power(2, reverse=True), 12)
+        self.assertAlmostEqual(hand.weakness(), 2 / 1 + 1 / 3 + 3 / 11)
+        for size in range(5):
+            self.assertEqual(copy.combos(size), reference.combos(size))
+            self.assertEqual(copy.power(size, True), reference.power(size, True))
+        self.assertAlmostEqual(copy.weakness(True), reference.weakness(True))
+
+    def test_ai_hand_is_a_bit_hand(self):
+        """ AIs use the bitboard backend, while keeping a list-like hand """
+        player = AI()
+        player.add_to_hand(Card.get('K', '♣'))
+        player.add_to_hand(Card.get('3', '♣'))
+        self.assertIsInstance(player.hand, BitHand)
+        self.assertEqual(player.hand_as_numbers, ['3', 'K'])
+        self.assertEqual(player.all_of_combo(1), {('3', 1): 1, ('K', 1): 1})
+        player.hand = []
+        self.assertEqual(player.hand, [])
+
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.DEBUG)
@@ -12,6 +12,7 @@ import coloredlogs
 
 from models import CheaterDetected
 from models import PresidentGame, Card
+from models.players.hands import BitHand
 from models.utils import measure_perf
 from rules import GameRules, PresidentRules
 
@@ -79,6 +80,23 @@ class TestPresidentGame(unittest.TestCase):
         GameRules.USE_REVOLUTION = False
         self.assertEqual(strongest_before, game.strongest_card)
 
+    def test_revolution_lets_any_card_cover(self):
+        """ during a revolution, any card can be played on the pile (required cards still apply) """
+        game = PresidentGame(0, 3, nb_games=1, save=False)
+        game._initialize_game()
+        three, ace = Card.get('3', '♣'), Card.get('A', '♠')
+        hand = BitHand([three, ace])
+        game.pile.append(Card.get('K', '♥'))
+        game.required_cards = 1
+        self.assertEqual(game.legal_plays(hand), ((ace.rank, 1),))
+        self.assertFalse(game.is_legal_play([three]))
+        GameRules.USE_REVOLUTION = True
+        game.set_revolution()
+        GameRules.USE_REVOLUTION = False
+        self.assertEqual(game.legal_plays(hand), ((three.rank, 1), (ace.rank, 1)))
+        self.assertTrue(game.is_legal_play([three]) and game.card_can_be_played(ace))
+        self.assertFalse(game.is_legal_play([three, Card.get('3', '♥')]))
+
     def test_one_game_3_AIs_with_ladder(self):
         """ Test that winners() triggers as soon as game is over """
         # the simple fact that it runs until the end is proof
@@ -135,6 +153,28 @@ class TestPresidentGame(unittest.TestCase):
         # Ensure a player with cards from the game can play them all
         self.assertTrue(game._do_play(1, player2, player2.hand))
 
+    def test_finish_with_best_card_loses(self):
+        """ emptying one's hand with the best card loses the game, when the rule says so """
+        game = PresidentGame(0, 3, nb_games=1, save=False, seed=1)
+        game._initialize_game()
+        self.assertTrue(game.game_rules.finish_with_best_card_loose)
+        finishers = []
+        for number in game.game_rules.VALUES[-1], game.game_rules.VALUES[0]:  # best card, another one
+            player = next(test for test in game.players if test not in finishers and
+                          any(card.number == number for card in test.hand))
+            card = next(card for card in player.hand if card.number == number)
+            [player.remove_from_hand(test) for test in list(player.hand) if test is not card]
+            game._free_pile()
+            game._do_play(game.players.index(player), player, [player.remove_from_hand(card)])
+            finishers.append(player)
+        best, other = finishers
+        self.assertEqual([loser[0] for loser in game.losers], [best])
+        self.assertEqual([winner[0] for winner in game._winners], [other])
+        game._run = False
+        ladder = {winner["player"]: winner for winner in game.winners()}
+        self.assertTrue(ladder[best.name]["lost"] and ladder[best.name]["best_card"])  # recorded in results
+        self.assertNotIn("best_card", ladder[other.name])
+
     def test_next_player(self):
         """ test if next player is the one expected """
         GameRules.QUEEN_OF_HEART_STARTS = True
@@ -153,6 +193,32 @@ class TestPresidentGame(unittest.TestCase):
         self.assertNotEqual(second_player_index, third_player_index, "next player should not be the same as the last")
         self.assertNotEqual(first_player_index, third_player_index, "last player should not be the same as the first")
 
+    def test_table_counters(self):
+        """ counters follow players status changes, and ignore players out of the table """
+        game = PresidentGame(nb_players=0, nb_ai=4, save=False)
+        game._initialize_game()
+        p1, p2, p3, p4 = game.players
+        p1.set_played()
+        p2.set_fold()
+        p2.set_fold()  # no change, no count
+        p3.set_win()
+        p3.set_fold()
+        self.assertEqual(game._count_still_alive, 3)
+        self.assertEqual(game._count_active_players, 1)
+        self.assertEqual(game._count_active_players, game._active_players.count(True))
+        self.assertFalse(game.everyone_folded)
+        p1.set_fold()
+        p4.set_win()
+        self.assertTrue(game.everyone_folded)
+        self.assertFalse(game._everyone_played)
+        game.players.remove(p4)
+        game._on_players_changed()
+        p4.set_win(False)  # not seated anymore
+        self.assertEqual(game._count_still_alive, 2)
+        game._reset_players_status()
+        self.assertEqual(game._count_active_players, 2)
+        self.assertEqual(game.count_humans, 0)
+
 
 if __name__ == '__main__':
     coloredlogs.set_level(logging.DEBUG)
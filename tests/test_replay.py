@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import json
+import logging
+import unittest
+from collections import Counter
+from unittest import mock
+
+import coloredlogs
+
+from models.games import PresidentGame, ReplayDiverged
+from models.games.replay import replay
+
+
+def state(game) -> tuple:
+    """ what players can see of a table """
+    return ([(player.name, list(player.hand), player.folded, player.won) for player in game.players],
+            game.plays, list(game.pile), [winner[:2] for winner in game._winners])
+
+
+class TestReplay(unittest.TestCase):
+    """ Tables are described by seed, rules, seats and decisions """
+
+    @staticmethod
+    def play_with_human(seed: int) -> PresidentGame:
+        """ a served table with a human : plays his weakest legal cards, folds otherwise """
+        game = PresidentGame(1, 3, "Mistayan", nb_games=True, seed=seed, save=False)
+        human = game.players[0]
+        headers = {"token": human.token}
+        with mock.patch("builtins.print"):
+            game.on_start(human.name, headers)
+            version = -1
+            while not game.actions or game.actions[-1][1] != "another_game":  # until the game is over
+                version = game.wait_change(version, 5)
+                if not human.is_action_required or not human.is_active:
+                    continue
+                required = game.required_cards or 1
+                legal = Counter(card.number for card in human.hand if game.card_can_be_played(card))
+                plays = next(([f"{number},Heart"] * required for number, count in legal.items()
+                              if count >= required), [])
+                game.on_play(human.name, headers, json.dumps({"request": {"plays": plays}}).encode())
+        return game
+
+    def test_same_seed_same_table(self):
+        first, second = PresidentGame(0, 4, seed=42, save=False), PresidentGame(0, 4, seed=42, save=False)
+        self.assertEqual([player.name for player in first.players], [player.name for player in second.players])
+        first._initialize_game()
+        second._initialize_game()
+        self.assertEqual(state(first), state(second))
+        self.assertNotEqual(state(first), state(PresidentGame(0, 4, seed=43, save=False)))
+
+    def test_replay_ai_table(self):
+        game = PresidentGame(0, 4, seed=7, save=False)
+        with mock.patch("builtins.print"):
+            [game.start(override_test=True) for _ in range(3)]
+        record = game.record()
+        self.assertEqual(len(record["actions"]), 3)
+        replayed = replay(record)
+        self.assertEqual(state(replayed), state(game))
+        self.assertEqual(replayed.actions, game.actions)
+
+    def test_replay_human_decisions(self):
+        game = self.play_with_human(seed=3)
+        record = game.record()
+        self.assertIn("play", [kind for _, kind, *_ in record["actions"]])
+        self.assertEqual(state(replay(record)), state(game))
+
+        # a record stopping during a game : the table waits for the next decision
+        plays = [i for i, (_, kind, *_) in enumerate(record["actions"]) if kind == "play"]
+        partial = replay(dict(record, actions=record["actions"][:plays[len(plays) // 2]]))
+        human = partial.get_player("Mistayan")
+        self.assertTrue(partial._run and human.is_action_required)
+        self.assertEqual(sum(len(player.hand) for player in partial.players)
+                         + sum(map(len, partial.plays)) + len(partial.pile), 52)
+
+    def test_replay_diverges(self):
+        record = self.play_with_human(seed=3).record()
+        with self.assertRaises(ReplayDiverged):
+            replay(dict(record, seed=4))
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import itertools
+import logging
+import random
+import unittest
+from unittest import mock
+
+import coloredlogs
+
+from models.games import PresidentGame
+from models.games.card_games.card import Card, NB_RANKS, NB_SUITS
+from models.games.card_games.moves import RANK_BITS, hand_key
+from models.games.card_games.variances.president.fast_president import FastPresident, PASS
+from models.players import SearchAI
+from models.players.search_ai import search
+
+
+def hand(*numbers: str) -> int:
+    return hand_key(Card(number, "♥") for number in numbers)
+
+
+def counts(key: int) -> list[int]:
+    return [key >> rank * RANK_BITS & (1 << RANK_BITS) - 1 for rank in range(NB_RANKS)]
+
+
+def rank(number: str) -> int:
+    return Card(number, "♥").rank
+
+
+class CheckedSearchAI(SearchAI):
+    """ checks every state it observes against the real game """
+
+    def __init__(self, test: unittest.TestCase, **kwargs):
+        super().__init__(**kwargs)
+        self.test = test
+
+    def choose(self, state: FastPresident) -> tuple[int, int]:
+        players = self.game.players
+        self.test.assertEqual(state.sizes, [len(player.hand) for player in players])
+        self.test.assertEqual(state.hands[state.turn], self.hand.key)
+        others = sum(size for seat, size in enumerate(state.sizes) if seat != state.turn)
+        self.test.assertEqual(len(state.unknown), others)
+        dealt = state.determinize(random.Random(0))
+        self.test.assertEqual(dealt.sizes, state.sizes)
+        self.test.assertTrue(all(count <= NB_SUITS for count in counts(sum(dealt.hands))))
+        self.test.assertEqual(set(state.actions()) - {PASS}, set(self.game.legal_plays(self.hand)))
+        return super().choose(state)
+
+
+class TestSearchAI(unittest.TestCase):
+    """ Information-set Monte Carlo tree search on a fast model of the game """
+
+    def test_rounds(self):
+        state = FastPresident([hand("3", "7", "K"), hand("5", "9", "2", "J"), hand("4", "6")], turn=0)
+        for action in [(rank("3"), 1), (rank("5"), 1), PASS, (rank("7"), 1), (rank("9"), 1)]:
+            state.apply(action)
+        self.assertEqual(state.turn, 0)  # seat 2 folded until the next round
+        self.assertEqual(state.actions(), [(rank("K"), 1), PASS])
+        state.apply(PASS)
+        self.assertEqual((state.turn, state.top, state.passed), (1, -1, 0))  # back to the last player
+        self.assertNotIn(PASS, state.actions())
+        state.apply((rank("2"), 1))  # best card : new round, same player
+        self.assertEqual((state.turn, state.top), (1, -1))
+        state.apply((rank("J"), 1))
+        self.assertEqual(state.ladder, [1])
+        self.assertEqual(state.turn, 2)  # the winner's round goes on without him
+
+    def test_revolution(self):
+        four = Card("4", "♥").rank
+        state = FastPresident([hand_key(Card("4", color) for color in "♥♠♦♣") + hand("Q"), hand("3", "K")])
+        state.apply((four, 4))
+        self.assertTrue(state.reverse)
+        self.assertEqual(state.actions(), [PASS])  # 4 cards required
+        state.apply(PASS)
+        self.assertEqual(state.actions(), [(rank("Q"), 1)])
+        state.apply((rank("Q"), 1))
+        self.assertEqual(state.ladder, [0, 1])
+        self.assertTrue(state.over)
+
+    def test_rollouts_finish(self):
+        rng = random.Random(3)
+        for nb_players in (2, 3, 4, 6):
+            for _ in range(50):
+                ladder = FastPresident.deal(nb_players, rng).rollout(rng)
+                self.assertEqual(sorted(ladder), list(range(nb_players)))
+
+    def test_observe(self):
+        game = PresidentGame(0, 3, seed=4, save=False)
+        game.register(CheckedSearchAI(self, seed=4, iterations=20, time_budget=None))
+        with mock.patch("builtins.print"):
+            game._initialize_game()
+            game._play_game()
+            result = game.save_results(game.game_name)
+        self.assertEqual(len(result["winners"]), 4)
+        self.assertGreater(game.players[-1].searched, 0)
+
+    def test_reproducible(self):
+        results = []
+        for _ in range(2):
+            game = PresidentGame(0, 3, seed=7, save=False)
+            game.register(SearchAI(seed=7, iterations=20, time_budget=None))
+            with mock.patch("builtins.print"):
+                game._initialize_game()
+                game._play_game()
+                ladder = game.save_results(game.game_name)["winners"]
+            results.append([(game.players.index(game.get_player(winner["player"])), winner["last_play"])
+                            for winner in ladder])
+        self.assertEqual(results[0], results[1])
+
+    def test_time_budget(self):
+        """ the search stops at its deadline : a clock ticking once per iteration gives budget - 1 of them """
+        state = FastPresident.deal(4, random.Random(5))
+        player = SearchAI(time_budget=5, seed=5)
+        with mock.patch("models.players.search_ai.time", mock.Mock(perf_counter=itertools.count().__next__)):
+            self.assertIn(player.choose(state), state.actions())
+        self.assertEqual(player.searched, 4)  # deadline at 5, iterations started at 1, 2, 3 and 4
+
+    def test_needs_a_limit(self):
+        with self.assertRaises(ValueError):  # would search forever
+            SearchAI(time_budget=None, iterations=None)
+        with self.assertRaises(ValueError):
+            search(FastPresident.deal(4, random.Random(7)), random.Random(7))
+
+    def test_processes(self):
+        state = FastPresident.deal(4, random.Random(6))
+        player = SearchAI(time_budget=None, iterations=40, processes=2, seed=6)
+        self.assertIn(player.choose(state), state.actions())
+        self.assertEqual(player.searched, 40)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import coloredlogs
+
+from models.games.apis.shards import ShardRouter, TableRegistry, start_shards
+
+
+class TestShards(unittest.TestCase):
+    """ Tables spread over processes, behind a router """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.shards, cls.processes = start_shards(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        for process in cls.processes:
+            process.terminate()
+            process.join()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = TableRegistry(os.path.join(self.tmp.name, "tables.json"))
+        self.client = ShardRouter(self.shards, self.registry).test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_tables_are_spread_and_routed(self):
+        """ tables go to the least loaded shard, and players reach their table through the router """
+        tables = [self.client.post("/tables", json={"nb_ai": 2}).json["id"] for _ in range(4)]
+        placement = [self.registry.get(table) for table in tables]
+        self.assertEqual(sorted(placement), sorted(self.shards * 2))
+        self.assertEqual(len(self.client.get("/tables").json["tables"]), 4)
+
+        response = self.client.post(f"/tables/{tables[1]}/Connect/Mistayan")
+        self.assertEqual(response.status_code, 200)
+        token = response.headers.get("token")
+        response = self.client.get(f"/tables/{tables[1]}/Update/Mistayan", headers={"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["game"]["players"][-1][0], "Mistayan")
+        self.assertEqual(self.client.get(f"/tables/{tables[0]}/Update/Mistayan",
+                                         headers={"token": token}).status_code, 404)
+
+        self.assertEqual(self.client.delete(f"/tables/{tables[1]}").status_code, 200)
+        self.assertIsNone(self.registry.get(tables[1]))
+        self.assertEqual(self.client.get(f"/tables/{tables[1]}/Update/Mistayan").status_code, 404)
+        # placements survive the router
+        self.assertEqual(TableRegistry(self.registry.path).get(tables[2]), placement[2])
+
+    def test_concurrent_opens_spread(self):
+        """ tables opened at once do not pile onto the same shard """
+        router = ShardRouter(self.shards, self.registry)
+        with ThreadPoolExecutor(8) as pool:
+            answers = list(pool.map(lambda _: router.test_client().post("/tables", json={"nb_ai": 2}), range(8)))
+        self.assertEqual([answer.status_code for answer in answers], [201] * 8)
+        self.assertEqual(self.registry.load(self.shards), dict.fromkeys(self.shards, 4))
+        [self.client.delete(f"/tables/{answer.json['id']}") for answer in answers]
+
+    def test_malformed_options(self):
+        for body in (b"{not json", b"[1, 2]"):
+            self.assertEqual(self.client.post("/tables", data=body).status_code, 400)
+        self.assertEqual(len(self.registry), 0)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
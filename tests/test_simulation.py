@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import unittest
+
+import coloredlogs
+
+from models.simulation import run_simulation
+
+
+class TestSimulation(unittest.TestCase):
+    """ Batch self-play runner """
+
+    def test_simulation_aggregates_every_game(self):
+        """ every game gives one rank to every seat """
+        stats = run_simulation(nb_games=12, nb_ai=4, processes=1, chunk_size=5, seed=1)
+        self.assertEqual(stats.games, 12)
+        for rank in range(4):
+            self.assertEqual(sum(ranks[rank] for ranks in stats.seat_ranks), 12)
+        self.assertAlmostEqual(sum(stats.win_rates), 1.)
+        self.assertGreater(stats.mean_rounds, 0)
+        self.assertTrue(logging.getLogger().isEnabledFor(logging.WARNING))  # the caller's logs are kept
+
+    def test_simulation_is_reproducible(self):
+        """ results only depend on the seed, not on the processes """
+        local = run_simulation(nb_games=6, nb_ai=3, processes=1, chunk_size=2, seed=7)
+        pooled = run_simulation(nb_games=6, nb_ai=3, processes=2, chunk_size=2, seed=7)
+        self.assertEqual(local.to_json(), pooled.to_json())
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
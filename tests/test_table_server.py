@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import unittest
+
+import coloredlogs
+
+from models.games.apis.table_server import TableServer
+
+
+class TestTableServer(unittest.TestCase):
+    """ Many tables, one server """
+
+    def setUp(self):
+        self.server = TableServer()
+        self.client = self.server.test_client()
+
+    def test_tables_routes(self):
+        """ every table has its own players, behind the same server """
+        first = self.client.post("/tables", json={"nb_ai": 2}).json["id"]
+        second = self.client.post("/tables").json["id"]
+        self.assertNotEqual(first, second)
+        lobby = {table["id"]: table for table in self.client.get("/tables").json["tables"]}
+        self.assertEqual(len(lobby[first]["players"]), 2)
+        self.assertEqual(len(lobby[second]["players"]), 3)
+
+        response = self.client.post(f"/tables/{first}/Connect/Mistayan")
+        self.assertEqual(response.status_code, 200)
+        token = response.headers.get("token")
+        response = self.client.get(f"/tables/{first}/Update/Mistayan", headers={"token": token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json["game"]["players"][-1][0], "Mistayan")
+        self.assertIsNone(self.server.get_table(second).get_player("Mistayan"))
+        self.assertEqual(self.client.get(f"/tables/{first}/Connect/Mistayan").status_code, 405)
+        self.assertEqual(self.client.get(f"/tables/{first}/Nope/Mistayan").status_code, 404)
+
+        self.assertEqual(self.client.delete(f"/tables/{first}").status_code, 200)
+        self.assertEqual(self.client.get(f"/tables/{first}/Update/Mistayan").status_code, 404)
+        self.assertEqual(self.client.delete(f"/tables/{first}").status_code, 404)
+        self.assertEqual([table["id"] for table in self.client.get("/tables").json["tables"]], [second])
+
+    def test_tables_limit(self):
+        """ tables are cheap, but bounded """
+        server = TableServer(max_tables=100)
+        for _ in range(100):
+            server.open_table()
+        self.assertEqual(len(server.lobby()), 100)
+        self.assertEqual(server.test_client().post("/tables").status_code, 503)
+
+    def test_table_failing_to_open(self):
+        """ a game that cannot be created leaves neither its table nor its id behind """
+        def broken(**_):
+            raise ValueError("no such game")
+        server = TableServer(broken)
+        self.assertRaises(ValueError, server.open_table, "1")
+        self.assertEqual(server.tables, {})
+        self.assertFalse(server.close_table("1"))
+        self.assertEqual(server.test_client().post("/tables", json={"id": "1"}).status_code, 400)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+"""
+import logging
+import unittest
+from math import comb
+from unittest import mock
+
+import coloredlogs
+import numpy as np
+
+from models.games import PresidentGame
+from models.games.card_games.card import CARDS, Card, NB_RANKS
+from models.players import AI
+from models.players.tracker import CardTracker
+
+
+def counts(cards) -> np.ndarray:
+    return np.bincount([card.rank for card in cards], minlength=NB_RANKS)
+
+
+class TestTracker(unittest.TestCase):
+    """ What an AI can tell of the others' hands """
+
+    def check(self, game: PresidentGame, player: AI) -> None:
+        """ the tracker agrees with the cards actually held and played """
+        tracker = player.tracker
+        hands = [counts(test.hand) for test in game.players]
+        self.assertEqual(tracker.sizes.tolist(), [len(test.hand) for test in game.players])
+        self.assertEqual(tracker.known[tracker.me].tolist(), hands[tracker.me].tolist())
+        played = counts([card for pile in (*game.plays, game.pile) for card in pile])
+        self.assertEqual(tracker.played.tolist(), played.tolist())
+        others = [row for row in range(len(hands)) if row != tracker.me]
+        for row in others:
+            self.assertTrue((tracker.known[row] <= hands[row]).all())  # known cards are there
+        hidden = sum(hands[row] - tracker.known[row] for row in others)
+        self.assertEqual(tracker.unseen.tolist(), hidden.tolist())
+        self.assertTrue(np.allclose(tracker.expected.sum(axis=1), tracker.sizes))
+
+    def test_follows_games(self):
+        game = PresidentGame(0, 4, seed=2, save=False)
+        play = AI._play_cli
+
+        def checked_play(player, *args, **kwargs):
+            [self.check(game, test) for test in game.players]
+            return play(player, *args, **kwargs)
+
+        with mock.patch.object(AI, "_play_cli", autospec=True, side_effect=checked_play) as plays, \
+                mock.patch("builtins.print"):
+            for _ in range(2):  # the second game starts with exchanges
+                game._initialize_game()
+                [self.check(game, test) for test in game.players]
+                game._play_game()
+                game.save_results(game.game_name)
+                game._reset_winner()
+        self.assertGreater(plays.call_count, 20)
+
+    def test_exchanges(self):
+        me, other, third = players = [object(), object(), object()]
+        tracker = CardTracker(players, me)
+        king, ace, two = Card("K", "♥"), Card("A", "♥"), Card("2", "♥")
+        tracker.moved(None, [king], me)
+        tracker.moved(None, [ace, two], other)
+        tracker.moved(None, [Card("3", "♥")], third)
+        self.assertEqual(tracker.unseen.sum(), 51)
+        tracker.moved(me, [king], other)  # given : known in his hand
+        self.assertEqual(tracker.known[1, king.rank], 1)
+        tracker.moved(other, [two], me)  # received : seen
+        self.assertEqual(tracker.unseen[two.rank], 3)
+        tracker.moved(other, [ace], third)  # between others : only counted
+        self.assertEqual(tracker.unseen[ace.rank], 4)
+        self.assertEqual(tracker.sizes.tolist(), [1, 1, 2])
+        tracker.moved(other, [king], None)  # the known king is played
+        self.assertEqual((tracker.known[1].sum(), tracker.played[king.rank], tracker.unseen[king.rank]), (0, 1, 3))
+
+    def test_probabilities(self):
+        me, other, third = players = [object(), object(), object()]
+        tracker = CardTracker(players, me)
+        deck = list(CARDS)
+        for row, player in enumerate(players):
+            tracker.moved(None, deck[row::3], player)
+        unseen, hidden = int(tracker.unseen.sum()), int(tracker.hidden[1])
+        queen = Card("Q", "♥").rank
+        self.assertEqual(tracker.unseen[queen], 4 - counts(deck[::3])[queen])
+        # hypergeometric : 2 queens at least, in 17 cards drawn from the unseen ones
+        expected = sum(comb(int(tracker.unseen[queen]), k) * comb(unseen - int(tracker.unseen[queen]), hidden - k)
+                       for k in range(2, 5)) / comb(unseen, hidden)
+        self.assertAlmostEqual(tracker.at_least(2)[1, queen], expected)
+        self.assertTrue(0 < tracker.can_beat(queen, 2) < 1)
+        # everything above the king is played : only the kings nobody saw can beat a king
+        king = Card("K", "♥").rank
+        for index, card in enumerate(deck):
+            if card.rank > king:
+                tracker.moved(players[index % 3], [card], None)
+        self.assertEqual(tracker.can_beat(king + 1, 1), 0.)
+        self.assertEqual(tracker.can_beat(king, 1) > 0, tracker.unseen[king] > 0)
+        self.assertGreater(tracker.can_beat(Card("3", "♥").rank, 1, reverse=True), 0.)
+
+
+if __name__ == '__main__':
+    coloredlogs.set_level(logging.DEBUG)
+    unittest.main()
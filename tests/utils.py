@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Created by: Mistayan
+Project: President-Game
+IDE: PyCharm
+Creation-date: 10/18/26
+Function : Helpers shared by the tests
+"""
+import json
+from unittest import mock
+
+from models.games import PresidentGame
+
+
+def play(nb_games: int, seed: int) -> list[dict]:
+    """ results of successive games on a table """
+    game = PresidentGame(0, 4, seed=seed, save=False)
+    results = []
+    with mock.patch("builtins.print"):
+        for _ in range(nb_games):
+            game._initialize_game()
+            game._play_game()
+            results.append(game.save_results(game.game_name))
+            game._reset_winner()
+    return json.loads(json.dumps(results))  # as read back from a journal